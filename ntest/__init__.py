@@ -58,6 +58,7 @@ from .core import run
 # classes we need
 from .classes.TestCase import TestCase
 from .classes.TestResult import TestResult
+from .reporters import Reporter
 
 # too lazy to get all the decorators, so lets just do that
 from .decorators import __all__ as decorators
@@ -67,6 +68,7 @@ __all__: list[str] = [
     "run",
     "TestCase",
     "TestResult",
+    "Reporter",
     "__version__",
     *decorators # type: ignore
 ]
\ No newline at end of file
@@ -1,5 +1,6 @@
-from argparse import FileType, Namespace, ArgumentParser
+from argparse import ArgumentTypeError, FileType, Namespace, ArgumentParser
 from sys import stdout
+from os import cpu_count
 
 # open the parser
 parser = ArgumentParser(
@@ -7,6 +8,59 @@ parser = ArgumentParser(
     description="A minimal Python unit testing framework designed to run just as good as any enterprise tests. It's both lightweight and fast for small tests, and super expansible for when you need it most."
 )
 
+def workers(value: str) -> int:
+    """Turn the -n value into a worker count. "auto" means one per CPU core."""
+    if value == "auto":
+        return cpu_count() or 1
+
+    count: int = int(value)
+    if count < 0:
+        raise ArgumentTypeError(f"worker count can't be negative: {count}")
+
+    return count
+
+def durations(value: str) -> int:
+    """Turn the --durations value into how many slow tests to show (0 shows all of them)."""
+    count: int = int(value)
+    if count < 0:
+        raise ArgumentTypeError(f"durations can't be negative: {count}")
+
+    return count
+
+def concurrency(value: str) -> int:
+    """Turn the --async-concurrency value into how many async tests can await at once (has to be at least 1)."""
+    count: int = int(value)
+    if count < 1:
+        raise ArgumentTypeError(f"async concurrency has to be at least 1, got: {count}")
+
+    return count
+
+def shard(value: str) -> tuple[int, int]:
+    """Turn the --shard value (INDEX/TOTAL, 1 based) into a (index, total) tuple."""
+    try:
+        index, total = (int(part) for part in value.split("/"))
+
+    except ValueError:
+        raise ArgumentTypeError(f"shard has to look like INDEX/TOTAL (ex: 1/8), got: {value}")
+
+    if not 1 <= index <= total:
+        raise ArgumentTypeError(f"shard index has to be between 1 and {total}, got: {index}")
+
+    return index, total
+
+def seconds(value: str) -> float:
+    """Turn a --max-time / --file-time value into seconds (has to be more than 0)."""
+    try:
+        count: float = float(value)
+
+    except ValueError:
+        raise ArgumentTypeError(f"time has to be a number of seconds, got: {value}")
+
+    if count <= 0:
+        raise ArgumentTypeError(f"time has to be more than 0 seconds, got: {value}")
+
+    return count
+
 def parse_args() -> Namespace:
     """Parse command line arguments and return them as a Namespace object.
 
@@ -16,6 +70,33 @@ def parse_args() -> Namespace:
         3. -e, --end (str, optional): The ending pattern to match test files. Defaults to "_test".
         4. -v, --verbose (bool, optional): If set, enables verbose output with more precise timing and full error logs. Defaults to False.
         5. -ff, --fail-fast (bool, optional): If set, stops execution immediately upon the first test failure. Defaults to False.
+        6. -o, --output (FileType, optional): Stream results to stdout (no path) or to a file, JUnit XML for .xml and JSON Lines otherwise. Repeatable.
+           --no-capture (bool, optional): Let tests print instead of swallowing their output. Defaults to False.
+        7. -n, --workers (int | "auto", optional): Run tests across this many worker processes ("auto" = one per core). Defaults to 0 (no workers).
+        8. --lazy (bool, optional): Find tests by parsing files instead of importing them, modules only get imported when their tests run. Defaults to False.
+        9. --collect-only (bool, optional): Just list the tests that would run, don't run them. Defaults to False.
+        10. --cache-clear (bool, optional): Wipe .ntest_cache/ before the run starts. Defaults to False.
+            --no-collect-cache (bool, optional): Don't use or update the collection cache, collect every file from scratch. Defaults to False.
+        11. --lf, --last-failed (bool, optional): Only rerun the tests that failed last time. Defaults to False.
+        12. --ff-first, --failed-first (bool, optional): Run last time's failures first, then everything else. Defaults to False.
+        13. --durations (int, optional): Show the N slowest tests at the end (0 shows all of them). Defaults to None (don't show).
+        14. --shard (INDEX/TOTAL, optional): Only run this node's slice of the test files (1 based, ex: 2/8). Defaults to None (run everything).
+            --shard-timings (str, optional): A shared results.json to balance the shards by. Defaults to None (split by hash).
+        15. --async-concurrency (int, optional): Let up to N plain async tests in a file await at the same time. Defaults to 1 (one at a time).
+        16. --benchmark-update (bool, optional): Throw out saved @benchmark baselines so this run saves new ones. Defaults to False.
+        17. --affected (bool, optional): Only run tests that touched files changed since they last ran (plus new and failing ones). Defaults to False.
+        18. --watch (bool, optional): Stay running and rerun the affected tests every time a .py file changes. Defaults to False.
+        19. --memprofile (bool, optional): Measure every test's peak and retained memory, and show the worst ones at the end. Defaults to False.
+        20. --profile (str, optional): cProfile every test body, merged into one .pstats (plus a .collapsed for flamegraphs) at PATH. Defaults to None (no profiling), ntest.pstats with no path.
+        21. --profile-top (int, optional): Print the N functions with the most self time at the end (turns --profile on). Defaults to None (don't print).
+        22. --trace (str, optional): Write a Chrome/Perfetto trace of the whole run (collection, imports, setup, tests, teardown, worker spawns) to PATH. Defaults to None (no trace).
+        23. --ignore (str, optional): A gitignore style glob of files/directories to never look in, on top of the defaults and .gitignore. Repeatable. Defaults to none.
+        24. --collect-workers (int | "auto", optional): Import test files this many at a time during collection, in worker processes. Defaults to 0 (one by one).
+            --collect-threads (bool, optional): Do those imports in threads instead of processes. Defaults to False.
+        25. --max-time (float, optional): Stop starting new tests once the run has taken this many seconds, the rest get reported as not run. Defaults to None (no limit).
+            --file-time (float, optional): Same thing, but per test file. Defaults to None (no limit).
+        26. --flaky-retries (int, optional): Extra attempts tests that history says are flaky get. Defaults to 2 (0 turns it off).
+            --quarantine (bool, optional): Run the known flaky tests last, on their own, and don't count them in the results. Defaults to False.
 
     Returns:
         Namespace: Parsed command line arguments.
@@ -57,9 +138,192 @@ def parse_args() -> Namespace:
         "-o", "--output",
         nargs="?",
         const=stdout,
-        type=FileType("w"),
+        type=FileType("w", bufsize=1 << 16, encoding="utf-8"),
+        action="append",
+        default=None,
+        help="Stream results to stdout (no path) or to <path> as they finish. .xml paths get JUnit XML, anything else gets JSON Lines. Can be given more than once."
+    )
+
+    parser.add_argument(
+        "--no-capture",
+        action="store_true",
+        help="Let tests print to the console instead of swallowing their output."
+    )
+
+    parser.add_argument(
+        "-n", "--workers",
+        type=workers,
+        default=0,
+        help="Run tests in parallel across N worker processes, or 'auto' for one per CPU core."
+    )
+
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Find tests by parsing files instead of importing them. Modules only get imported when their tests run."
+    )
+
+    parser.add_argument(
+        "--collect-only",
+        action="store_true",
+        help="List the tests that would run without running them."
+    )
+
+    parser.add_argument(
+        "--cache-clear",
+        action="store_true",
+        help="Wipe the .ntest_cache/ directory (collection cache and all) before running."
+    )
+
+    parser.add_argument(
+        "--no-collect-cache",
+        action="store_true",
+        help="Don't use (or update) the collection cache, parse or import every test file from scratch."
+    )
+
+    parser.add_argument(
+        "--lf", "--last-failed",
+        dest="last_failed",
+        action="store_true",
+        help="Only rerun the tests that failed last time (files with no failures don't even get imported)."
+    )
+
+    parser.add_argument(
+        "--ff-first", "--failed-first",
+        dest="failed_first",
+        action="store_true",
+        help="Run the tests that failed last time first, then everything else."
+    )
+
+    parser.add_argument(
+        "--durations",
+        type=durations,
+        default=None,
+        metavar="N",
+        help="Show the N slowest tests at the end of the run (0 for all of them)."
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=shard,
+        default=None,
+        metavar="INDEX/TOTAL",
+        help="Only run this node's slice of the test files (1 based, ex: 2/8). Split by a stable hash of their paths, or by --shard-timings."
+    )
+
+    parser.add_argument(
+        "--shard-timings",
         default=None,
-        help="Dump results to stdout (no path) or to <path>."
+        metavar="PATH",
+        help="Balance --shard by the durations in PATH instead: a results.json from a run of the whole suite, the same file on every node. Only used if it has every test file in it."
+    )
+
+    parser.add_argument(
+        "--async-concurrency",
+        type=concurrency,
+        default=1,
+        metavar="N",
+        help="Let up to N independent async tests in a file await at the same time (on the file's shared event loop)."
+    )
+
+    parser.add_argument(
+        "--benchmark-update",
+        action="store_true",
+        help="Throw out the saved @benchmark baselines, so this run's numbers become the new ones."
+    )
+
+    parser.add_argument(
+        "--affected",
+        action="store_true",
+        help="Only run the tests that ran code from files changed since last time, plus new tests and last run's failures. The first run records everything."
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rerun the tests affected by every .py file you save (inotify on linux, polling elsewhere)."
+    )
+
+    parser.add_argument(
+        "--memprofile",
+        action="store_true",
+        help="Trace every test's allocations (tracemalloc + RSS) and show the ones that held on to the most memory, with where it was allocated."
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="ntest.pstats",
+        default=None,
+        metavar="PATH",
+        help="cProfile just the test bodies (no runner, setup or fixtures) and merge it all into PATH (default ntest.pstats), plus PATH.collapsed for flamegraphs."
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Print the N functions with the most self time across all tests at the end (turns on --profile)."
+    )
+
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="PATH",
+        help="Write a timeline of the whole run (collection, imports, class setup, setUp, test bodies, tearDown, worker spawns) to PATH as Chrome trace events, for chrome://tracing or ui.perfetto.dev."
+    )
+
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="Don't look in files or directories matching GLOB (gitignore style). Hidden dirs, venvs, node_modules, etc and anything in .gitignore are already skipped. Can be given more than once."
+    )
+
+    parser.add_argument(
+        "--collect-workers",
+        type=workers,
+        default=0,
+        metavar="N",
+        help="Import test files N at a time while collecting (or 'auto' for one per CPU core), in worker processes that send back what's in them. For suites with slow imports."
+    )
+
+    parser.add_argument(
+        "--collect-threads",
+        action="store_true",
+        help="Do the --collect-workers imports in threads instead of processes (for imports stuck on disk/network, if your test modules can be imported at the same time)."
+    )
+
+    parser.add_argument(
+        "--max-time",
+        type=seconds,
+        default=None,
+        metavar="SECONDS",
+        help="Stop starting new tests once the run has gone SECONDS, and report the rest as not run (the summary and -o reports still get written). With history, last run's failures and the quickest tests go first."
+    )
+
+    parser.add_argument(
+        "--file-time",
+        type=seconds,
+        default=None,
+        metavar="SECONDS",
+        help="Stop starting new tests in a file once it's had SECONDS, and move on to the next one (the rest of it gets reported as not run)."
+    )
+
+    parser.add_argument(
+        "--flaky-retries",
+        type=int,
+        default=2,
+        metavar="N",
+        help="Give tests that history says are flaky (passing on a retry, flipping between runs) up to N extra attempts. 0 turns it off."
+    )
+
+    parser.add_argument(
+        "--quarantine",
+        action="store_true",
+        help="Run the known flaky tests after everything else, on their own, and report them separately (they don't count as passes or fails)."
     )
 
     return parser.parse_args()
\ No newline at end of file
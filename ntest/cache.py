@@ -0,0 +1,78 @@
+# files and folders
+from os import makedirs, replace, fdopen, unlink
+from os.path import exists, join
+from tempfile import mkstemp
+from shutil import rmtree
+
+# everything in here is json (readable, and nothing in it can run code on load)
+from json import dump, load
+from typing import Any
+
+# where everything lives, relative to wherever ntest got run from
+CACHE_DIR: str = ".ntest_cache"
+
+def cachepath(name: str) -> str:
+    """
+    Get the path of a file inside the cache directory, making the directory if it isn't there yet.
+
+    Args:
+        name (str): File name inside the cache (ex: "collection.json").
+
+    Returns:
+        str: The full path.
+    """
+    if not exists(CACHE_DIR):
+        makedirs(CACHE_DIR, exist_ok=True)
+
+        # keep it out of everyone's commits
+        with open(join(CACHE_DIR, ".gitignore"), "w") as file:
+            file.write("# created by ntest automatically\n*\n")
+
+    return join(CACHE_DIR, name)
+
+def read(name: str, default: Any = None) -> Any:
+    """
+    Read a json file out of the cache. A missing or busted file just gives you the default.
+
+    Args:
+        name (str): File name inside the cache.
+        default (Any): What to return if there's nothing usable there.
+
+    Returns:
+        Any: The decoded data, or default.
+    """
+    try:
+        with open(join(CACHE_DIR, name), "r", encoding="utf-8") as file:
+            return load(file)
+
+    except (OSError, ValueError):
+        return default
+
+def write(name: str, data: Any) -> None:
+    """
+    Write a json file into the cache. Goes to a temp file first and gets swapped in,
+    so a run that dies halfway thru never leaves half a file behind. Every write gets its own temp file,
+    so two processes writing at once just means the last one wins (nobody swaps in somebody else's half written file).
+
+    Args:
+        name (str): File name inside the cache.
+        data (Any): Anything json can handle.
+    """
+    path: str = cachepath(name)
+    handle, temp = mkstemp(prefix=f"{name}.", suffix=".tmp", dir=CACHE_DIR)
+
+    try:
+        with fdopen(handle, "w", encoding="utf-8") as file:
+            dump(data, file, separators=(",", ":"))
+
+        replace(temp, path)
+
+    # don't leave temp files lying around if the dump blew up
+    except BaseException:
+        if exists(temp):
+            unlink(temp)
+        raise
+
+def clear() -> None:
+    """Nuke the whole cache directory (--cache-clear)."""
+    rmtree(CACHE_DIR, ignore_errors=True)
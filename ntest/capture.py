@@ -0,0 +1,128 @@
+# output capture for tests. one temp file per process, reused forever: python level writes AND anything written straight to fd 1/2
+# (subprocesses, C extensions, os.write) land in it. passing tests just get it emptied, only failures ever read it back
+from contextlib import contextmanager
+from tempfile import TemporaryFile
+from typing import Any, Generator, TextIO
+from io import TextIOWrapper
+from os import dup, dup2
+import builtins
+import sys
+
+# most of a test's output a failure keeps (the end of it, that's where the good stuff is)
+LIMIT: int = 64 * 1024
+
+# once the file gets bigger than this between tests it gets cut back down to its tail, so a chatty run doesn't eat the disk
+COMPACT: int = 1024 * 1024
+
+# this process's buffer, a text layer on top of it for sys.stdout/sys.stderr, and copies of the real fd 1/2 to put back
+__file: Any = None
+__text: TextIOWrapper | None = None
+__saved: tuple[int, int] | None = None
+
+# how deep we are (so nested captures don't undo each other) and what got swapped out
+__depth: int = 0
+__swapped: tuple[TextIO, TextIO, Any] | None = None
+
+def __noinput(prompt: str = "") -> str:
+    raise RuntimeError("STDIN disabled")
+
+def __setup() -> None:
+    """Make this process's buffer the first time something gets captured. If fd 1/2 can't be copied (closed, no console) it's python level only."""
+    global __file, __text, __saved
+    __file = TemporaryFile(buffering=0)
+    __text = TextIOWrapper(__file, encoding="utf-8", errors="replace", write_through=True)
+
+    try:
+        __saved = (dup(1), dup(2))
+    except OSError:
+        __saved = None
+
+def __flush() -> None:
+    """Push out anything sitting in a python buffer (including ones bound before we swapped, like `from sys import stdout`)."""
+    for stream in (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__):
+        try:
+            if stream is not None:
+                stream.flush()
+        except (OSError, ValueError):
+            continue
+
+@contextmanager
+def capturing() -> Generator[None, None, None]:
+    """
+    Send everything the code inside writes (print, sys.stderr, fd 1/2 writes from subprocesses and C code) to this process's buffer,
+    and make input() throw. Nothing gets allocated per use, it's a couple of dup2s and attribute swaps. Safe to nest.
+    """
+    global __depth, __swapped
+    if __depth:
+        __depth += 1
+        try:
+            yield
+        finally:
+            __depth -= 1
+        return
+
+    if __file is None:
+        __setup()
+
+    __flush()
+    __swapped = (sys.stdout, sys.stderr, builtins.input)
+    sys.stdout = sys.stderr = __text # type: ignore
+    builtins.input = __noinput
+    if __saved is not None:
+        dup2(__file.fileno(), 1)
+        dup2(__file.fileno(), 2)
+    __depth = 1
+
+    try:
+        yield
+
+    finally:
+        __depth = 0
+        __flush()
+        if __saved is not None:
+            dup2(__saved[0], 1)
+            dup2(__saved[1], 2)
+        sys.stdout, sys.stderr, builtins.input = __swapped
+        __swapped = None
+
+        if __file.tell() > COMPACT:
+            __compact()
+
+def __compact() -> None:
+    """Cut the buffer back down to its last LIMIT bytes (the only part a failure would ever see anyway)."""
+    kept: bytes = __tail()
+    __file.seek(0)
+    __file.truncate()
+    __file.write(kept)
+
+def __tail() -> bytes:
+    """The last LIMIT bytes in the buffer, leaving the position at the end."""
+    size: int = __file.seek(0, 2)
+    __file.seek(max(0, size - LIMIT))
+    kept: bytes = __file.read(LIMIT)
+    __file.seek(size)
+    return kept
+
+def clear() -> None:
+    """Throw out whatever's been captured (a new test is starting). Basically free when nothing got printed."""
+    if __file is not None and __file.tell():
+        __file.seek(0)
+        __file.truncate()
+
+def take() -> str | None:
+    """
+    Get what's been captured since the last clear (for a failing test) and start over.
+    Only the end of it is kept if it went over LIMIT.
+
+    Returns:
+        str | None: The captured output, or None if nothing was printed.
+    """
+    if __file is None or not __file.tell():
+        return None
+
+    size: int = __file.tell()
+    kept: bytes = __tail()
+    clear()
+
+    text: str = kept.decode("utf-8", errors="replace")
+    return f"[... {size - len(kept)} bytes cut ...]\n{text}" if size > len(kept) else text
@@ -0,0 +1,41 @@
+from typing import Any, Self
+
+# where the real thing comes from when we finally need it
+from ..loader import load
+
+class LazyTest:
+    """Stand-in for a test function or TestCase subclass found by parsing a file instead of importing it.
+    The runner treats it like the real thing: decorator attributes (__skip__, __timeout__, __loop__, etc) that
+    could be worked out from the source are set right on it, and resolve() imports the module only when the test actually runs.
+
+    Attributes:
+    - path (str): The file the test lives in.
+    - __name__ (str): The function or class name.
+    - is_class (bool): True for a TestCase subclass, False for a plain test function.
+    - methods (list[str]): For classes, the test_ methods (and run) we could see in the class body.
+    - dynamic (bool): True if some decorator couldn't be resolved statically. Unknown attributes then come from the real object.
+    - parametrized (bool): True if it's got @parametrize (its cases only exist on the real object, -n just needs to know to split it).
+    """
+
+    def __init__(self: Self, path: str, name: str, is_class: bool = False, methods: list[str] | None = None) -> None:
+        self.path: str = path
+        self.__name__: str = name
+        self.is_class: bool = is_class
+        self.methods: list[str] = methods or []
+        self.dynamic: bool = False
+        self.parametrized: bool = False
+
+    def __repr__(self: Self) -> str:
+        return f"<LazyTest {self.__name__} in {self.path}>"
+
+    def resolve(self: Self) -> Any:
+        """Import the module (cached, so only the first test from a file pays for it) and return the real function or class."""
+        return getattr(load(self.path), self.__name__)
+
+    def __getattr__(self: Self, attr: str) -> Any:
+        # only gets hit when normal lookup misses. if every decorator was resolved statically, missing means missing
+        if not self.__dict__.get("dynamic", False):
+            raise AttributeError(attr)
+
+        # otherwise the real object knows better than we do
+        return getattr(self.resolve(), attr)
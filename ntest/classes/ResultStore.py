@@ -0,0 +1,209 @@
+from array import array
+from dataclasses import fields
+from heapq import nlargest
+from tempfile import TemporaryFile
+from typing import Any, Generator, Iterator, Self
+
+from .TestResult import TestResult
+
+# every result has these, they get their own columns
+COLUMNS: tuple[str, ...] = ("name", "file", "passed", "duration")
+
+# big strings that go to disk instead of memory
+SPILL: tuple[str, ...] = ("error", "output")
+
+# whatever's left (probe data) only gets kept for results that actually have some
+EXTRAS: tuple[str, ...] = tuple(field.name for field in fields(TestResult) if field.name not in COLUMNS + SPILL)
+
+class ResultStore:
+    """Every result of a run, stored by column so a few hundred thousand of them stay small. Files are interned
+    (one copy of each string, results hold an index), names are packed into one utf-8 blob (they're nearly all different,
+    ex: parametrized cases, so interning them would just cost a dict entry each), durations live in a float array, pass/fail is one bit each,
+    and tracebacks + captured output get written to a temp file and only read back when something asks for them.
+    Records get rebuilt into TestResults one at a time as you iterate, nothing is materialized up front.
+    Tests that never ran (out of time) only get counted.
+
+    Methods:
+    - add(result): Store a result (the TestResult itself isn't kept).
+    - record(index): Rebuild the result at index.
+    - results(passed=None): Iterate over every result (or just the passes/fails), in the order they were added.
+    - slowest(count): The count slowest results, longest first (0 for all of em).
+    - passes / fails: List-ish views of just the passes or just the fails (len, iteration, truthiness).
+    - close(): Throw away the spilled strings."""
+
+    def __init__(self: Self) -> None:
+        # the intern table (files)
+        self.strings: list[str] = []
+        self.ids: dict[str, int] = {}
+
+        # one slot per result. names[ends[i - 1]:ends[i]] is result i's name
+        self.names: bytearray = bytearray()
+        self.ends: array = array("Q")
+        self.files: array = array("I")
+        self.durations: array = array("d")
+        self.bits: bytearray = bytearray()
+        self.passed: int = 0
+        self.notrun: int = 0
+
+        # index -> (offset, length) in the spill file for each SPILL field (None if it had none), and index -> probe data.
+        # both only for results that have any
+        self.spilled: dict[int, tuple[tuple[int, int] | None, ...]] = {}
+        self.extras: dict[int, dict[str, Any]] = {}
+        self.spill: Any = None
+
+    def __len__(self: Self) -> int:
+        return len(self.durations)
+
+    def __iter__(self: Self) -> Iterator[TestResult]:
+        return self.results()
+
+    @property
+    def failed(self: Self) -> int:
+        return len(self) - self.passed
+
+    @property
+    def passes(self: Self) -> "ResultView":
+        return ResultView(self, True)
+
+    @property
+    def fails(self: Self) -> "ResultView":
+        return ResultView(self, False)
+
+    def __intern(self: Self, text: str) -> int:
+        """Index of text in the string table, adding it if it's new."""
+        found: int | None = self.ids.get(text)
+        if found is None:
+            found = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+
+        return found
+
+    def __write(self: Self, text: str) -> tuple[int, int]:
+        """Put a string at the end of the spill file (made the first time something fails), returns (offset, length)."""
+        if self.spill is None:
+            self.spill = TemporaryFile()
+
+        data: bytes = text.encode("utf-8", errors="surrogatepass")
+        offset: int = self.spill.seek(0, 2)
+        self.spill.write(data)
+        return offset, len(data)
+
+    def __read(self: Self, offset: int, length: int) -> str:
+        self.spill.seek(offset)
+        return self.spill.read(length).decode("utf-8", errors="surrogatepass")
+
+    def name(self: Self, index: int) -> str:
+        """The name of the result at index, without rebuilding the rest of it."""
+        return self.names[self.ends[index - 1] if index else 0:self.ends[index]].decode("utf-8", errors="surrogatepass")
+
+    def ok(self: Self, index: int) -> bool:
+        """Whether the result at index passed, straight from the bitset."""
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def add(self: Self, result: TestResult) -> None:
+        """
+        Store a result. Only its fields are kept, so the TestResult (and its traceback) can be let go right after.
+
+        Args:
+            result (TestResult): A finished test (or one that never ran, those just get counted).
+        """
+        if result.skipped:
+            self.notrun += 1
+            return
+
+        index: int = len(self)
+        self.names += result.name.encode("utf-8", errors="surrogatepass")
+        self.ends.append(len(self.names))
+        self.files.append(self.__intern(result.file))
+        self.durations.append(result.duration)
+
+        # 8 results a byte
+        if not index & 7:
+            self.bits.append(0)
+        if result.passed:
+            self.bits[index >> 3] |= 1 << (index & 7)
+            self.passed += 1
+
+        if any(getattr(result, name) for name in SPILL):
+            self.spilled[index] = tuple(self.__write(getattr(result, name)) if getattr(result, name) else None for name in SPILL)
+
+        extras: dict[str, Any] = {name: getattr(result, name) for name in EXTRAS if getattr(result, name) is not None}
+        if extras:
+            self.extras[index] = extras
+
+    def record(self: Self, index: int) -> TestResult:
+        """
+        Rebuild one result (reading its traceback and output back off disk, if it had any).
+
+        Args:
+            index (int): Which result, in the order they were added.
+
+        Returns:
+            TestResult: A fresh TestResult, equal to the one that was added.
+        """
+        spilled: dict[str, str | None] = dict.fromkeys(SPILL)
+        for name, where in zip(SPILL, self.spilled.get(index, ())):
+            spilled[name] = self.__read(*where) if where else None
+
+        return TestResult(
+            name=self.name(index),
+            file=self.strings[self.files[index]],
+            passed=self.ok(index),
+            duration=self.durations[index],
+            **spilled,
+            **self.extras.get(index, {}),
+        )
+
+    def results(self: Self, passed: bool | None = None) -> Generator[TestResult, None, None]:
+        """
+        Stream results back one at a time, in the order they were added.
+
+        Args:
+            passed (bool | None): Just the passes (True), just the fails (False), or everything (None).
+
+        Yields:
+            TestResult: Each matching result.
+        """
+        for index in range(len(self)):
+            if passed is None or self.ok(index) == passed:
+                yield self.record(index)
+
+    def slowest(self: Self, count: int = 0) -> list[TestResult]:
+        """
+        The slowest results, longest first, picked off the durations column so only those get rebuilt.
+
+        Args:
+            count (int): How many, 0 for all of em.
+
+        Returns:
+            list[TestResult]: The results.
+        """
+        order: range = range(len(self))
+        picked: list[int] = nlargest(count, order, key=self.durations.__getitem__) if count > 0 else sorted(order, key=self.durations.__getitem__, reverse=True)
+        return [self.record(index) for index in picked]
+
+    def close(self: Self) -> None:
+        """Delete the spill file (records can't read their tracebacks after this)."""
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+class ResultView:
+    """Just the passes or just the fails of a ResultStore. Acts enough like the lists runtest used to return
+    (len, iteration, truthiness) without holding any results itself."""
+
+    def __init__(self: Self, store: ResultStore, passed: bool) -> None:
+        self.store: ResultStore = store
+        self.passed: bool = passed
+
+    def __len__(self: Self) -> int:
+        return self.store.passed if self.passed else self.store.failed
+
+    def __bool__(self: Self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self: Self) -> Iterator[TestResult]:
+        return self.store.results(self.passed)
+
+    def __repr__(self: Self) -> str:
+        return f"<{len(self)} {'passed' if self.passed else 'failed'} results>"
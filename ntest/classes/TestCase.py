@@ -11,6 +11,8 @@ class TestCase(ABC):
     Methods:
     - setUpClass(cls): Optional class method to set up anything you need before running tests.
     - tearDownClass(cls): OOptional class method to clean up anything you need after running tests.
+    - beforeAll(self): Optional method that runs once after setUpClass, before any test (on its own instance, so keep shared stuff on the class).
+    - afterAll(self): Optional method that runs once after every test is done, right before tearDownClass.
     - setUp(self): Optional method to set up resources before each test function.
     - tearDown(self): Optional method to clean up resources after each test function.
 
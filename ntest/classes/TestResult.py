@@ -1,10 +1,33 @@
 # huge wip
 from dataclasses import dataclass
 
-@dataclass
+# slots: no per instance __dict__, and the runner makes one of these for every single test
+@dataclass(slots=True)
 class TestResult:
     name: str
     file: str
     passed: bool
     duration: float
-    error: str | None
\ No newline at end of file
+    error: str | None
+
+    # project files the test ran code from (only filled in with --affected)
+    deps: list[str] | None = None
+
+    # memory it used: most allocated at once, still allocated at the end, rss growth (all bytes), and the top lines
+    # still holding memory as (file:line, bytes, blocks). only filled in with --memprofile (or @memlimit)
+    peak: int | None = None
+    retained: int | None = None
+    rss: int | None = None
+    sites: list[tuple[str, int, int]] | None = None
+
+    # what it printed (stdout, stderr, and anything written straight to fd 1/2), only kept for failures. capped at the last capture.LIMIT bytes
+    output: str | None = None
+
+    # benchmark stats to save as its baseline (it didn't have one yet). the parent saves them all at the end of the run
+    baseline: dict[str, float] | None = None
+
+    # how many goes it took, only set when it got more than one (@retry, or an automatic retry for a known flaky test)
+    attempts: int | None = None
+
+    # why it never ran (ex: out of --max-time). these don't count as passes or fails, reporters mark them skipped
+    skipped: str | None = None
\ No newline at end of file
@@ -1,7 +1,10 @@
 # my scanner and runner functions
-from .scanner import scandir
+from .scanner import scandir, find, names
 from .runner import runtest
 from .argparser import parse_args
+from .loader import forget
+from .watch import changes
+from . import cache, history, impact, profiler, timeline
 
 # colorize (also made by meeeee)
 from .colorize import Color
@@ -14,51 +17,204 @@ from ntest import __version__ # type: ignore
 # necessary types for checking
 from argparse import Namespace
 from .classes.TestResult import TestResult
+from .classes.ResultStore import ResultStore, ResultView
+from .reporters import Reporter, reporter
 
-# time for timing tests i wonder...
+# time for timing tests i wonder... (and printing what broke a watch cycle)
 from time import time
+from heapq import nlargest
+from itertools import chain
+from os.path import abspath
+from traceback import format_exc
 
-def run() -> None:
-    # parse args using my function
-    args: Namespace = parse_args()
+def __size(count: int) -> str:
+    """Bytes as something a human can read (ex: 1.5 MiB). Negative counts (rss shrinking) keep their sign."""
+    size: float = float(count)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GiB"
+
+def __select(args: Namespace, affected: bool) -> tuple[dict[str, list], dict[str, set[str]] | None, dict[str, set[str]]]:
+    """
+    Collect the tests and narrow them down by --lf / --affected / --shard / --ff-first (and reorder them for --max-time / --file-time).
 
-    # further parse into easily accessible vars
+    Args:
+        args (Namespace): The parsed command line.
+        affected (bool): Only keep what changed files could have broken (--affected, and every --watch rerun).
+
+    Returns:
+        tuple: (files to run, per-file selection of test names or None, what failed last time)
+    """
     path: str = args.path
     starting: str = args.start
     ending: str = args.end
-    verbose: bool = args.verbose
-    ff: bool = args.fail_fast
-    output: bool = args.output
 
-    # get terminal width
-    COLS: int = (get_terminal_size(fallback=(80, 24)).columns - 1) // 2
+    # what failed last time (for --lf, --ff-first, --affected and the time budgets)
+    budgeted: bool = bool(args.max_time or args.file_time)
+    previous: dict[str, set[str]] = history.failures() if args.last_failed or args.failed_first or affected or budgeted else {}
+    select: dict[str, set[str]] | None = None
+
+    # scan directory for tests (unchanged files come straight out of the cache). --lf only looks at files that had failures
+    only: set[str] | None = set(previous) if args.last_failed and previous else None
+
+    # only this node's slice of the files (picked before collection, so other shards' files never get imported)
+    if args.shard:
+        index, total = args.shard
+        timings: dict[str, float] | None = history.sharedtimings(args.shard_timings) if args.shard_timings else None
+        mine, balanced = history.shard(find(path, start=starting, end=ending, ignore=tuple(args.ignore)), index, total, timings)
+        only = mine if only is None else only & mine
+
+        # asked for balanced shards but the file can't be used, every node falls back to the hash the same way
+        if args.shard_timings and not balanced:
+            print(f"{Color.YELLOW}{args.shard_timings} is missing or doesn't cover every test file, sharding by hash instead.{Color.RESET}")
+    files: dict[str, list] = scandir(
+        path, start=starting, end=ending, lazy=args.lazy, cached=not args.no_collect_cache, only=only, ignore=tuple(args.ignore),
+        workers=args.collect_workers, threads=args.collect_threads
+    )
+
+    # trim down to the failures, or just move them up front
+    if args.last_failed and previous:
+        files, select = history.lastfailed(files, previous)
+
+    # only what the changes since last run could've broken (plus last run's failures)
+    elif affected:
+        files, select = impact.affected(files, impact.load(), previous)
+
+    elif args.failed_first and previous:
+        files = history.failedfirst(files, previous)
+
+    # there might not be time for everything, so what's most worth running goes first (last run's failures, then the quickest)
+    if budgeted:
+        files = history.quickfirst(files, previous, history.load())
+
+    return files, select, previous
+
+def __execute(
+    args: Namespace,
+    files: dict[str, list],
+    select: dict[str, set[str]] | None,
+    reporters: list[Reporter],
+    probes: tuple[str, ...],
+    COLS: int
+) -> None:
+    """Run the collected tests, remember how they went, and print the summary."""
+    verbose: bool = args.verbose
+    workers: int = args.workers
     seperator: str = '=' * (COLS - 16) if verbose else '=' * (COLS - 15)
 
-    # scan directory for tests
-    files: dict[str, list] = scandir(path, start=starting, end=ending)
+    # last run's durations, so parallel runs can start the slow stuff first
+    timings: dict[str, dict[str, list]] | None = history.load() if workers > 1 else None
 
-    # print header info (gone add more as plugin manager and shit work in)
-    print(f"{Color.GREEN}{'=' * (COLS - 6)} TESTS START {'=' * (COLS - 6)}{Color.RESET}")
-    print(f"Platform: {Color.GREEN}{system()} {machine()}{Color.RESET}, Device Name: {Color.GREEN}{node()}{Color.RESET}")
-    print(f"Using: {Color.GREEN}Python {python_version()} [{python_compiler()}]{Color.RESET}")
-    print(f"Package Version: {Color.GREEN}ntest v{__version__}{Color.RESET}")
+    # tests history says are flaky (they get retried), keyed by the paths the files got collected under
+    shaky: dict[str, set[str]] = history.flaky() if args.flaky_retries > 0 or args.quarantine else {}
+    flaky: dict[str, set[str]] = {path: shaky[abspath(path)] for path in files if abspath(path) in shaky}
+
+    # --quarantine pulls them out to run on their own at the very end
+    held: dict[str, list] = {}
+    if args.quarantine and flaky:
+        files, held = history.quarantine(files, shaky)
+
+    # no stale worker profiles getting merged into this one
+    if "profile" in probes:
+        profiler.start()
 
     # CLOCK IT
     start: float = time()
 
     # run test and unpack info (static typing is my friend i'm super redundant)
-    testinfo: tuple[list, list, int] = runtest(files, ff, verbose, output)
-    passed: list = testinfo[0]
-    failed: list = testinfo[1]
+    testinfo: tuple[ResultView, ResultView, int] = runtest(
+        files, args.fail_fast, verbose, args.no_capture, workers, select, timings, args.async_concurrency, reporters, probes,
+        args.max_time, args.file_time, flaky, args.flaky_retries
+    )
+
+    passed: ResultView = testinfo[0]
+    failed: ResultView = testinfo[1]
     count: int = testinfo[2]
 
-    # print those summaries
-    print(f"\n{Color.GREEN}{len(passed)} passed{Color.RESET}, {Color.RED}{len(failed)} failed{Color.RESET}, {count} total")
-    
+    # everything, in run order. results only get rebuilt (one at a time) for the bits of the summary that need them
+    store: ResultStore = passed.store
+
+    # the quarantined flaky tests go after everything else (fail-fast stops before them), with whatever's left of --max-time.
+    # they're already known to be flaky, so fail-fast doesn't apply to them
+    later: ResultStore | None = None
+    if held and not (args.fail_fast and failed):
+        print(f"\n{Color.YELLOW}{'=' * (COLS - 6)} QUARANTINE {'=' * (COLS - 6)}{Color.RESET}")
+        left: float | None = max(args.max_time - (time() - start), 1e-6) if args.max_time else None
+        later = runtest(
+            held, False, verbose, args.no_capture, workers, select, timings, args.async_concurrency, reporters, probes,
+            left, args.file_time, flaky, args.flaky_retries
+        )[0].store
+
+    # remember how everything went for --lf / --ff-first next time, and how flaky it was (and what everything touched, for --affected)
+    history.record(chain(store, later or ()))
+    if "deps" in probes:
+        impact.record(chain(store, later or ()))
+
+    # get the reports on disk now, a watch session could sit there a while
+    for each in reporters:
+        each.checkpoint()
+
+    # print those summaries (tests that ran out of time count towards the total, but not as passes or fails)
+    notrun: str = f", {Color.YELLOW}{store.notrun} not run{Color.RESET}" if store.notrun else ""
+    print(f"\n{Color.GREEN}{len(passed)} passed{Color.RESET}, {Color.RED}{len(failed)} failed{Color.RESET}{notrun}, {count + store.notrun} total")
+
+    # quarantined ones get their own line, they don't count towards the real results
+    if later is not None:
+        held_notrun: str = f", {later.notrun} not run" if later.notrun else ""
+        print(f"{Color.YELLOW}Quarantined (known flaky): {later.passed} passed, {later.failed} failed{held_notrun}{Color.RESET}")
+
     # clock precision in a CLEAN MANNER
     precision: int = 3 if verbose else 2
+
+    # slowest tests of the run, if asked (0 means all of em)
+    if args.durations is not None:
+        slowest: list[TestResult] = store.slowest(args.durations)
+
+        print(f"\n{Color.YELLOW}Slowest {len(slowest)} test{'s' if len(slowest) != 1 else ''}:{Color.RESET}")
+        for result in slowest:
+            print(f"{result.duration:.{precision + 1}f}s {result.name} in {result.file}")
+
+    # the tests that held on to the most memory, and what lines are holding it
+    if args.memprofile:
+        measured = (store.record(index) for index, extras in store.extras.items() if extras.get("retained") or extras.get("peak"))
+        hungry: list[TestResult] = nlargest(5, measured, key=lambda result: (result.retained or 0, result.peak or 0))
+
+        print(f"\n{Color.YELLOW}Most memory retained:{Color.RESET}")
+        for result in hungry:
+            grew: str = f", rss {'+' if (result.rss or 0) >= 0 else ''}{__size(result.rss)}" if result.rss is not None else ""
+            print(f"{__size(result.retained or 0)} retained ({__size(result.peak or 0)} peak{grew}) {result.name} in {result.file}")
+
+            for site, size, blocks in result.sites or []:
+                print(f"    {__size(size)} in {blocks} block{'s' if blocks != 1 else ''} at {site}")
+
+    # everything profiled in every process, merged and saved (and the hottest functions, if asked)
+    if "profile" in probes:
+        stats = profiler.collect()
+        folded: str = profiler.write(stats, args.profile)
+        print(f"\n{Color.YELLOW}Profile saved to {args.profile} (flamegraph stacks in {folded}){Color.RESET}")
+
+        if args.profile_top:
+            hottest: list = sorted(stats.stats.items(), key=lambda entry: entry[1][2], reverse=True)[:args.profile_top] # type: ignore
+            print(f"{Color.YELLOW}Hottest {len(hottest)} function{'s' if len(hottest) != 1 else ''} (self time):{Color.RESET}")
+            for key, (_, calls, own, total, _) in hottest:
+                print(f"{own:.{precision + 1}f}s self {total:.{precision + 1}f}s total {calls} call{'s' if calls != 1 else ''} {profiler.label(key)}")
+
+    # the whole run's timeline, every process merged into one file
+    if args.trace:
+        events: int = timeline.write(args.trace)
+        print(f"\n{Color.YELLOW}Trace saved to {args.trace} ({events} events, open it in ui.perfetto.dev or chrome://tracing){Color.RESET}")
     finish: str = f"{time() - start:.{precision}f}"
 
+    # quarantined failures, just the last line of each (they're flaky, nobody's blocking on them)
+    if later is not None and later.failed:
+        print(f"\n{Color.YELLOW}Quarantined failures:{Color.RESET}")
+        for index, result in enumerate(later.results(False)):
+            print(f"{Color.YELLOW}{index + 1}. {result.name} in {result.file}:{Color.RESET}")
+            print(result.error.strip().splitlines()[-1] if result.error and result.error.strip() else f"{Color.YELLOW}No error message provided.{Color.RESET}")
+
     if failed:
         print(f"\n{Color.RED}Failures:{Color.RESET}")
 
@@ -77,9 +233,122 @@ def run() -> None:
             else:
                 print(f"{Color.YELLOW}No error message provided.{Color.RESET}")
 
+            # whatever it printed before dying (all of it with -v, the last few lines otherwise)
+            if result.output:
+                lines: list[str] = result.output.rstrip().splitlines()
+                shown: list[str] = lines if verbose else lines[-10:]
+                cut: str = f" (last {len(shown)} of {len(lines)} lines, -v for all)" if len(shown) < len(lines) else ""
+                print(f"{Color.YELLOW}Captured output{cut}:{Color.RESET}\n" + "\n".join(shown))
+
         # print summary of failures
         print(f"{Color.RED}{seperator} {len(failed)} test{'s' if len(failed) > 1 else ''} failed (took {finish}s) {seperator}{Color.RESET}")
-    
+
     # and if there isn't any
     else:
-        print(f"{Color.GREEN}{seperator} {len(passed)} tests passed (took {finish}s) {seperator}{Color.RESET}")
\ No newline at end of file
+        print(f"{Color.GREEN}{seperator} {len(passed)} tests passed (took {finish}s) {seperator}{Color.RESET}")
+
+    # tracebacks and output were parked on disk, nobody needs them now
+    store.close()
+    if later is not None:
+        later.close()
+
+def __watch(args: Namespace, reporters: list[Reporter], probes: tuple[str, ...], COLS: int) -> None:
+    """
+    Keep the process alive and rerun whatever a change could've broken every time a .py file changes (--watch).
+    Project modules get thrown out and re-imported, everything else (the interpreter, installed packages) stays warm.
+    A cycle that blows up (ex: a syntax error mid edit) just gets printed, and we keep waiting.
+    """
+    print(f"\n{Color.CYAN}Watching {args.path} for changes (ctrl+c to stop)...{Color.RESET}")
+
+    try:
+        for changed in changes(args.path):
+            print(f"\n{Color.CYAN}{'=' * (COLS - 5)} CHANGED {'=' * (COLS - 5)}{Color.RESET}")
+            for file in sorted(changed):
+                print(f"{Color.CYAN}{file}{Color.RESET}")
+
+            try:
+                # drop the stale modules, changed files get re-collected and only the affected tests rerun
+                forget()
+                files, select, _ = __select(args, True)
+                __execute(args, files, select, reporters, probes, COLS)
+
+            except Exception:
+                print(f"{Color.RED}{format_exc()}{Color.RESET}")
+
+            print(f"\n{Color.CYAN}Watching {args.path} for changes (ctrl+c to stop)...{Color.RESET}")
+
+    except KeyboardInterrupt:
+        print(f"\n{Color.YELLOW}Stopped watching.{Color.RESET}")
+
+def run() -> None:
+    # parse args using my function
+    args: Namespace = parse_args()
+
+    # get terminal width
+    COLS: int = (get_terminal_size(fallback=(80, 24)).columns - 1) // 2
+
+    # start from a clean slate if asked
+    if args.cache_clear:
+        cache.clear()
+
+    # fresh benchmark baselines get saved as the tests run
+    if args.benchmark_update:
+        history.clearbaselines()
+
+    # record the timeline from the very start, so collection is in it (workers spawned later pick it up from the environment)
+    if args.trace:
+        timeline.start()
+
+    # find what to run
+    files, select, previous = __select(args, args.affected)
+
+    # just list what we found and get out
+    if args.collect_only:
+        collected: int = 0
+        for file, funcs in files.items():
+            print(f"{Color.BLUE}{file}{Color.RESET}")
+            for func in funcs:
+                for name in names(func):
+                    print(f"  {name}")
+                    collected += 1
+
+        print(f"\n{collected} test{'s' if collected != 1 else ''} collected")
+        return
+
+    # print header info (gone add more as plugin manager and shit work in)
+    print(f"{Color.GREEN}{'=' * (COLS - 6)} TESTS START {'=' * (COLS - 6)}{Color.RESET}")
+    print(f"Platform: {Color.GREEN}{system()} {machine()}{Color.RESET}, Device Name: {Color.GREEN}{node()}{Color.RESET}")
+    print(f"Using: {Color.GREEN}Python {python_version()} [{python_compiler()}]{Color.RESET}")
+    print(f"Package Version: {Color.GREEN}ntest v{__version__}{Color.RESET}")
+
+    # nothing failed last time, so --lf just runs everything
+    if args.last_failed and not previous:
+        print(f"{Color.YELLOW}No previously failed tests, running everything.{Color.RESET}")
+
+    # --profile-top needs something to print from
+    if args.profile_top is not None and args.profile is None:
+        args.profile = "ntest.pstats"
+
+    # record what every test touches, for the next --affected run (watch mode reruns off the same map). memory goes last so it's innermost
+    probes: tuple[str, ...] = (
+        (("deps",) if args.affected or args.watch else ())
+        + (("profile",) if args.profile else ())
+        + (("memory",) if args.memprofile else ())
+    )
+
+    # reporters for every -o given, results get streamed to them as they finish
+    reporters: list[Reporter] = [reporter(file) for file in args.output or []]
+    for each in reporters:
+        each.start()
+
+    # run everything once, then (with --watch) keep rerunning what changes
+    try:
+        __execute(args, files, select, reporters, probes, COLS)
+
+        if args.watch:
+            __watch(args, reporters, probes, COLS)
+
+    # close the reports out no matter what (ctrl+c included)
+    finally:
+        for each in reporters:
+            each.close()
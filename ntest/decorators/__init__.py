@@ -2,23 +2,27 @@
 Where all the decorators live. 
 
 The list I currently have made is:
+    - @benchmark: Mark a test to be timed over calibrated rounds, and failed if it regresses past its saved baseline.
+    - @fixture: Mark a function as a fixture, passed into any test that has a parameter with its name (cached per scope).
     - @loop: Mark a test to be repeated a given number of times. Good for stress or unit testing
+    - @memlimit: Mark a test to be failed if it allocates more than the given number of bytes at its peak.
+    - @parametrize: Run a test once per case (list or generator, expanded lazily), each case its own result.
     - @retry: Mark a test to be retried if it fails, but only a given number of times.
     - @skip: Mark a test method to be skipped. Hey idiot, this is why your test isn't running.
     - @timeout: Mark a test to be failed if it takes longer than the given number of seconds.
 
 TBD:
     - @mock: decorator to mock objects or functions during a test
-    - @benchmark: decorator to unit test performance of a function
-    - @parameterize: decorator to run a test with different sets of arguments (maybe)
 """
 
 # what other decorators i should add:
 # - mock decorator to mock objects or functions during a test
-# - benchmark decorator to unit test performance of a function
-# - parametrize decorator to run a test with different sets of arguments (maybe)
 
+from .benchmark import benchmark
+from .fixture import fixture
 from .loop import loop
+from .memlimit import memlimit
+from .parametrize import parametrize
 from .patch import patch
 from .retry import retry
 from .skip import skip
@@ -26,7 +30,11 @@ from .timeout import timeout
 from .xfail import xfail
 
 __all__ = [
+    "benchmark",
+    "fixture",
     "loop",
+    "memlimit",
+    "parametrize",
     "patch",
     "skip",
     "retry",
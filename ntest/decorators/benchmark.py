@@ -0,0 +1,21 @@
+from types import FunctionType
+
+def benchmark(rounds: int = 5, warmup: int = 1, max_time: float = 1.0, regression: float = 10.0, reason: str = "") -> FunctionType:
+    """Mark a test to be benchmarked instead of just run once. The runner calibrates how many calls fit in a round,
+    times `rounds` rounds of them, and reports min/median/mean/stddev/ops per second. The first run saves a baseline,
+    and after that the test fails if its median gets more than `regression` percent slower than it.
+
+    Args:
+        rounds (int): How many timed rounds to take.
+        warmup (int): Untimed rounds to run first (caches, jit-ish stuff, lazy imports).
+        max_time (float): Roughly how many seconds all the timed rounds together should take.
+        regression (float): How many percent slower than the baseline median is allowed before failing.
+        reason (str): The reason for benchmarking the test.
+    """
+
+    def decorator(fn: FunctionType) -> FunctionType:
+        config: dict[str, float] = {"rounds": rounds, "warmup": warmup, "max_time": max_time, "regression": regression}
+        fn.__benchmark__ = (config, f"benchmarking function {fn.__name__} ({rounds} rounds, ~{max_time}s), reason: {reason}" if reason else "") # type: ignore
+        return fn
+    
+    return decorator
@@ -0,0 +1,30 @@
+from types import FunctionType
+from typing import Callable
+
+from ..fixtures import SCOPES, register
+
+def fixture(scope: str | FunctionType = "function") -> FunctionType | Callable[[FunctionType], FunctionType]:
+    """Mark a function as a fixture. Any test (or other fixture) with a parameter of the same name gets its value passed in.
+    It's built the first time something asks for it and cached for its scope: one per test ("function"), per TestCase ("class"),
+    per test file ("module"), or once for the whole run ("session", once per worker with -n).
+    Return the value, or yield it and put the cleanup after the yield. Teardowns run newest first when their scope ends. Works bare too (@fixture).
+
+    Args:
+        scope (str): "function", "class", "module" or "session".
+    """
+
+    def decorator(fn: FunctionType) -> FunctionType:
+        fn.__fixture__ = chosen # type: ignore
+        register(fn)
+        return fn
+
+    # bare @fixture, no call
+    if callable(scope):
+        chosen: str = "function"
+        return decorator(scope)
+
+    if scope not in SCOPES:
+        raise ValueError(f"fixture scope has to be one of {', '.join(SCOPES)}, got: {scope}")
+
+    chosen = scope
+    return decorator
@@ -0,0 +1,14 @@
+from types import FunctionType
+
+def memlimit(limit: int, reason: str = "") -> FunctionType:
+    """Mark a test to be failed if it allocates more than the given number of bytes at once (measured with tracemalloc).
+
+    Args:
+        limit (int): The most bytes the test can have allocated at its peak.
+        reason (str): The reason for limiting the test.
+    """
+    def decorator(fn: FunctionType) -> FunctionType:
+        fn.__memlimit__ = (limit, f"failing function {fn.__name__} if it uses more than {limit} bytes, reason: {reason}" if reason else "") # type: ignore
+        return fn
+
+    return decorator
\ No newline at end of file
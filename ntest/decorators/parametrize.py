@@ -0,0 +1,21 @@
+from types import FunctionType
+from typing import Any, Callable, Iterable
+
+def parametrize(names: str | Iterable[str], cases: Iterable[Any] | Callable[[], Iterable[Any]], reason: str = "") -> FunctionType:
+    """Run a test once per case, each case reporting as its own result (ex: test_add[1-2-3]). Cases get passed in by parameter name.
+    cases can be a list, a generator, or a function that returns either. Nothing gets expanded until the test actually runs, and then
+    one case at a time, so a generator with 50,000 cases never has them all in memory. With -n, cases are dealt out across workers
+    (a bare generator can only be walked once, so pass a function that makes one if you want it split up or looped).
+
+    Args:
+        names (str | Iterable[str]): The parameter names, comma separated ("a, b, expected") or as a list.
+        cases (Iterable[Any] | Callable[[], Iterable[Any]]): One value per case with a single name, otherwise one tuple (or list) of values per case.
+        reason (str): The reason for parametrizing the test.
+    """
+    params: tuple[str, ...] = tuple(name.strip() for name in (names.split(",") if isinstance(names, str) else names))
+
+    def decorator(fn: FunctionType) -> FunctionType:
+        fn.__parametrize__ = ((params, cases), f"parametrizing function {fn.__name__} over {', '.join(params)}, reason: {reason}" if reason else "") # type: ignore
+        return fn
+
+    return decorator
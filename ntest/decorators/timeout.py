@@ -1,14 +1,19 @@
 from types import FunctionType
 
-def timeout(seconds: float, reason: str) -> FunctionType:
+def timeout(seconds: float, reason: str, mode: str = "process") -> FunctionType:
     """Mark a test to be failed if it takes longer than the given number of seconds.
     
     Args:
         seconds (int): The maximum number of seconds a test can take before failing.
+        reason (str): The reason for the timeout.
+        mode (str): How it gets enforced. "process" runs it in a worker that gets killed (works on anything, costs a process),
+                    "signal" interrupts it in process with SIGALRM, and "thread" with a watchdog thread (see watchdog.armed).
     """
+    if mode not in ("process", "signal", "thread"):
+        raise ValueError(f"timeout mode has to be process, signal or thread, got: {mode}")
 
     def decorator(fn: FunctionType) -> FunctionType:
-        fn.__timeout__ = (seconds, f"failing function {fn.__name__} if test is longer than {seconds} seconds, reason: {reason}") # type: ignore
+        fn.__timeout__ = (seconds, f"failing function {fn.__name__} if test is longer than {seconds} seconds, reason: {reason}", mode) # type: ignore
         return fn
     
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,252 @@
+# fixtures: values tests ask for by parameter name. built the first time something needs them, cached for their scope
+from inspect import Parameter, isasyncgenfunction, isgeneratorfunction, signature, unwrap
+from traceback import format_exc
+from typing import Any, Callable, Iterable
+from types import ModuleType
+from os.path import abspath
+from importlib import import_module
+from sys import stderr, modules
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+import atexit
+
+# narrowest to widest
+SCOPES: tuple[str, ...] = ("function", "class", "module", "session")
+
+# module level name a test file lists its shared fixture modules in, without having to import from them (ex: ntest_fixtures = ["tests.shared"])
+SHARED: str = "ntest_fixtures"
+
+# every fixture defined so far: name -> defining file (see origin) -> function (a re-imported module just replaces its own).
+# not by module name: test files get imported under their bare file name, so a/api_test.py and b/api_test.py would share one
+__registry: dict[str, dict[str, Callable[..., Any]]] = {}
+
+# built values and their teardowns, per slot (scope, key). teardowns are in build order, so deps always come first
+__values: dict[tuple[str, str], dict[str, Any]] = {}
+__finalizers: dict[tuple[str, str], list[Callable[[], Any]]] = {}
+
+def register(fn: Callable[..., Any]) -> None:
+    """
+    Make a fixture findable by name (@fixture does this).
+
+    Args:
+        fn (Callable[..., Any]): The fixture function, with __fixture__ set to its scope.
+    """
+    __registry.setdefault(fn.__name__, {})[origin(namespace(fn))] = fn
+
+def origin(space: dict[str, Any]) -> str:
+    """Which file a module (by its globals) came from, its name if it doesn't have one. Tells apart test files with the same name."""
+    file: Any = space.get("__file__")
+    return abspath(file) if isinstance(file, str) else str(space.get("__name__"))
+
+def namespace(fn: Callable[..., Any]) -> dict[str, Any]:
+    """The globals of the module fn was written in (thru any decorators), which is what decides the fixtures it can see."""
+    try:
+        return unwrap(fn).__globals__ # type: ignore
+
+    # not a plain function (ex: a callable object), go by its module
+    except (AttributeError, ValueError):
+        return getattr(modules.get(getattr(fn, "__module__", "")), "__dict__", {})
+
+def lookup(name: str, *where: dict[str, Any]) -> Callable[..., Any] | None:
+    """
+    Find the fixture a test (or another fixture) means by a parameter name. Only fixtures the module asking can see count, in this order:
+    one defined in it, one it imported (from shared import db, or *), one in a module it imported (import shared),
+    then one in the modules it lists in ntest_fixtures. A fixture with the same name in some unrelated test file never does.
+
+    Args:
+        name (str): The parameter name.
+        *where (dict[str, Any]): Globals of the modules asking (see namespace), tried in order. A fixture's deps look in its own module first, then the test's.
+
+    Returns:
+        Callable[..., Any] | None: The fixture function, or None if none of them can see one.
+    """
+    for space in where:
+        # defined in the module itself, or imported into it (maybe under another name)
+        value: Any = space.get(name)
+        if callable(value) and hasattr(value, "__fixture__"):
+            return value
+
+        # a module it imported
+        found: dict[str, Callable[..., Any]] = __registry.get(name, {})
+        for value in list(space.values()):
+            if isinstance(value, ModuleType) and origin(vars(value)) in found:
+                return found[origin(vars(value))]
+
+        # its shared fixture modules, imported now if nothing has yet (that's what registers them)
+        shared: Any = space.get(SHARED, ())
+        for other in [shared] if isinstance(shared, str) else shared:
+            defined: str = origin(vars(modules.get(other) or import_module(other)))
+            if defined in __registry.get(name, {}):
+                return __registry[name][defined]
+
+    return None
+
+def params(fn: Callable[..., Any]) -> list[str]:
+    """Names of fn's parameters that fixtures could fill (no *args/**kwargs, no positional only)."""
+    try:
+        parameters = signature(fn).parameters.values()
+
+    # builtins and such, nothing to inject
+    except (TypeError, ValueError):
+        return []
+
+    return [p.name for p in parameters if p.kind in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY)]
+
+def __slot(scope: str, module: str, owner: type | None) -> tuple[str, str]:
+    """Where a fixture of this scope gets cached for this test. Class scope outside a TestCase is the same as module scope."""
+    if scope == "session":
+        return ("session", "")
+
+    if scope == "class" and owner is not None:
+        return ("class", f"{module}.{owner.__qualname__}")
+
+    if scope in ("class", "module"):
+        return ("module", module)
+
+    return ("function", "")
+
+def __finish(gen: Any, run: Callable[[Any], Any]) -> None:
+    """Run a yield fixture's teardown (everything after the yield). Yielding twice is a bug in the fixture."""
+    try:
+        if hasattr(gen, "__anext__"):
+            run(gen.__anext__())
+        else:
+            next(gen)
+
+    except (StopIteration, StopAsyncIteration):
+        return
+
+    raise RuntimeError(f"fixture {gen.__name__} yielded more than once")
+
+def __build(
+    name: str,
+    module: str,
+    owner: type | None,
+    run: Callable[[Any], Any],
+    chain: tuple[str, ...],
+    below: str,
+    where: tuple[dict[str, Any], ...]
+) -> Any:
+    """Get (or build, deps first) the value of one fixture for a test in module (its file, see origin) / owner. chain is who's asking,
+    for cycle and scope errors, where is the globals of the modules to look for it in."""
+    fixture: Callable[..., Any] | None = lookup(name, *where)
+    if fixture is None:
+        asker: str = f"fixture '{chain[-1]}'" if chain else f"tests in {module}"
+        raise LookupError(
+            f"fixture '{name}' not found for {asker}: define it in the same file, import it (or the module it's in), "
+            f"or list that module in {SHARED}"
+        )
+
+    if name in chain:
+        raise RecursionError(f"fixture cycle: {' -> '.join(chain + (name,))}")
+
+    # a wide fixture can't hang on to a narrower one, it'd outlive it
+    scope: str = getattr(fixture, "__fixture__", "function")
+    if SCOPES.index(scope) < SCOPES.index(below):
+        raise ValueError(f"{scope} scoped fixture '{name}' can't be used by {below} scoped fixture '{chain[-1]}'")
+
+    slot: tuple[str, str] = __slot(scope, module, owner)
+    cache: dict[str, Any] = __values.setdefault(slot, {})
+    key: str = f"{origin(namespace(fixture))}::{fixture.__name__}"
+    if key in cache:
+        return cache[key]
+
+    # deps first, so they're already there (and get torn down after us)
+    home: dict[str, Any] = namespace(fixture)
+    kwargs: dict[str, Any] = {
+        dep: __build(dep, module, owner, run, chain + (name,), scope, (home,) + tuple(space for space in where if space is not home))
+        for dep in params(fixture)
+    }
+
+    # yield fixtures: up to the yield is setup, the rest is teardown
+    if isgeneratorfunction(fixture) or isasyncgenfunction(fixture):
+        gen = fixture(**kwargs)
+        value: Any = run(gen.__anext__()) if isasyncgenfunction(fixture) else next(gen)
+        __finalizers.setdefault(slot, []).append(lambda: __finish(gen, run))
+
+    else:
+        value = run(fixture(**kwargs))
+
+    cache[key] = value
+    return value
+
+def resolve(
+    fn: Callable[..., Any],
+    owner: type | None = None,
+    run: Callable[[Any], Any] = lambda value: value,
+    given: Iterable[str] = ()
+) -> dict[str, Any]:
+    """
+    Build the keyword arguments for a test: one value per parameter that names a fixture, pulled from its scope's cache
+    or built right now (lazily, only fixtures something actually asks for ever get built).
+    Parameters with a default that don't name a fixture are left alone, and so is anything in given (ex: @parametrize values).
+
+    Args:
+        fn (Callable[..., Any]): The test function or bound TestCase method.
+        owner (type | None): The TestCase subclass it belongs to (for class scope), None for plain functions.
+        run (Callable[[Any], Any]): Turns what a fixture returned into its value (the runner awaits async fixtures with it).
+        given (Iterable[str]): Parameter names that already have a value.
+
+    Returns:
+        dict[str, Any]: Parameter name -> fixture value.
+
+    Raises:
+        LookupError: A parameter with no default doesn't name any fixture the test's module can see (see lookup).
+        ValueError: A fixture depends on one with a narrower scope.
+        RecursionError: Fixtures depend on each other in a circle.
+    """
+    space: dict[str, Any] = namespace(fn)
+    module: str = origin(space)
+    kwargs: dict[str, Any] = {}
+    defaults: dict[str, bool] = {}
+
+    try:
+        defaults = {p.name: p.default is not Parameter.empty for p in signature(fn).parameters.values()}
+
+    except (TypeError, ValueError):
+        pass
+
+    for name in params(fn):
+        if name in given or (defaults.get(name) and lookup(name, space) is None):
+            continue
+
+        kwargs[name] = __build(name, module, owner, run, (), "function", (space,))
+
+    return kwargs
+
+def teardown(*scopes: str) -> str | None:
+    """
+    Tear down every cached fixture in the given scopes (in the order given), newest first so dependents go before
+    what they depend on. Every teardown runs even if one blows up.
+
+    Args:
+        *scopes (str): Which scopes to clear (default all of them, narrowest first).
+
+    Returns:
+        str | None: The tracebacks of any teardowns that failed, or None if they all went fine.
+    """
+    errors: list[str] = []
+
+    for scope in scopes or SCOPES:
+        for slot in [slot for slot in __values if slot[0] == scope]:
+            __values.pop(slot, None)
+
+            for finalizer in reversed(__finalizers.pop(slot, [])):
+                try:
+                    finalizer()
+
+                except Exception:
+                    errors.append(format_exc())
+
+    return "".join(errors) or None
+
+def __atexit() -> None:
+    """Whatever's still alive when the process exits (ex: session fixtures in a worker) gets torn down here."""
+    # nobody's capturing anymore at this point, so swallow what the fixtures print ourselves
+    with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+        errors: str | None = teardown()
+
+    if errors:
+        print(f"fixture teardown failed:\n{errors}", file=stderr)
+
+atexit.register(__atexit)
@@ -0,0 +1,385 @@
+# the cache dir helpers
+from . import cache
+
+# paths and types (plus hashing and a heap for sharding)
+from os.path import abspath, exists, relpath
+from hashlib import sha256
+from heapq import heapify, heappop, heappush
+from typing import Any, Iterable
+from json import load as json_load # for --shard-timings, which lives outside the cache
+from .classes.TestResult import TestResult
+
+# files inside .ntest_cache/ the results and benchmark baselines live in
+RESULTS: str = "results.json"
+BASELINES: str = "benchmarks.json"
+
+# the benchmark baselines, read once per process the first time a @benchmark test asks (see baseline)
+__baselines: dict[str, dict[str, Any]] | None = None
+
+# flakiness is a moving average: every run keeps this much of the old score, and the rest comes from how that run went
+DECAY: float = 0.8
+
+# tests scoring at least this count as flaky (ex: failing then passing on a retry twice in a row, or flipping pass/fail 4 runs straight)
+FLAKY: float = 0.25
+
+def load() -> dict[str, dict[str, list]]:
+    """
+    Load the results store: absolute file path -> test name -> [passed (0/1), duration, flakiness (0-1)].
+    Entries saved before flakiness was tracked only have the first two.
+
+    Returns:
+        dict[str, dict[str, list]]: Everything we remember, or {} on a first run.
+    """
+    return cache.read(RESULTS, {})
+
+def __flakiness(old: list | None, result: TestResult) -> float:
+    """
+    A test's new flakiness score. Failing and then passing in the same run (on a @retry or an automatic retry) is as flaky as it gets,
+    coming out different from last run counts half (could just be a real break or fix, so it takes a few in a row).
+
+    Args:
+        old (list | None): Its entry from last time, if it has one.
+        result (TestResult): How it went this run.
+
+    Returns:
+        float: The score, 0 (solid) to 1 (flaky every single run).
+    """
+    score: float = old[2] if old and len(old) > 2 else 0.0
+    event: float = 0.0
+
+    if result.passed and (result.attempts or 1) > 1:
+        event = 1.0
+    elif old and bool(old[0]) != result.passed:
+        event = 0.5
+
+    return round(score * DECAY + event * (1 - DECAY), 4)
+
+def record(results: Iterable[TestResult]) -> None:
+    """
+    Save the results of this run on top of what's already stored (and update every test's flakiness). Tests that didn't run this time
+    (--lf, fail-fast, etc) keep their old entries, and files that don't exist anymore get dropped.
+
+    Args:
+        results (Iterable[TestResult]): Everything that ran.
+    """
+    store: dict[str, dict[str, list]] = load()
+
+    for result in results:
+        tests: dict[str, list] = store.setdefault(abspath(result.file), {})
+        tests[result.name] = [int(result.passed), round(result.duration, 6), __flakiness(tests.get(result.name), result)]
+
+    # evict files that got deleted
+    for key in [key for key in store if not exists(key)]:
+        del store[key]
+
+    cache.write(RESULTS, store)
+
+def failures() -> dict[str, set[str]]:
+    """
+    Every test that failed the last time it ran, grouped by file.
+
+    Returns:
+        dict[str, set[str]]: Absolute file path -> names of its failing tests. Files with no failures aren't in here.
+    """
+    found: dict[str, set[str]] = {}
+    for file, tests in load().items():
+        failed: set[str] = {name for name, entry in tests.items() if not entry[0]}
+        if failed:
+            found[file] = failed
+
+    return found
+
+def flaky() -> dict[str, set[str]]:
+    """
+    Every test whose flakiness score is at least FLAKY, grouped by file.
+
+    Returns:
+        dict[str, set[str]]: Absolute file path -> names of its flaky tests. Files with none aren't in here.
+    """
+    found: dict[str, set[str]] = {}
+    for file, tests in load().items():
+        shaky: set[str] = {name for name, entry in tests.items() if len(entry) > 2 and entry[2] >= FLAKY}
+        if shaky:
+            found[file] = shaky
+
+    return found
+
+def matches(func: Any, names: set[str]) -> bool:
+    """
+    Check if a collected unit (function or TestCase subclass) owns any of the given test names.
+    Classes own Class (for run) and Class.<anything>, so inherited methods count even on a LazyTest. @parametrize cases (name[id]) count for their test.
+
+    Args:
+        func (Any): A test function, TestCase subclass or LazyTest.
+        names (set[str]): Formatted test names.
+
+    Returns:
+        bool: True if at least one of the names belongs to it.
+    """
+    unit: str = func.__name__
+    return any(name == unit or name.startswith((f"{unit}.", f"{unit}[")) for name in names)
+
+def lastfailed(files: dict[str, list], failed: dict[str, set[str]]) -> tuple[dict[str, list], dict[str, set[str]]]:
+    """
+    Cut collected files down to just what failed last time (--lf).
+
+    Args:
+        files (dict[str, list]): What scandir found.
+        failed (dict[str, set[str]]): What failures() returned.
+
+    Returns:
+        tuple[dict[str, list], dict[str, set[str]]]: The trimmed files, and a per-path selection of test names for runtest.
+    """
+    kept: dict[str, list] = {}
+    select: dict[str, set[str]] = {}
+
+    for path, funcs in files.items():
+        names: set[str] = failed.get(abspath(path), set())
+        units: list = [func for func in funcs if matches(func, names)]
+
+        if units:
+            kept[path] = units
+            select[path] = names
+
+    return kept, select
+
+def failedfirst(files: dict[str, list], failed: dict[str, set[str]]) -> dict[str, list]:
+    """
+    Reorder collected files so last run's failures go first (--ff-first). Files with failures move up,
+    and inside each file the failing units move up. Everything else keeps its normal order.
+
+    Args:
+        files (dict[str, list]): What scandir found.
+        failed (dict[str, set[str]]): What failures() returned.
+
+    Returns:
+        dict[str, list]: Same tests, new order.
+    """
+    # sorted is stable, so False (has a failure) sorts first and ties keep their order
+    ordered: list[str] = sorted(files, key=lambda path: abspath(path) not in failed)
+
+    result: dict[str, list] = {}
+    for path in ordered:
+        names: set[str] = failed.get(abspath(path), set())
+        result[path] = sorted(files[path], key=lambda func: not matches(func, names))
+
+    return result
+
+def quarantine(files: dict[str, list], shaky: dict[str, set[str]]) -> tuple[dict[str, list], dict[str, list]]:
+    """
+    Pull every unit with a flaky test in it out of the collected files, so they can run on their own after everything else (--quarantine).
+    Goes by unit, so a class or @parametrize test with one flaky test in it goes along with it.
+
+    Args:
+        files (dict[str, list]): What scandir found.
+        shaky (dict[str, set[str]]): What flaky() returned.
+
+    Returns:
+        tuple[dict[str, list], dict[str, list]]: (everything else, the quarantined units). Files only show up in the ones they have units in.
+    """
+    kept: dict[str, list] = {}
+    held: dict[str, list] = {}
+
+    for path, funcs in files.items():
+        names: set[str] = shaky.get(abspath(path), set())
+        stable: list = [func for func in funcs if not matches(func, names)]
+
+        # a file with nothing flaky (or nothing at all) stays exactly as it was
+        if len(stable) < len(funcs):
+            held[path] = [func for func in funcs if matches(func, names)]
+        if stable or not funcs:
+            kept[path] = stable
+
+    return kept, held
+
+def estimate(path: str, func: Any, store: dict[str, dict[str, list]]) -> float | None:
+    """
+    Guess how long a unit (function, or a TestCase subclass with all its methods) takes from its last recorded durations.
+
+    Args:
+        path (str): The file the unit is in.
+        func (Any): The function, TestCase subclass or LazyTest.
+        store (dict[str, dict[str, list]]): What load() returned.
+
+    Returns:
+        float | None: Seconds, or None if we've never seen it run.
+    """
+    tests: dict[str, list] = store.get(abspath(path), {})
+    unit: str = func.__name__
+    times: list[float] = [entry[1] for name, entry in tests.items() if name == unit or name.startswith((f"{unit}.", f"{unit}["))]
+
+    return sum(times) if times else None
+
+def longestfirst(units: list[tuple[str, Any]], store: dict[str, dict[str, list]]) -> list[int]:
+    """
+    Order units longest-processing-time-first using recorded durations, so the slow stuff starts early
+    and doesn't end up alone on one worker at the very end. Units we've never timed get the average of the ones we have.
+    With no history at all, the order doesn't change.
+
+    Args:
+        units (list[tuple[str, Any]]): (path, func) pairs.
+        store (dict[str, dict[str, list]]): What load() returned.
+
+    Returns:
+        list[int]: Indices into units, in the order they should be started.
+    """
+    guesses: list[float | None] = [estimate(path, func, store) for path, func in units]
+    known: list[float] = [guess for guess in guesses if guess is not None]
+    if not known:
+        return list(range(len(units)))
+
+    # unknowns get the average, and sorted is stable so ties keep file order
+    average: float = sum(known) / len(known)
+    weights: list[float] = [average if guess is None else guess for guess in guesses]
+    return sorted(range(len(units)), key=lambda index: -weights[index])
+
+def quickfirst(files: dict[str, list], failed: dict[str, set[str]], store: dict[str, dict[str, list]]) -> dict[str, list]:
+    """
+    Reorder collected files so the tests most worth running go first, for when there might not be time for all of them (--max-time / --file-time).
+    Last run's failures go first, then the quickest stuff (the most tests per second). Files move by that (failures, then recorded total time),
+    and so does every unit inside each file. Units we've never timed get the average of the ones we have. With no history, nothing moves.
+
+    Args:
+        files (dict[str, list]): What scandir found.
+        failed (dict[str, set[str]]): What failures() returned.
+        store (dict[str, dict[str, list]]): What load() returned.
+
+    Returns:
+        dict[str, list]: Same tests, new order.
+    """
+    guesses: dict[str, list[float | None]] = {path: [estimate(path, func, store) for func in funcs] for path, funcs in files.items()}
+    known: list[float] = [guess for each in guesses.values() for guess in each if guess is not None]
+    if not known and not failed:
+        return files
+
+    # unknowns get the average, and sorted is stable so ties keep file order
+    average: float = sum(known) / len(known) if known else 0.0
+    weights: dict[str, list[float]] = {path: [average if guess is None else guess for guess in each] for path, each in guesses.items()}
+    ordered: list[str] = sorted(files, key=lambda path: (abspath(path) not in failed, sum(weights[path])))
+
+    result: dict[str, list] = {}
+    for path in ordered:
+        names: set[str] = failed.get(abspath(path), set())
+        order: list[int] = sorted(range(len(files[path])), key=lambda index: (not matches(files[path][index], names), weights[path][index]))
+        result[path] = [files[path][index] for index in order]
+
+    return result
+
+def bins(weights: list[float], total: int) -> list[int]:
+    """
+    Spread weighted items over total bins as evenly as we can: heaviest first, each into the lightest bin so far (greedy LPT).
+    Fully deterministic, ties go to the lower bin.
+
+    Args:
+        weights (list[float]): How heavy each item is.
+        total (int): How many bins.
+
+    Returns:
+        list[int]: The bin each item landed in.
+    """
+    placed: list[int] = [0] * len(weights)
+    heap: list[tuple[float, int]] = [(0.0, index) for index in range(total)]
+    heapify(heap)
+
+    for item in sorted(range(len(weights)), key=lambda item: -weights[item]):
+        load, index = heappop(heap)
+        placed[item] = index
+        heappush(heap, (load + weights[item], index))
+
+    return placed
+
+def sharedtimings(file: str) -> dict[str, float] | None:
+    """
+    Read a --shard-timings file: a results.json (same format as load()) from one run of the whole suite, that every node gets a copy of.
+    File keys can be absolute (as saved) or relative to where ntest runs.
+
+    Args:
+        file (str): Path to it.
+
+    Returns:
+        dict[str, float] | None: Test file path relative to where ntest runs -> its total recorded seconds, or None if it can't be read.
+    """
+    try:
+        with open(file, "r", encoding="utf-8") as handle:
+            store: Any = json_load(handle)
+
+        return {relpath(abspath(key)): sum(float(entry[1]) for entry in tests.values()) for key, tests in store.items()}
+
+    except (OSError, ValueError, TypeError, AttributeError, IndexError):
+        return None
+
+def shard(paths: list[str], index: int, total: int, timings: dict[str, float] | None = None) -> tuple[set[str], bool]:
+    """
+    Pick the test files that belong to shard index of total (--shard). Works per file, so files from other shards never get collected.
+    By default each file goes by a stable hash of its path relative to where ntest runs, which every node works out the same way.
+    Only with a shared timings file (see sharedtimings) that has every single file in it do files go into timing-balanced bins instead.
+    A node's own history never comes into it: nodes record different files at different times, and two nodes splitting
+    off different history would run some files twice and others never.
+
+    Args:
+        paths (list[str]): Every matching test file (from scanner.find).
+        index (int): This shard, 1 based.
+        total (int): How many shards there are.
+        timings (dict[str, float] | None): What sharedtimings() read (--shard-timings), the same file on every node.
+
+    Returns:
+        tuple[set[str], bool]: Absolute paths of the files this shard should run, and whether they were split by timings.
+    """
+    # same order on every machine no matter what listdir felt like doing
+    names: list[str] = sorted(relpath(abspath(path)) for path in paths)
+
+    # timing balanced bins, only if the shared file knows about everything (a file missing from it means it's stale)
+    balanced: bool = timings is not None and all(name in timings for name in names)
+    if balanced:
+        placed: list[int] = bins([timings[name] for name in names], total) # type: ignore
+
+    # hash it
+    else:
+        placed = [int(sha256(name.encode()).hexdigest(), 16) % total for name in names]
+
+    return {abspath(name) for name, spot in zip(names, placed) if spot == index - 1}, balanced
+
+def baseline(path: str, name: str) -> dict[str, float] | None:
+    """
+    Get the saved benchmark baseline for a test.
+
+    Args:
+        path (str): The file the test is in.
+        name (str): The formatted test name.
+
+    Returns:
+        dict[str, float] | None: The stats saved the first time it ran, or None if there aren't any.
+    """
+    global __baselines
+    if __baselines is None:
+        __baselines = cache.read(BASELINES, {})
+
+    return __baselines.get(abspath(path), {}).get(name)
+
+def savebaselines(fresh: Iterable[tuple[str, str, dict[str, float]]]) -> None:
+    """
+    Save benchmark stats as baselines for the tests that didn't have one yet (or after --benchmark-update).
+    The runner calls this once at the end of a run with everything it collected, -n workers never write it themselves.
+
+    Args:
+        fresh (Iterable[tuple[str, str, dict[str, float]]]): (file the test is in, formatted test name, what the benchmark measured).
+    """
+    global __baselines
+    store: dict[str, dict[str, Any]] = cache.read(BASELINES, {})
+    changed: bool = False
+
+    for path, name, stats in fresh:
+        store.setdefault(abspath(path), {})[name] = stats
+        changed = True
+
+    if changed:
+        cache.write(BASELINES, store)
+
+    # so the next run in this process (--watch) compares against these
+    __baselines = store
+
+def clearbaselines() -> None:
+    """Forget every benchmark baseline so the next run saves fresh ones (--benchmark-update)."""
+    global __baselines
+    cache.write(BASELINES, {})
+    __baselines = {}
@@ -0,0 +1,171 @@
+# the cache dir helpers, and how collected tests report their names
+from . import cache
+from .scanner import names
+
+# paths, hashing and types
+from os import stat
+from os.path import abspath, exists
+from hashlib import sha256
+from typing import Any, Iterable
+from .classes.TestResult import TestResult
+
+# file inside .ntest_cache/ the dependency map lives in
+AFFECTED: str = "affected.json"
+
+def load() -> dict[str, Any]:
+    """
+    Load the dependency map:
+    - "files": every source file some test depends on, as [mtime_ns, size, sha256] from when it was last recorded
+    - "tests": test file -> test name -> indexes into "paths" (the files it ran code from)
+    - "paths": the file paths those indexes point at (so each path is only stored once)
+
+    Returns:
+        dict[str, Any]: The map, empty on a first run.
+    """
+    return cache.read(AFFECTED, {"files": {}, "tests": {}, "paths": []})
+
+def __fingerprint(path: str, known: list | None = None) -> list | None:
+    """
+    [mtime_ns, size, sha256] for a file, or None if it's gone. If it has the same mtime + size as known, the hash
+    is reused without reading the file (same trick as the collection cache).
+    """
+    try:
+        info = stat(path)
+
+    except OSError:
+        return None
+
+    if known is not None and known[0] == info.st_mtime_ns and known[1] == info.st_size:
+        return known
+
+    with open(path, "rb") as file:
+        return [info.st_mtime_ns, info.st_size, sha256(file.read()).hexdigest()]
+
+def changed(store: dict[str, Any]) -> set[str]:
+    """
+    Every recorded source file whose content isn't what it was when its tests last ran (deleted files count).
+    Touched but unchanged files don't.
+
+    Args:
+        store (dict[str, Any]): What load() returned.
+
+    Returns:
+        set[str]: Absolute paths of the changed files.
+    """
+    found: set[str] = set()
+    for path, known in store["files"].items():
+        now: list | None = __fingerprint(path, known)
+        if now is None or now[2] != known[2]:
+            found.add(path)
+
+    return found
+
+def affected(
+    files: dict[str, list],
+    store: dict[str, Any],
+    extra: dict[str, set[str]] | None = None
+) -> tuple[dict[str, list], dict[str, set[str]]]:
+    """
+    Cut collected files down to the tests a change could have broken (--affected): anything that ran code from a changed file,
+    anything we have no record of (new tests, new files, or tests that never finished), plus whatever's in extra (ex: last run's failures).
+
+    Args:
+        files (dict[str, list]): What scandir found.
+        store (dict[str, Any]): What load() returned.
+        extra (dict[str, set[str]] | None): Absolute file path -> more test names to keep no matter what.
+
+    Returns:
+        tuple[dict[str, list], dict[str, set[str]]]: The trimmed files, and a per-path selection of test names for runtest.
+    """
+    dirty: set[str] = changed(store)
+    paths: list[str] = store["paths"]
+
+    kept: dict[str, list] = {}
+    select: dict[str, set[str]] = {}
+
+    for path, funcs in files.items():
+        recorded: dict[str, list[int]] = store["tests"].get(abspath(path), {})
+        forced: set[str] = (extra or {}).get(abspath(path), set())
+        wanted: set[str] = set()
+        units: list = []
+
+        # @parametrize cases get recorded one by one (name[id]), a change to what any of them ran reruns every case
+        grouped: dict[str, set[int]] = {}
+        for name, indexes in recorded.items():
+            grouped.setdefault(name.split("[", 1)[0], set()).update(indexes)
+
+        for func in funcs:
+            picked: set[str] = set()
+            for name in names(func):
+                if name in forced or name not in grouped or any(paths[index] in dirty for index in grouped[name]):
+                    picked.add(name)
+
+                # otherwise just the cases that have to run anyway
+                else:
+                    picked |= {each for each in forced if each.startswith(f"{name}[")}
+
+            if picked:
+                units.append(func)
+                wanted |= picked
+
+        if units:
+            kept[path] = units
+            select[path] = wanted
+
+    return kept, select
+
+def record(results: Iterable[TestResult]) -> None:
+    """
+    Save what every test in this run depended on, and fingerprint those files as they are right now.
+    Tests that didn't run (or weren't probed) keep their old entries, and files that don't exist anymore get dropped.
+
+    Args:
+        results (Iterable[TestResult]): Everything that ran, with deps filled in.
+    """
+    store: dict[str, Any] = load()
+
+    # go back to plain paths so the index table can be rebuilt from scratch
+    paths: list[str] = store["paths"]
+    tests: dict[str, dict[str, list[str]]] = {
+        file: {name: [paths[index] for index in indexes] for name, indexes in entries.items()}
+        for file, entries in store["tests"].items()
+    }
+
+    ran: set[tuple[str, str]] = set()
+    for result in results:
+        if result.deps is not None:
+            tests.setdefault(abspath(result.file), {})[result.name] = result.deps
+            ran.add((abspath(result.file), result.name))
+
+    # files some test that DIDN'T run depends on keep their old fingerprint, so a change stays a change till those run too
+    waiting: set[str] = {
+        dep for file, entries in tests.items() for name, deps in entries.items() if (file, name) not in ran for dep in deps
+    }
+
+    # fingerprint everything still depended on, dropping files (and tests) that are gone
+    files: dict[str, list] = {}
+    for entries in tests.values():
+        for deps in entries.values():
+            for dep in deps:
+                if dep in files:
+                    continue
+
+                known: list | None = store["files"].get(dep)
+                now: list | None = __fingerprint(dep, known)
+                files[dep] = known if dep in waiting and known is not None else now # type: ignore
+
+    files = {path: known for path, known in files.items() if known is not None}
+    tests = {file: entries for file, entries in tests.items() if exists(file)}
+
+    # number the paths
+    table: list[str] = sorted(files)
+    index: dict[str, int] = {path: spot for spot, path in enumerate(table)}
+
+    cache.write(AFFECTED, {
+        "files": files,
+        "tests": {
+            file: {name: [index[dep] for dep in deps if dep in index] for name, deps in entries.items()}
+            for file, entries in tests.items()
+        },
+        "paths": table,
+    })
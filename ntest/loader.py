@@ -0,0 +1,85 @@
+# what lets you actually run the functions
+from importlib.util import module_from_spec, spec_from_file_location
+from importlib.machinery import ModuleSpec
+from types import ModuleType
+from inspect import getmembers, isfunction, isclass
+from os.path import basename, splitext
+from sys import modules
+
+# the testcase class and some other types
+from .classes.TestCase import TestCase
+from .probes import project
+from . import timeline
+from typing import Any, Callable
+
+# every test file we've imported so far, keyed by path (so nothing gets executed twice)
+__modules: dict[str, ModuleType] = {}
+
+def load(path: str) -> ModuleType | None:
+    """
+    Import a test file by its path, once. Later calls with the same path get the cached module.
+
+    Args:
+        path (str): Path to the .py file.
+
+    Returns:
+        ModuleType | None: The module, or None if we couldn't get a spec/loader for it.
+    """
+    if path in __modules:
+        return __modules[path]
+
+    # load the module from the file
+    name: str = splitext(basename(path))[0]
+    spec: ModuleSpec | None = spec_from_file_location(name, path)
+
+    # if we couldn't load it, skip it
+    if spec is None or spec.loader is None:
+        return None
+
+    # get its contents
+    module: ModuleType = module_from_spec(spec)
+    with timeline.span(f"import {path}", "import", path=path):
+        spec.loader.exec_module(module)
+
+    __modules[path] = module
+    return module
+
+def forget() -> None:
+    """
+    Throw out every test module we've imported, plus every project module in sys.modules (--watch does this when files change),
+    so the next import runs the new code. Installed packages and the stdlib stay imported, that's the expensive part anyway.
+    """
+    __modules.clear()
+
+    for name, module in list(modules.items()):
+        file: str | None = getattr(module, "__file__", None)
+        if file and project(file) and name != "__main__":
+            del modules[name]
+
+def collect(module: ModuleType) -> list[Callable[..., Any]]:
+    """
+    Gather all test functions and TestCase subclasses defined in a module (not imported into it).
+
+    Args:
+        module (ModuleType): An imported test module.
+
+    Returns:
+        list[Callable[..., Any]]: The tests, in name order.
+    """
+    funcs: list[Callable[..., Any]] = []
+    for _, member in getmembers(module):
+        # first is function check, second is class. ik it's ugly
+        if (
+            isfunction(member)
+            and member.__module__ == module.__name__
+            and member.__name__.startswith("test_")  # edit these two lines
+            and member.__name__.endswith("")         # to function pattern params (not the start and stop we have already)
+        ) \
+        or (
+            isclass(member)
+            and issubclass(member, TestCase)
+            and member.__module__ == module.__name__
+        ):
+            funcs.append(member)
+
+    return funcs
@@ -0,0 +1,216 @@
+# multiprocessing stuff (spawn only, fork + threads is a footgun)
+from multiprocessing import get_context, parent_process
+from multiprocessing.context import SpawnContext, SpawnProcess
+from queue import Empty
+
+# types
+from typing import Any, Callable, Generator, Iterable
+
+# for sending errors back, and timing
+from traceback import format_exc
+from time import perf_counter
+
+# --trace rows and spawn times
+from . import timeline
+
+def _serve(inbox, outbox, wid: int, label: str = "worker", born: int | None = None) -> None:
+    """
+    Main loop of a worker process. Pulls (seq, fn, args) off its inbox, runs fn(*args),
+    and puts (wid, seq, ok, value) on the shared outbox. A None on the inbox shuts it down.
+
+    Args:
+        inbox (Queue): This worker's own task queue.
+        outbox (Queue): The result queue shared by every worker in the pool.
+        wid (int): The id of this worker (so the parent knows who finished).
+        label (str): What kind of worker this is, for --trace.
+        born (int | None): When the parent started spawning us (timeline clock), so --trace can show how long that took.
+    """
+    parent = parent_process()
+
+    # startup cost: new interpreter + imports, up till we're ready for work
+    timeline.name(f"{label} {wid}")
+    if born is not None:
+        timeline.complete("spawn", "spawn", born, worker=wid)
+
+    while True:
+        # wake up every so often so we don't outlive a parent that got killed
+        try:
+            task = inbox.get(timeout=1)
+        except Empty:
+            if parent is not None and not parent.is_alive():
+                break
+            continue
+
+        # poison pill, we out
+        if task is None:
+            break
+
+        seq, fn, args = task
+        try:
+            outbox.put((wid, seq, True, fn(*args)))
+
+        # if anything blows up send the traceback back instead of dying
+        except BaseException:
+            outbox.put((wid, seq, False, format_exc()))
+
+class WorkerPool:
+    """
+    A pool of long-lived spawned worker processes. Each worker has its own inbox and holds at most
+    one task at a time, so the parent always knows which worker is running what (and can kill just that one).
+
+    Methods:
+    - imap(tasks): Run (fn, args) tasks across the pool, yielding (seq, ok, value) as each one finishes.
+    - call(fn, args, timeout): Run one task on the first worker, replacing it only if it goes over timeout.
+    - restart(wid): Kill a worker and spawn a fresh one in its slot.
+    - close(): Ask every worker to stop and wait for them.
+    - kill(): Terminate every worker right now (fail-fast, ctrl+c, etc).
+    """
+
+    def __init__(self, size: int, daemon: bool = False, label: str = "worker") -> None:
+        self.ctx: SpawnContext = get_context("spawn")
+        self.daemon: bool = daemon
+        self.label: str = label
+        self.outbox = self.ctx.Queue()
+        self.inboxes: list = []
+        self.procs: list[SpawnProcess] = []
+
+        # bring everybody up front so the interpreter startup cost is paid in parallel
+        for wid in range(max(1, size)):
+            self.inboxes.append(None)
+            self.procs.append(None) # type: ignore
+            self.__spawn(wid)
+
+    def __len__(self) -> int:
+        return len(self.procs)
+
+    def __spawn(self, wid: int) -> None:
+        """Start (or replace) the worker in slot wid with a brand new process and inbox."""
+        inbox = self.ctx.Queue()
+        proc: SpawnProcess = self.ctx.Process(target=_serve, args=(inbox, self.outbox, wid, self.label, timeline.now()), daemon=self.daemon)
+        proc.start()
+
+        self.inboxes[wid] = inbox
+        self.procs[wid] = proc
+
+    def restart(self, wid: int) -> None:
+        """
+        Kill the worker in slot wid (if it's still kicking) and spawn a new one in its place.
+
+        Args:
+            wid (int): The slot of the worker to replace.
+        """
+        proc: SpawnProcess = self.procs[wid]
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+
+        self.__spawn(wid)
+
+    def __recv(self, timeout: float | None) -> tuple[int, int, bool, Any] | None:
+        """Get one result off the outbox, or None if nothing showed up in time."""
+        try:
+            return self.outbox.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def imap(self, tasks: Iterable[tuple[Callable[..., Any], tuple]]) -> Generator[tuple[int, bool, Any], None, None]:
+        """
+        Run every (fn, args) task across the pool. Tasks are handed out in order to whoever is idle,
+        and results are yielded as they finish (NOT in order, seq tells you which one it was).
+        If a worker dies mid task, that task comes back as a failure and the worker gets replaced.
+
+        Args:
+            tasks (Iterable[tuple[Callable, tuple]]): Picklable functions and their args.
+
+        Yields:
+            tuple[int, bool, Any]: (seq, ok, value). value is the return value, or a traceback string if not ok.
+        """
+        pending = iter(enumerate(tasks))
+        busy: dict[int, int] = {}
+        idle: list[int] = list(range(len(self.procs)))[::-1]
+        exhausted: bool = False
+
+        while True:
+            # hand out work to everybody who's free
+            while idle and not exhausted:
+                try:
+                    seq, (fn, args) = next(pending)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                wid: int = idle.pop()
+                busy[wid] = seq
+                self.inboxes[wid].put((seq, fn, args))
+
+            # nothing left running and nothing left to send, we done
+            if not busy:
+                return
+
+            # wait a bit for a result, if none check nobody died on us
+            message = self.__recv(0.1)
+            if message is None:
+                for wid, seq in list(busy.items()):
+                    if not self.procs[wid].is_alive():
+                        code = self.procs[wid].exitcode
+                        del busy[wid]
+                        self.restart(wid)
+                        idle.append(wid)
+                        yield seq, False, f"Worker process died (exit code {code}) without returning a result.\n"
+                continue
+
+            wid, seq, ok, value = message
+            del busy[wid]
+            idle.append(wid)
+            yield seq, ok, value
+
+    def call(self, fn: Callable[..., Any], args: tuple, timeout: float | None = None) -> tuple[bool, Any] | None:
+        """
+        Run one task on the first worker and wait for it. The worker only gets killed and replaced
+        if the task goes over timeout (or the worker dies), otherwise it stays warm for the next call.
+
+        Args:
+            fn (Callable): A picklable function.
+            args (tuple): Its arguments.
+            timeout (float | None): Seconds to wait before giving up. None waits forever.
+
+        Returns:
+            tuple[bool, Any] | None: (ok, value) like imap, or None if it timed out.
+        """
+        self.inboxes[0].put((0, fn, args))
+        deadline: float | None = None if timeout is None else perf_counter() + timeout
+
+        while deadline is None or perf_counter() < deadline:
+            # small slices so we notice a dead worker instead of waiting out the whole clock
+            step: float = 0.05 if deadline is None else max(0.0, min(0.05, deadline - perf_counter()))
+            message = self.__recv(step)
+
+            if message is not None:
+                return message[2], message[3]
+
+            if not self.procs[0].is_alive():
+                code = self.procs[0].exitcode
+                self.restart(0)
+                return False, f"Worker process died (exit code {code}) without returning a result.\n"
+
+        # too slow, put it down and get a fresh one ready
+        self.restart(0)
+        return None
+
+    def close(self) -> None:
+        """Ask every worker to shut down nicely and wait on them."""
+        for inbox in self.inboxes:
+            inbox.put(None)
+
+        for proc in self.procs:
+            proc.join(timeout=1)
+            if proc.is_alive():
+                proc.kill()
+                proc.join()
+
+    def kill(self) -> None:
+        """Terminate every worker immediately, whatever they're doing."""
+        for proc in self.procs:
+            if proc.is_alive():
+                proc.kill()
+            proc.join()
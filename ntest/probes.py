@@ -0,0 +1,178 @@
+# per-test instrumentation. each probe wraps one test run and fills in extra TestResult fields
+from contextlib import contextmanager, ExitStack
+from typing import Any, Callable, Generator
+
+# paths, for figuring out what counts as project code
+from os import getcwd, sep, sysconf
+from os.path import abspath, dirname
+import contextlib
+import tracemalloc
+import sys
+
+# the --profile probe lives with the rest of the profiler
+from .profiler import profile
+
+# the project is wherever ntest got run from, minus installed packages and ntest itself
+ROOT: str = abspath(getcwd()) + sep
+NTEST: str = dirname(abspath(__file__)) + sep
+
+def project(filename: str) -> bool:
+    """
+    Check if a code object's file is one of the project's own python files.
+
+    Args:
+        filename (str): A co_filename.
+
+    Returns:
+        bool: True for .py files under the project root that aren't installed packages or ntest.
+    """
+    path: str = abspath(filename)
+    return (
+        path.endswith(".py")
+        and path.startswith(ROOT)
+        and not path.startswith(NTEST)
+        and "site-packages" not in path
+    )
+
+@contextmanager
+def deps() -> Generator[dict[str, Any], None, None]:
+    """
+    Record which project source files a test executes code from (for --affected), into data["deps"].
+    Uses sys.monitoring on 3.12+ (one PY_START event per code object, then it gets disabled, so it's nearly free),
+    and falls back to a call-only sys.settrace hook (no line events) on older pythons.
+    """
+    data: dict[str, Any] = {}
+    seen: set[str] = set()
+
+    monitoring = getattr(sys, "monitoring", None)
+    if monitoring is not None:
+        # grab whatever tool slot is free (debuggers and coverage like the low ones)
+        tool: int = next(slot for slot in range(5, -1, -1) if monitoring.get_tool(slot) is None)
+        monitoring.use_tool_id(tool, "ntest")
+
+        def start(code: Any, offset: int) -> Any:
+            seen.add(code.co_filename)
+            return monitoring.DISABLE
+
+        monitoring.register_callback(tool, monitoring.events.PY_START, start)
+        monitoring.set_events(tool, monitoring.events.PY_START)
+
+        # anything disabled during the last test has to fire again for this one
+        monitoring.restart_events()
+
+        try:
+            yield data
+
+        finally:
+            monitoring.set_events(tool, 0)
+            monitoring.register_callback(tool, monitoring.events.PY_START, None)
+            monitoring.free_tool_id(tool)
+            data["deps"] = sorted(abspath(name) for name in seen if project(name))
+
+    else:
+        previous = sys.gettrace()
+
+        # only sees "call" events, returning None means no per line tracing
+        def tracer(frame: Any, event: str, arg: Any) -> None:
+            seen.add(frame.f_code.co_filename)
+
+        sys.settrace(tracer)
+        try:
+            yield data
+
+        finally:
+            sys.settrace(previous)
+            data["deps"] = sorted(abspath(name) for name in seen if project(name))
+
+def rss() -> int | None:
+    """The process's resident set size in bytes, or None where there's no /proc to ask (not linux)."""
+    try:
+        with open("/proc/self/statm", "rb") as file:
+            return int(file.read().split()[1]) * sysconf("SC_PAGE_SIZE")
+
+    except (OSError, ValueError, IndexError):
+        return None
+
+@contextmanager
+def memory(top: int = 3) -> Generator[dict[str, Any], None, None]:
+    """
+    Measure what a test allocates with tracemalloc (for --memprofile and @memlimit): data["peak"] is the most it had allocated at once,
+    data["retained"] is what was still allocated when it finished, data["rss"] is how much the process grew, and data["sites"] is
+    the top lines still holding memory as (file:line, bytes, blocks). Tracing only runs during the test, it slows allocations down a lot.
+    """
+    data: dict[str, Any] = {}
+    before: int | None = rss()
+
+    # somebody else is already tracing (ex: python -X tracemalloc), measure on top of them and leave their traces alone
+    owned: bool = not tracemalloc.is_tracing()
+    if owned:
+        tracemalloc.start()
+    else:
+        tracemalloc.reset_peak()
+    base: int = tracemalloc.get_traced_memory()[0]
+
+    try:
+        yield data
+
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        data["peak"] = max(peak - base, 0)
+        data["retained"] = max(current - base, 0)
+
+        after: int | None = rss()
+        data["rss"] = after - before if after is not None and before is not None else None
+
+        # only worth a snapshot if something stuck around. if we own tracing, everything in it came from this test
+        # (minus our own bookkeeping, which is ntest, tracemalloc and the context managers it all runs in)
+        data["sites"] = []
+        if owned and data["retained"]:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, contextlib.__file__),
+                tracemalloc.Filter(False, f"{NTEST}*"),
+            ))
+            data["sites"] = [
+                (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size, stat.count)
+                for stat in snapshot.statistics("lineno")[:top] if stat.size >= 1024
+            ]
+
+        if owned:
+            tracemalloc.stop()
+
+# every probe by the name runtest takes it as
+PROBES: dict[str, Callable[[], Any]] = {
+    "deps": deps,
+    "memory": memory,
+    "profile": profile,
+}
+
+@contextmanager
+def probing(probes: tuple[str, ...]) -> Generator[dict[str, Any], None, None]:
+    """
+    Run a test under every requested probe at once. The dict you get is filled in once the block exits,
+    and its keys are TestResult field names, so it can go straight into TestResult(**data).
+
+    Args:
+        probes (tuple[str, ...]): Names from PROBES.
+
+    Yields:
+        dict[str, Any]: Extra result fields.
+    """
+    merged: dict[str, Any] = {}
+    if not probes:
+        yield merged
+        return
+
+    parts: list[dict[str, Any]] = []
+    with ExitStack() as stack:
+        for name in probes:
+            parts.append(stack.enter_context(PROBES[name]()))
+
+        try:
+            yield merged
+
+        finally:
+            # probes fill their dicts when they exit, so close them all before merging
+            stack.close()
+            for part in parts:
+                merged.update(part)
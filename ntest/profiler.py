@@ -0,0 +1,199 @@
+# cpu profiling of test bodies (--profile). one cProfile per process, only ever switched on around the test call itself
+from cProfile import Profile
+from pstats import Stats
+from contextlib import contextmanager
+from typing import Any, Generator
+
+# files, and telling apart our frames from the test's
+from os import getpid, listdir, makedirs, remove, sep
+from os.path import abspath, basename, dirname, join, splitext
+from multiprocessing import parent_process
+from shutil import rmtree
+import atexit
+
+from .cache import cachepath
+
+# workers drop what they profiled in here when they exit, the main process merges it
+DUMPS: str = "profile"
+
+# ntest's own code (and the profiler switching itself off) never counts as the test's
+PACKAGE: str = dirname(abspath(__file__)) + sep
+SWITCHES: set[str] = {"<method 'enable' of '_lsprof.Profiler' objects>", "<method 'disable' of '_lsprof.Profiler' objects>"}
+
+# this process's profiler, and whether the test running right now wants it
+__profiler: Profile | None = None
+__wanted: bool = False
+
+@contextmanager
+def profile() -> Generator[dict[str, Any], None, None]:
+    """
+    The --profile probe: lets enable() switch the profiler on while this test runs. Nothing goes on the TestResult,
+    every test's numbers pile up in the one profiler per process and get merged at the end (see collect).
+    """
+    global __wanted
+    __wanted = True
+
+    try:
+        yield {}
+
+    finally:
+        __wanted = False
+
+def enable() -> None:
+    """Start profiling, if the running test is being profiled. The runner calls this right before the test body."""
+    global __profiler
+    if not __wanted:
+        return
+
+    if __profiler is None:
+        __profiler = Profile()
+    __profiler.enable()
+
+def disable() -> None:
+    """Stop profiling (right after the test body). Fine to call when nothing's running."""
+    if __profiler is not None:
+        __profiler.disable()
+
+def __dump() -> None:
+    """Workers save what they profiled on the way out, for the main process to pick up."""
+    if __profiler is None or parent_process() is None:
+        return
+
+    makedirs(cachepath(DUMPS), exist_ok=True)
+    __profiler.dump_stats(join(cachepath(DUMPS), f"{getpid()}.pstats"))
+
+atexit.register(__dump)
+
+def start() -> None:
+    """Throw out anything left over from workers of an earlier run (one that got killed before we could merge it)."""
+    rmtree(cachepath(DUMPS), ignore_errors=True)
+
+def collect() -> Stats:
+    """
+    Merge everything profiled so far: this process's profiler plus every worker's dump (which get deleted after).
+    ntest's own frames get cut out, so test functions end up as the roots. This process starts over after.
+
+    Returns:
+        Stats: The merged stats.
+    """
+    global __profiler
+    merged: Stats = Stats()
+
+    if __profiler is not None:
+        merged.add(__profiler)
+        __profiler = None
+
+    try:
+        dumps: list[str] = [join(cachepath(DUMPS), name) for name in listdir(cachepath(DUMPS))]
+    except OSError:
+        dumps = []
+
+    for dump in dumps:
+        try:
+            merged.add(dump)
+            remove(dump)
+
+        # half written by a worker that got killed, nothing to salvage
+        except (OSError, EOFError, ValueError, TypeError):
+            continue
+
+    # drop our frames, and any calls they made show up as coming from nowhere (so the test is the root).
+    # the same file can show up as ./x_test.py here and /abs/x_test.py in a worker, so everything goes absolute and gets summed
+    ours = lambda key: key[0].startswith(PACKAGE) or key[2] in SWITCHES
+    normal = lambda key: key if key[0] == "~" or key[0].startswith("<") else (abspath(key[0]), key[1], key[2])
+    add = lambda a, b: tuple(x + y for x, y in zip(a, b))
+
+    entries: dict[Any, tuple] = {}
+    for key, (cc, nc, tt, ct, callers) in merged.stats.items(): # type: ignore
+        if ours(key):
+            continue
+
+        edges: dict[Any, tuple] = {}
+        for caller, edge in callers.items():
+            if not ours(caller):
+                edges[normal(caller)] = add(edges[normal(caller)], edge) if normal(caller) in edges else edge
+
+        key = normal(key)
+        if key in entries:
+            old: tuple = entries[key]
+            for caller, edge in old[4].items():
+                edges[caller] = add(edges[caller], edge) if caller in edges else edge
+            cc, nc, tt, ct = add(old[:4], (cc, nc, tt, ct))
+        entries[key] = (cc, nc, tt, ct, edges)
+
+    merged.stats = entries # type: ignore
+    merged.total_tt = sum(entry[2] for entry in entries.values())
+
+    return merged
+
+def label(key: tuple[str, int, str]) -> str:
+    """How a function shows up in output: name (file:line), or just the name for builtins."""
+    file, line, name = key
+    return name if file == "~" else f"{name} ({basename(file)}:{line})"
+
+def collapsed(stats: Stats) -> dict[str, int]:
+    """
+    Turn merged stats into collapsed stacks (root;child;grandchild -> microseconds) for flamegraph tools.
+    cProfile only knows who called who, not whole stacks, so every function's time gets split between its callees
+    by how much time each call edge took (the same trick flameprof uses). Recursion gets cut off at the first repeat.
+
+    Args:
+        stats (Stats): What collect() returned.
+
+    Returns:
+        dict[str, int]: Stack -> microseconds spent in the last function of it.
+    """
+    entries: dict[Any, tuple] = stats.stats # type: ignore
+    callees: dict[Any, dict[Any, float]] = {}
+    for key, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[key] = edge[3]
+
+    stacks: dict[str, int] = {}
+    roots: list = [key for key, entry in entries.items() if not entry[4]]
+
+    # anything smaller than this isn't worth a line (keeps huge call graphs from exploding)
+    floor: float = max(sum(entries[key][3] for key in roots) * 1e-5, 1e-6)
+
+    def walk(key: Any, spent: float, path: tuple[str, ...], seen: frozenset) -> None:
+        _, _, tt, ct, _ = entries[key]
+        path = path + (label(key).replace(";", ","),)
+        if ct <= 0:
+            return
+
+        share: float = min(spent / ct, 1.0)
+        stack: str = ";".join(path)
+        stacks[stack] = stacks.get(stack, 0) + round(tt * share * 1e6)
+
+        for callee, edge in callees.get(key, {}).items():
+            if callee in seen or callee not in entries or edge * share < floor:
+                continue
+            walk(callee, edge * share, path, seen | {callee})
+
+    for root in roots:
+        walk(root, entries[root][3], (), frozenset((root,)))
+
+    return {stack: micros for stack, micros in stacks.items() if micros > 0}
+
+def write(stats: Stats, path: str) -> str:
+    """
+    Save the merged stats as a .pstats file (python -m pstats, snakeviz, etc) plus a .collapsed file next to it
+    (flamegraph.pl, speedscope, inferno).
+
+    Args:
+        stats (Stats): What collect() returned.
+        path (str): Where the .pstats goes.
+
+    Returns:
+        str: Where the collapsed stacks went.
+    """
+    if dirname(path):
+        makedirs(dirname(path), exist_ok=True)
+    stats.dump_stats(path)
+
+    folded: str = f"{splitext(path)[0]}.collapsed"
+    with open(folded, "w", encoding="utf-8") as file:
+        for stack, micros in sorted(collapsed(stats).items()):
+            file.write(f"{stack} {micros}\n")
+
+    return folded
@@ -0,0 +1,148 @@
+# abstract base + types
+from abc import ABC, abstractmethod
+from typing import Self, TextIO
+
+# formatting
+from json import dumps
+from os.path import basename, splitext
+from sys import stdout
+from time import perf_counter
+from re import Pattern, compile
+from xml.sax.saxutils import escape, quoteattr
+
+from .classes.TestResult import TestResult
+
+class Reporter(ABC):
+    """Base class for anything that writes test results out somewhere as they finish (subclass it to make your own).
+    Results get written one at a time (nothing is held in memory) and flushed at checkpoints: every `every` results
+    or `interval` seconds, whichever comes first. So a run that gets killed still leaves a usable partial report.
+
+    Methods:
+    - start(): Write whatever goes before the first result.
+    - add(result): Write one result, flushing if we hit a checkpoint.
+    - checkpoint(): Push everything written so far to disk.
+    - close(): Write whatever goes after the last result and close the file (unless it's stdout).
+
+    Subclasses have to implement write(result) themselves."""
+
+    def __init__(self: Self, file: TextIO, every: int = 256, interval: float = 1.0) -> None:
+        self.file: TextIO = file
+        self.every: int = every
+        self.interval: float = interval
+        self.pending: int = 0
+        self.last: float = perf_counter()
+
+    def start(self: Self) -> None:
+        pass
+
+    @abstractmethod
+    def write(self: Self, result: TestResult) -> None:
+        """Write a single result to self.file."""
+        ...
+
+    def add(self: Self, result: TestResult) -> None:
+        self.write(result)
+        self.pending += 1
+
+        # checkpoint every so many results or so many seconds
+        if self.pending >= self.every or perf_counter() - self.last >= self.interval:
+            self.checkpoint()
+
+    def checkpoint(self: Self) -> None:
+        self.file.flush()
+        self.pending = 0
+        self.last = perf_counter()
+
+    def close(self: Self) -> None:
+        self.file.flush()
+        if self.file is not stdout:
+            self.file.close()
+
+class JsonLinesReporter(Reporter):
+    """One json object per line per test: name, file, passed, duration, error, output, skipped (why it didn't run, passed is null then).
+    Every line stands on its own, so a cut off file is still good up to the last full line."""
+
+    def write(self: Self, result: TestResult) -> None:
+        self.file.write(dumps({
+            "name": result.name,
+            "file": result.file,
+            "passed": None if result.skipped else result.passed,
+            "duration": result.duration,
+            "error": result.error,
+            "output": result.output,
+            "skipped": result.skipped,
+        }) + "\n")
+
+class JUnitReporter(Reporter):
+    """JUnit XML for CI. Each test becomes a <testcase> as soon as it finishes. At every checkpoint the closing tags get written
+    and then written over by the next test (if the file is seekable), so the file on disk is always a complete XML document."""
+
+    HEADER: str = '<?xml version="1.0" encoding="utf-8"?>\n<testsuites name="ntest">\n<testsuite name="ntest">\n'
+    FOOTER: str = "</testsuite>\n</testsuites>\n"
+
+    # anything XML 1.0 can't hold at all, not even escaped (ex: the \x1b in colored output, lone surrogates)
+    INVALID: Pattern[str] = compile("[^\x09\x0a\x0d\x20-\ud7ff\ue000-\ufffd\U00010000-\U0010ffff]")
+
+    def clean(self: Self, text: str) -> str:
+        """Swap out the characters XML can't hold for U+FFFD, otherwise one colored traceback breaks the whole report."""
+        return self.INVALID.sub("\ufffd", text)
+
+    def start(self: Self) -> None:
+        # valid (empty) document on disk from the get go
+        self.file.write(self.HEADER)
+        self.checkpoint()
+
+    def write(self: Self, result: TestResult) -> None:
+        # classname is the file (plus the TestCase if it's a method), name is the test itself
+        stem: str = splitext(basename(result.file))[0]
+        owner, _, name = result.name.rpartition(".")
+        classname: str = f"{stem}.{owner}" if owner else stem
+
+        case: str = f"<testcase classname={quoteattr(self.clean(classname))} name={quoteattr(self.clean(name))} file={quoteattr(self.clean(result.file))} time=\"{result.duration:.6f}\""
+        if result.passed:
+            self.file.write(case + " />\n")
+            return
+
+        # never ran (out of time)
+        if result.skipped:
+            self.file.write(f"{case}>\n<skipped message={quoteattr(self.clean(result.skipped))} />\n</testcase>\n")
+            return
+
+        # last line of the traceback is the message, the whole thing is the body
+        error: str = self.clean(result.error or "")
+        message: str = error.strip().splitlines()[-1] if error.strip() else "failed"
+        printed: str = f"<system-out>{escape(self.clean(result.output))}</system-out>\n" if result.output else ""
+        self.file.write(f"{case}>\n<failure message={quoteattr(message)}>{escape(error)}</failure>\n{printed}</testcase>\n")
+
+    def checkpoint(self: Self) -> None:
+        # close the document, then back up so the next test overwrites the closing tags
+        if self.file.seekable():
+            position: int = self.file.tell()
+            self.file.write(self.FOOTER)
+            super().checkpoint()
+            self.file.seek(position)
+
+        else:
+            super().checkpoint()
+
+    def close(self: Self) -> None:
+        self.file.write(self.FOOTER)
+        if self.file.seekable():
+            self.file.truncate()
+
+        super().close()
+
+def reporter(file: TextIO) -> Reporter:
+    """
+    Pick a reporter for an -o destination: .xml files get JUnit XML, everything else (stdout too) gets JSON Lines.
+
+    Args:
+        file (TextIO): The opened output file.
+
+    Returns:
+        Reporter: A reporter writing to it (not started yet).
+    """
+    if getattr(file, "name", "").endswith(".xml"):
+        return JUnitReporter(file)
+
+    return JsonLinesReporter(file)
@@ -4,13 +4,16 @@ from importlib.machinery import ModuleSpec
 from typing import Any, Callable, Generator, Union, Type, Literal
 
 # test utilities
-from time import perf_counter
+from time import perf_counter, perf_counter_ns, time
+from statistics import mean, median, stdev
 from traceback import format_exc
 from .classes.TestResult import TestResult
+from .classes.ResultStore import ResultStore, ResultView
 
 # class checking, and the actual class to check for
-from inspect import isclass
+from inspect import isclass, isawaitable, iscoroutinefunction
 from .classes.TestCase import TestCase
+from .classes.LazyTest import LazyTest
 
 # my color library (if u can even call it that its rly just a class tbh, i made so cool functions tho)
 from .colorize import Color
@@ -21,74 +24,148 @@ from sys import modules
 
 # multiprocessing helpers
 from importlib.util import module_from_spec, spec_from_file_location
-from multiprocessing import Queue, get_context
-from multiprocessing.context import SpawnContext
 from os import getpid
+from multiprocessing import parent_process
+from multiprocessing.util import Finalize
 from pathlib import Path
+from .pool import WorkerPool
+from .history import longestfirst, baseline, savebaselines
+from .scanner import names
+from .reporters import Reporter
+from .probes import probing
+from . import capture, fixtures, profiler, timeline, watchdog
+
+# async tests
+from asyncio import AbstractEventLoop, Semaphore, gather, new_event_loop, set_event_loop
 
 # ...and more (fuck i need to clean up)
 import io
-import sys
-import builtins
-from contextlib import contextmanager
+import atexit
+from contextlib import AbstractContextManager, nullcontext, redirect_stdout
 
-@contextmanager
-def __no_io(output: bool) -> Generator:
+def __no_io(output: bool) -> AbstractContextManager:
     """
-    Disables IO in the console (for testing functions)
-
+    Disables IO in the console (for testing functions): output goes to the capture buffer (see capture), input throws.
+    Passing tests never look at what they printed, failing ones get it attached (see __iterfuncs).
     """
     # if we have output, give control back
-    if output:
-        yield
+    return nullcontext() if output else capture.capturing()
 
-    else:
-        # steal out, error, and input from sys
-        out, error = sys.stdout, sys.stderr
-        inp: FunctionType = builtins.input
+# one event loop per test module, so every async test/hook in a file shares it (no asyncio.run per test)
+__loops: dict[str, AbstractEventLoop] = {}
+
+def __loop(key: str) -> AbstractEventLoop:
+    """Get (or make) the event loop for a test module, and make it the current one."""
+    if key not in __loops or __loops[key].is_closed():
+        __loops[key] = new_event_loop()
+
+    set_event_loop(__loops[key])
+    return __loops[key]
+
+def __await(value: Any, key: str) -> Any:
+    """
+    If a test, setUp, tearDown, or setUpClass handed back a coroutine (aka it was async), run it to completion
+    on its module's loop. Anything else just gets handed back.
+
+    Args:
+        value (Any): Whatever the call returned.
+        key (str): The module it came from (which loop to use).
+
+    Returns:
+        Any: The awaited result, or value untouched.
+    """
+    if isawaitable(value):
+        return __loop(key).run_until_complete(value) # type: ignore
 
-        # set them to an in mem buffer
-        sys.stdout = sys.stderr = io.StringIO()
+    return value
 
-        # any call to input now throws a runtime error. gonna make patch bypass this
-        builtins.input = lambda prompt='': (_ for _ in ()).throw(RuntimeError("STDIN disabled"))
+def __body(call: Callable[[], Any], key: str, label: str) -> None:
+    """
+    Run just the test itself (awaited if it's async), with the profiler on if --profile is profiling this test.
+    Setup, teardown and fixtures happen outside of this so they never show up in the profile (or in its --trace bar).
 
-        # hand control back to main
+    Args:
+        call (Callable[[], Any]): Calls the test with its arguments.
+        key (str): The module it came from (which loop to use).
+        label (str): The test's name, for --trace.
+    """
+    with timeline.span(label, "body"):
+        # an in process @timeout is only armed in here, so it can't go off in our own code around it.
+        # if it lands in disarm, the outer finally still turns the profiler off
+        profiler.enable()
         try:
-            yield
-        
-        # catch any exceptions and reraise
+            token: tuple[float, int] | None = watchdog.arm()
+            try:
+                value: Any = call()
+
+            finally:
+                watchdog.disarm(token)
+
         finally:
-            sys.stdout, sys.stderr = out, error
-            builtins.input = inp
+            profiler.disable()
+
+        # async tests only actually run once they're awaited (the await check itself is ours, so it stays out)
+        if isawaitable(value):
+            loop: AbstractEventLoop = __loop(key) # type: ignore
+            profiler.enable()
+            try:
+                token = watchdog.arm()
+                try:
+                    loop.run_until_complete(value)
+
+                finally:
+                    watchdog.disarm(token)
+
+            finally:
+                profiler.disable()
+
+def __closeloops() -> None:
+    """Shut down every module's event loop (runtest does this as it finishes each file)."""
+    for loop in __loops.values():
+        if not loop.is_closed():
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    __loops.clear()
+    set_event_loop(None)
 
 # function helpers (__runfunc and __runclass)
 def __runfunc(
     item: FunctionType, 
     times: int,
-    output: bool = False
-) -> tuple[bool, str | None]:
+    output: bool = False,
+    case: dict[str, Any] | None = None
+) -> tuple[bool, str | None, int]:
     """
     Run a single function test up to `times` attempts.
-    Sends back pass/fail status, and an error (if any)
+    Sends back pass/fail status, an error (if any), and how many attempts it took
 
     Args:
         item (FunctionType): The function to run.
         times (int): Number of attempts.
+        case (dict[str, Any] | None): This @parametrize case's values, by parameter name.
 
     Returns:
-        tuple[bool, str | None]: (passed, error)
+        tuple[bool, str | None, int]: (passed, error, attempts)
     """
     # pass and error status outside
     passed: bool = False
     error: str | None = None
+    attempts: int = 0
 
     for _ in range(max(1, int(times))):
+        # an in process @timeout that already went off doesn't get another attempt
+        if attempts and watchdog.expired():
+            break
+        attempts += 1
+
         # disable io while we run
         with __no_io(output):
-            # try n run that shit and flag a pass
+            # try n run that shit and flag a pass (fixtures it asks for by name get passed in)
             try:
-                item()
+                with timeline.span("fixtures", "fixture"):
+                    kwargs: dict[str, Any] = fixtures.resolve(item, None, lambda value: __await(value, item.__module__), case or {})
+                __body(lambda: item(**kwargs, **(case or {})), item.__module__, item.__name__)
                 passed = True
 
                 # break on success
@@ -98,41 +175,61 @@ def __runfunc(
             except Exception:
                 error = format_exc()
 
+            # function fixtures are fresh every attempt, and a broken teardown fails the test
+            finally:
+                with timeline.span("fixture teardown", "fixture"):
+                    broken: str | None = fixtures.teardown("function")
+                if broken:
+                    passed, error = False, (error or "") + broken
+
     # send status back
-    return passed, error
+    return passed, error, attempts
 
 def __runclass(
                item: Type[TestCase], 
                name: str, 
                times: int,
-               output: bool = False
-            ) -> tuple[bool, str | None]:
+               output: bool = False,
+               case: dict[str, Any] | None = None
+            ) -> tuple[bool, str | None, int]:
     """
     Run a single TestCase method up to `times` attempts.
-    Sends back passing status, and an error (if any)
+    Sends back passing status, an error (if any), and how many attempts it took
 
     Args:
         item (Type[TestCase]): The full TestCase subclass.
         name (str): The method name to run.
         times (int): Number of attempts.
+        case (dict[str, Any] | None): This @parametrize case's values, by parameter name.
 
     Returns:
-        tuple[bool, str | None]: (passed, error)
+        tuple[bool, str | None, int]: (passed, error, attempts)
     """
     passed = False
     error: str | None = None
+    attempts: int = 0
 
     for _ in range(max(1, int(times))):
+        # an in process @timeout that already went off doesn't get another attempt
+        if attempts and watchdog.expired():
+            break
+        attempts += 1
+
         # disable io while we run
         with __no_io(output):
             try:
                 # instantiate
                 inst = item()
 
-                # run with setup and teardown
-                inst.setUp()
-                getattr(inst, name)()
-                inst.tearDown()
+                # run with setup and teardown (any of which can be async), fixtures go in by parameter name
+                with timeline.span(f"{item.__name__}.setUp", "setup"):
+                    __await(inst.setUp(), item.__module__)
+                method: Callable[..., Any] = getattr(inst, name)
+                with timeline.span("fixtures", "fixture"):
+                    kwargs: dict[str, Any] = fixtures.resolve(method, item, lambda value: __await(value, item.__module__), case or {})
+                __body(lambda: method(**kwargs, **(case or {})), item.__module__, f"{item.__name__}.{name}")
+                with timeline.span(f"{item.__name__}.tearDown", "teardown"):
+                    __await(inst.tearDown(), item.__module__)
 
                 # log results
                 passed = True
@@ -145,19 +242,255 @@ def __runclass(
                 # record last traceback
                 error = format_exc()
 
-    return passed, error
+            # same deal as __runfunc
+            finally:
+                with timeline.span("fixture teardown", "fixture"):
+                    broken: str | None = fixtures.teardown("function")
+                if broken:
+                    passed, error = False, (error or "") + broken
 
-def __proc_runner(queue, path, parent_name, method_name, is_method, times, output: bool = False):
+    return passed, error, attempts
+
+# class lifecycle helpers
+def __formatted(item: Any, name: str, is_method: bool) -> str:
+    """The name a target reports as: Class.method, Class (for run), or the function name."""
+    if is_method:
+        return f"{item.__name__}.{name}" if name != "run" else item.__name__
+
+    return name
+
+def __classup(item: Type[TestCase], output: bool = False) -> str | None:
     """
-    Runs a test function or TestCase method inside a separate process.
-    Re-imports the module, resolves the parent (function or class) by name,
-    runs the target and puts (passed, error) on the queue.
+    Class level setup: setUpClass, then beforeAll (on a throwaway instance, so share stuff thru the class).
+    If beforeAll blows up, tearDownClass still runs so setUpClass doesn't leak.
+
+    Returns:
+        str | None: The traceback if setup failed, None if the class is good to go.
     """
-    passed = False
-    error: str | None = None
+    with __no_io(output):
+        try:
+            with timeline.span(f"{item.__name__}.setUpClass", "class"):
+                __await(item.setUpClass(), item.__module__)
+
+        except Exception:
+            return format_exc()
+
+        try:
+            with timeline.span(f"{item.__name__}.beforeAll", "class"):
+                __await(item().beforeAll(), item.__module__)
+
+        except Exception:
+            error: str = format_exc()
+            try:
+                __await(item.tearDownClass(), item.__module__)
+            except Exception:
+                error += format_exc()
+
+            return error
+
+    return None
+
+def __classdown(item: Type[TestCase], output: bool = False) -> str | None:
+    """
+    Class level teardown, the mirror of __classup: afterAll then tearDownClass. Both get a shot even if the first blows up.
+
+    Returns:
+        str | None: Tracebacks of whatever failed, None if it all went fine.
+    """
+    errors: list[str] = []
+
+    with __no_io(output):
+        for label, hook in (("afterAll", lambda: item().afterAll()), ("tearDownClass", item.tearDownClass)):
+            try:
+                with timeline.span(f"{item.__name__}.{label}", "class"):
+                    __await(hook(), item.__module__)
+
+            except Exception:
+                errors.append(format_exc())
+
+    return "".join(errors) or None
+
+# benchmarking (@benchmark)
+
+# baselines this process measured but hasn't handed back yet, so a @loop'd (or repeated) benchmark compares against its own first run
+__fresh: dict[tuple[str, str], dict[str, float]] = {}
+
+def __fmtns(ns: float) -> str:
+    """Pretty print a nanosecond count in whatever unit reads best."""
+    for unit, size in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= size:
+            return f"{ns / size:.3f}{unit}"
+
+    return f"{ns:.1f}ns"
+
+def __runbench(
+    item: Any,
+    name: str,
+    is_method: bool,
+    config: dict[str, float],
+    output: bool = False,
+    case: dict[str, Any] | None = None
+) -> tuple[dict[str, float] | None, str | None]:
+    """
+    Benchmark one test function or TestCase method. IO gets swapped and setUp/tearDown run once, OUTSIDE the timed part,
+    so the numbers are just the test body. One call calibrates how many calls go in a round (so all rounds take about max_time),
+    then warmup rounds run untimed and the real rounds get timed with perf_counter_ns.
+
+    Args:
+        item (Any): The function, or the TestCase subclass.
+        name (str): The method name (for classes).
+        is_method (bool): Whether it's a TestCase method.
+        config (dict[str, float]): rounds, warmup, and max_time from @benchmark.
+        output (bool): Let tests print.
+        case (dict[str, Any] | None): This @parametrize case's values, by parameter name.
+
+    Returns:
+        tuple[dict[str, float] | None, str | None]: (stats, None) with min/median/mean/stddev in ns per call plus ops/s,
+            or (None, traceback) if the test blew up.
+    """
+    rounds: int = max(1, int(config["rounds"]))
+    samples: list[float] = []
+
+    with __no_io(output):
+        try:
+            # set up once, the benchmark only times the body
+            inst: TestCase | None = None
+            if is_method:
+                inst = item()
+                __await(inst.setUp(), item.__module__)
+
+            # fixtures get built once, not per call
+            target: Callable[..., Any] = getattr(inst, name) if inst is not None else item
+            kwargs: dict[str, Any] = fixtures.resolve(target, item if is_method else None, lambda value: __await(value, item.__module__), case or {})
+            kwargs.update(case or {})
+            call: Callable[[], Any] = (lambda: __await(target(**kwargs), item.__module__)) if iscoroutinefunction(target) else (lambda: target(**kwargs))
+
+            # an in process @timeout covers the calls, not setup and fixtures
+            token: tuple[float, int] | None = watchdog.arm()
+            try:
+                # calibrate: how many calls does it take to fill one round
+                begin: int = perf_counter_ns()
+                call()
+                single: int = max(perf_counter_ns() - begin, 1)
+                inner: int = max(1, int(config["max_time"] * 1e9 / rounds / single))
+
+                # warm up, untimed
+                for _ in range(int(config["warmup"]) * inner):
+                    call()
+
+                # the real deal
+                for _ in range(rounds):
+                    begin = perf_counter_ns()
+                    for _ in range(inner):
+                        call()
+                    samples.append((perf_counter_ns() - begin) / inner)
+
+            finally:
+                watchdog.disarm(token)
+
+            if inst is not None:
+                __await(inst.tearDown(), item.__module__)
+
+        except Exception:
+            return None, format_exc()
+
+        finally:
+            broken: str | None = fixtures.teardown("function")
+
+    if broken:
+        return None, broken
+
+    average: float = mean(samples)
+    return {
+        "min": min(samples),
+        "median": median(samples),
+        "mean": average,
+        "stddev": stdev(samples) if len(samples) > 1 else 0.0,
+        "ops": 1e9 / average if average else 0.0,
+        "rounds": rounds,
+        "iterations": inner,
+    }, None
+
+def __benchmarked(
+    item: Any,
+    name: str,
+    is_method: bool,
+    bench: tuple[dict[str, float], str],
+    path: str,
+    formatted: str,
+    output: bool = False,
+    case: dict[str, Any] | None = None
+) -> tuple[bool, str | None, dict[str, float] | None]:
+    """
+    Run a @benchmark test, print its stats, and check it against its saved baseline.
+    Fails if the median got more than the allowed regression percent slower than the baseline median.
+    Nothing gets written here: a test with no baseline yet hands its stats back, and they go on its result for runtest to save
+    (so -n workers never fight over the file).
+
+    Returns:
+        tuple[bool, str | None, dict[str, float] | None]: (passed, error, stats to save as the new baseline if there wasn't one)
+    """
+    config: dict[str, float] = bench[0]
+    stats, error = __runbench(item, name, is_method, config, output, case)
+    if stats is None:
+        return False, error, None
+
+    print(
+        f"{Color.CYAN}benchmark {formatted}: min {__fmtns(stats['min'])}, median {__fmtns(stats['median'])}, "
+        f"mean {__fmtns(stats['mean'])}, stddev {__fmtns(stats['stddev'])}, {stats['ops']:,.0f} ops/s "
+        f"({stats['rounds']} rounds x {stats['iterations']} calls){Color.RESET}"
+    )
+
+    # first time we've seen it, this run IS the baseline
+    base: dict[str, float] | None = __fresh.get((path, formatted)) or baseline(path, formatted)
+    if base is None:
+        __fresh[(path, formatted)] = stats
+        return True, None, stats
+
+    # how much slower (in percent) than the baseline median
+    change: float = (stats["median"] - base["median"]) / base["median"] * 100 if base["median"] else 0.0
+    if change > config["regression"]:
+        return False, (
+            f"Benchmark regression: median {__fmtns(stats['median'])} is {change:.1f}% slower than baseline "
+            f"{__fmtns(base['median'])} (allowed {config['regression']}%).\n"
+        ), None
+
+    return True, None, None
+
+def __savebaselines(store: ResultStore) -> None:
+    """Save every new benchmark baseline the run measured, in one write (results carry them back from the workers)."""
+    savebaselines(
+        (store.strings[store.files[index]], store.name(index), extras["baseline"])
+        for index, extras in store.extras.items() if extras.get("baseline")
+    )
+    __fresh.clear()
+
+# modules a worker process already imported, keyed by file path (so we only pay for it once)
+__loaded: dict[str, ModuleType] = {}
+
+# the file the last unit a -n worker ran came from (its module fixtures go when a unit from another file shows up)
+__lastpath: str | None = None
+
+# when each file has to stop starting tests on this -n worker (its --file-time clock starts with the first unit the worker runs from it)
+__clocks: dict[str, tuple[float, str] | None] = {}
+
+def __load(path: str) -> ModuleType:
+    """
+    Import a test module inside a worker/child process, by file path if we can and by name if not.
+    Modules are cached per path, so a long-lived worker only executes each test file once.
+
+    Args:
+        path (str): The file path (or dotted module name) to import.
+
+    Returns:
+        ModuleType: The imported module.
+    """
+    if path in __loaded:
+        return __loaded[path]
+
     mod: ModuleType | None = None
 
-    try:
+    with timeline.span(f"import {path}", "import", path=path):
         # try loading from file path first
         fp = Path(path)
         if fp.suffix == ".py" and fp.exists():
@@ -174,34 +507,318 @@ def __proc_runner(queue, path, parent_name, method_name, is_method, times, outpu
         if mod is None:
             mod = import_module(path)
 
+    __loaded[path] = mod
+    return mod
+
+# TestCase classes the warm @timeout worker has set up, by path::name -> (class, why setup failed or None)
+__ready: dict[str, tuple[type, str | None]] = {}
+
+def __prepare(path: str, parent_name: str, is_method: bool, output: bool = False) -> str | None:
+    """
+    Get a worker ready to run a test before the clock starts: import its module (without sending the unpicklable module back),
+    and for TestCase methods set the class up if this worker hasn't yet. Setup runs once per worker, not once per test.
+
+    Returns:
+        str | None: Why class setup failed (it won't be retried in this worker), or None if we're good.
+    """
+    module: ModuleType = __load(path)
+    key: str = f"{path}::{parent_name}"
+
+    if is_method and key not in __ready:
+        item: type = getattr(module, parent_name)
+        __ready[key] = (item, __classup(item, output))
+
+    return __ready[key][1] if is_method else None
+
+def __warmdown(path: str, parent_name: str, output: bool = False) -> str | None:
+    """Tear down a class this worker set up (the parent calls this once it's done with the class). Nothing to do if it never got set up here."""
+    item, broken = __ready.pop(f"{path}::{parent_name}", (None, "never set up"))
+    if item is None or broken is not None:
+        return None
+
+    return __classdown(item, output) # type: ignore
+
+def __leftovers() -> None:
+    """Tear down whatever classes a worker still has set up when it exits (ex: the parent got interrupted)."""
+    for key in list(__ready):
+        path, _, name = key.rpartition("::")
+        __warmdown(path, name)
+
+atexit.register(__leftovers)
+
+def __proc_runner(
+    path, parent_name, method_name, is_method, times, output: bool = False, probes: tuple[str, ...] = (), case: dict[str, Any] | None = None,
+    formatted: str = ""
+) -> tuple[bool, str | None, dict[str, Any]]:
+    """
+    Runs a test function or TestCase method inside a warm worker process (see __warmpool).
+    Imports the module (once per worker, it's cached), resolves the parent (function or class) by name,
+    runs the target under any probes and sends back (passed, error, probe data + attempts if it took more than one).
+    @benchmark tests get benchmarked in here too (formatted is the name their baseline goes by), a new baseline goes back in the data.
+    """
+    try:
         # resolve the parent (could raise AttributeError)
-        parent = getattr(mod, parent_name)
+        parent = getattr(__load(path), parent_name)
+        bench: tuple[dict[str, float], str] | bool = getattr(getattr(parent, method_name) if is_method else parent, "__benchmark__", False)
+        attempts: int = 1
 
         # run the appropriate helper. yes this is not elegant but i'm not compressing runfunc into 1
-        if is_method:
-            passed, error = __runclass(parent, method_name, times, output)
-        else:
-            passed, error = __runfunc(parent, times, output)
+        capture.clear()
+        with probing(probes) as data:
+            if bench:
+                passed, error, fresh = __benchmarked(parent, method_name, is_method, bench, path, formatted, output, case) # type: ignore
+                if fresh:
+                    data["baseline"] = fresh
 
-    except Exception:
-        passed = False
-        error = format_exc()
+            elif is_method:
+                passed, error, attempts = __runclass(parent, method_name, times, output, case)
+
+            else:
+                passed, error, attempts = __runfunc(parent, times, output, case)
+
+        if attempts > 1:
+            data["attempts"] = attempts
+
+        # what it printed goes back with it if it failed (the parent drops it again if @xfail makes that a pass)
+        if not passed:
+            data["output"] = capture.take()
+
+        return passed, error, data
 
-    # try and send result back to parent
-    try:
-        queue.put((passed, error))
     except Exception:
+        return False, format_exc(), {}
+
+    # the warm worker can't tell when a class or file is done, so those fixtures only last one test in here (session ones stay)
+    finally:
+        fixtures.teardown("class", "module")
+
+# the warm pool @timeout tests run in. started on the first timeout test, lives till runtest is done
+__warm: WorkerPool | None = None
+
+def __warmpool() -> WorkerPool:
+    """
+    Get (or start) the single pre-started worker @timeout tests run on. It only gets killed and replaced
+    when a test actually goes over its deadline, so timeout tests don't each pay for a fresh interpreter + import.
+    Daemonized so it can live inside a -n worker too.
+    """
+    global __warm
+    if __warm is None:
+        __warm = WorkerPool(1, daemon=True, label="timeout worker")
+
+        # inside a -n worker, shut it down nicely before multiprocessing terminates daemons on exit (atexit is too late),
+        # so it still gets to tear its classes down and save its --profile data. has to beat the queues' own finalizers (10)
+        if parent_process() is not None:
+            Finalize(None, __closewarm, exitpriority=100)
+
+    return __warm
+
+def __closewarm() -> None:
+    """Shut the warm @timeout pool down (if we ever started one)."""
+    global __warm
+    if __warm is not None:
+        __warm.close()
+        __warm = None
+
+def __unitrunner(
+    path: str,
+    parent_name: str,
+    ff: bool,
+    output: bool = False,
+    select: set[str] | None = None,
+    probes: tuple[str, ...] = (),
+    chunk: tuple[int, int] | None = None,
+    stop: tuple[float, str] | None = None,
+    filebudget: float | None = None,
+    flaky: set[str] | None = None,
+    retries: int = 0
+) -> tuple[list[TestResult], str]:
+    """
+    Runs one whole test unit (a function, or a TestCase subclass with all its methods) inside a pool worker.
+    Anything the runner prints (skip reasons, retry messages, etc) is caught and sent back so the parent can print it in order.
+
+    Args:
+        path (str): The file path the unit lives in.
+        parent_name (str): The name of the function or class in that file.
+        ff (bool): Fast fail flag.
+        output (bool): Let tests print.
+        select (set[str] | None): Only run these test names (see __iterfuncs).
+        probes (tuple[str, ...]): Per-test probes to run (see __iterfuncs).
+        chunk (tuple[int, int] | None): This task's share of @parametrize cases (see __iterfuncs).
+        stop (tuple[float, str] | None): When the whole run has to stop starting tests, and why (--max-time).
+        filebudget (float | None): Seconds each file gets on this worker (--file-time).
+        flaky (set[str] | None): Known flaky tests in the unit's file (see __iterfuncs).
+        retries (int): Extra attempts those get (see __iterfuncs).
+
+    Returns:
+        tuple[list[TestResult], str]: The results of the unit, and everything it printed.
+    """
+    global __lastpath
+    parent = getattr(__load(path), parent_name)
+
+    with redirect_stdout(io.StringIO()) as log:
+        # moved on to another file, so the last one's module fixtures are done (session ones go when the worker exits)
+        if __lastpath is not None and __lastpath != path:
+            __fixturedown(output, "class", "module")
+        __lastpath = path
+
+        if path not in __clocks:
+            __clocks[path] = __deadline(stop, filebudget, path)
+
+        results: list[TestResult] = __iterfuncs(parent, path, ff, output, select, probes, chunk, __clocks[path], flaky, retries)
+
+    return results, log.getvalue()
+
+def __fixturedown(output: bool, *scopes: str) -> None:
+    """
+    Tear down fixtures whose scope just ended (IO swallowed like a test's), and print any teardowns that blew up
+    since there's no single test left to pin them on.
+    """
+    with __no_io(output):
+        errors: str | None = fixtures.teardown(*scopes)
+
+    if errors:
+        print(f"{Color.RED}fixture teardown failed:\n{errors}{Color.RESET}")
+
+def __expect(xfail: tuple[str, bool] | bool, passed: bool, error: str | None) -> tuple[bool, str | None]:
+    """
+    Apply an @xfail marker (if there is one) to a finished test's outcome.
+
+    Args:
+        xfail (tuple[str, bool] | bool): The __xfail__ attribute, (reason, strict) or falsy.
+        passed (bool): Whether the test passed.
+        error (str | None): Its error, if any.
+
+    Returns:
+        tuple[bool, str | None]: The (passed, error) that should actually get reported.
+    """
+    if not xfail:
+        return passed, error
+
+    # either unpack to a tuple if we have xfail strict provided
+    if isinstance(xfail, tuple):
+        xfail_reason, xfail_strict = xfail
+
+    # strictness by default is just false
+    else:
+        xfail_reason, xfail_strict = (str(xfail) if xfail else "", False)
+    
+    # handle an unexpected pass
+    if passed:
+        if xfail_strict:
+            # if it's strict fail it no matter what
+            passed = False
+            error = f"XPASS (strict): test passed unexpectedly but marked xfail, reason for this: {xfail_reason}".strip()
+
+        else:
+            # otherwise allow it to pass but make a note
+            error = f"XPASS: test passed unexpectedly but marked xfail, reason for this: {xfail_reason}".strip()
+
+    else:
+        # expected failures should reach here
+        passed = True
+        error = f"XFAIL: expected failure. {xfail_reason}\n{error or ''}".strip()
+
+    return passed, error
+
+# @parametrize helpers
+def __caseid(names: tuple[str, ...], values: tuple, index: int) -> str:
+    """A readable id for one case: short plain values joined by dashes (ex: 1-2-3), anything else as name + case number."""
+    parts: list[str] = []
+    for name, value in zip(names, values):
+        text: str = str(value)
+        plain: bool = value is None or isinstance(value, (str, int, float, bool))
+
+        parts.append(text if plain and text and len(text) <= 24 and not any(c in text for c in "[]\n") else f"{name}{index}")
+
+    return "-".join(parts) or str(index)
+
+def __expand(
+    item: Any,
+    targets: list[tuple[Any, str, bool]],
+    select: set[str] | None,
+    chunk: tuple[int, int] | None
+) -> Generator[tuple[Any, str, bool, str, dict[str, Any] | None, bool, str | None], None, None]:
+    """
+    Turn targets into what actually runs, one at a time: plain targets as they are, @parametrize ones once per case.
+    Cases get pulled off their iterable as we go, so nothing is expanded ahead of time.
+
+    Args:
+        item (Any): The function or TestCase subclass the targets came from.
+        targets (list[tuple[Any, str, bool]]): (object, name, is_method) like __iterfuncs builds.
+        select (set[str] | None): Only these names (a bare test name keeps all of its cases).
+        chunk (tuple[int, int] | None): (which, of how many) to only take every how-many-th case starting at which (-n deals cases out this way).
+
+    Yields:
+        (object, name, is_method, formatted name, case kwargs or None, first of its target?, error if the cases themselves blew up)
+    """
+    for obj, name, is_method in targets:
+        base: str = __formatted(item, name, is_method)
+        parent: Any = getattr(obj, name) if is_method else obj
+        spec: tuple | None = getattr(parent, "__parametrize__", None)
+
+        # skipped tests don't get expanded (no point printing the reason 50,000 times)
+        if not spec or getattr(parent, "__skip__", False):
+            yield obj, name, is_method, base, None, True, None
+            continue
+
+        (names, cases), message = spec
+        lead: bool = chunk is None or chunk[0] == 0
+        if message and lead:
+            print(f"{Color.YELLOW}{message}{Color.RESET}")
+
+        seen: set[str] = set()
+        first: bool = True
+        index: int = -1
+        share: tuple[int, int] | None = chunk
+
         try:
-            queue.put((False, "Failed to send result from child process:\n" + format_exc()))
+            # a function gets called for a fresh iterable every time (so @loop, --watch and every -n chunk see all the cases)
+            if callable(cases):
+                cases = cases()
+
+            # a one shot iterator (ex: a bare generator) can't be dealt out, whoever has the first chunk runs all of it
+            if share is not None and iter(cases) is cases:
+                if not lead:
+                    continue
+                share = None
+
+            for index, values in enumerate(cases):
+                # one name takes the value as is, more than one unpacks it
+                values = tuple(values) if len(names) > 1 and isinstance(values, (tuple, list)) else (values,)
+                caseid: str = __caseid(names, values, index)
+
+                # same values twice still need different names (worked out before chunking so every chunk names cases the same)
+                if caseid in seen:
+                    caseid = f"{caseid}#{index}"
+                seen.add(caseid)
+
+                if share is not None and index % share[1] != share[0]:
+                    continue
+
+                formatted: str = f"{base}[{caseid}]"
+                if select is not None and base not in select and formatted not in select:
+                    continue
+
+                yield obj, name, is_method, formatted, dict(zip(names, values)), first, None
+                first = False
+
+        # a generator that blows up partway fails as one extra result (from one chunk only), the cases before it still count
         except Exception:
-            pass
+            if lead:
+                yield obj, name, is_method, f"{base}[cases]", None, first, f"Couldn't get case #{index + 2} of {base}:\n{format_exc()}"
 
 # iterate through all of the potential specs, determine class or function and call
 def __iterfuncs(
     item: Union[Callable[[], Any], FunctionType],
     path: str,
     ff: bool,
-    output: bool = False
+    output: bool = False,
+    select: set[str] | None = None,
+    probes: tuple[str, ...] = (),
+    chunk: tuple[int, int] | None = None,
+    deadline: tuple[float, str] | None = None,
+    flaky: set[str] | None = None,
+    retries: int = 0
 ) -> list[TestResult]:
     """
     Runner for both simple functions or TestCase subclasses.
@@ -212,6 +829,13 @@ def __iterfuncs(
         item (big fat type): The test item, can be a function or a TestCase subclass.
         path (str): The file path where the function is defined.
         ff (bool): Fast fail flag.
+        output (bool): Let tests print.
+        select (set[str] | None): If given, only run targets whose formatted name is in here (--lf).
+        probes (tuple[str, ...]): Per-test probes (see probes.PROBES) to wrap every test in, their data ends up on the TestResult.
+        chunk (tuple[int, int] | None): Only run this share of every @parametrize test's cases (see __expand), for -n.
+        deadline (tuple[float, str] | None): (time() to stop starting tests at, why). Whatever's left then comes back as not run (skipped set).
+        flaky (set[str] | None): Names of tests history says are flaky (see history.flaky), they get retried automatically.
+        retries (int): How many extra attempts a flaky test gets (on top of its first, @retry still wins if it gives more).
 
     Returns:
         list[TestResult]: A list of TestResult items, check TestResult for more but: name, file, passed (bool), and error (str | None).
@@ -219,6 +843,16 @@ def __iterfuncs(
     # store all test results
     results: list[TestResult] = []
 
+    # tests found by parsing only get imported now, right before they run. a broken import fails just this test.
+    # before the skip check, a @skip the parser couldn't see (ex: skip(reason) if ... else ...) is only on the real thing
+    if isinstance(item, LazyTest):
+        try:
+            item = item.resolve()
+
+        except Exception:
+            results.append(TestResult(name=item.__name__, file=path, passed=False, duration=0.0, error=format_exc()))
+            return results
+
     # check for skip decorator at class level
     if getattr(item, "__skip__", False):
         print(f"{Color.YELLOW}{getattr(item, '__skip__')}{Color.RESET}")
@@ -226,9 +860,6 @@ def __iterfuncs(
 
     # build targets as (object: TestCase, name: str, is_method: bool)
     if isclass(item) and issubclass(item, TestCase):
-        # class-level setup
-        item.setUpClass()
-
         # methods = list of method names starting with "test_" or "run"
         # targets = list of test case, method, and mark method as method. these genexps are ugly but save me like 15 lines
         methods: list[str] = [n for n in dir(item) if n.startswith("test_") or n == "run"]
@@ -238,162 +869,250 @@ def __iterfuncs(
     else:
         targets = [(item, getattr(item, "__name__", str(item)), False)] # type: ignore (i am NOT doin all that)
 
+    # not picked to run this time (weeded out up front, so a class with nothing picked never even gets set up). cases count for their test
+    if select is not None:
+        targets = [
+            target for target in targets
+            if (base := __formatted(item, target[1], target[2])) in select or any(name.startswith(f"{base}[") for name in select)
+        ]
+
     # if no targets quit
     if not targets:
         return results
 
-    # unpack (cuz remember, tuple(object: TestCase, name: str, is_method: bool))
-    for obj, name, is_method in targets:
-        # test status stored outside so no fuckies
-        passed: bool = False
-        error: str | None = None
-    
-        # resolve parent (either a class or function nothing else)
-        parent = getattr(obj, name) if is_method else obj
-
-        # get all decorators up top
-        timeout: tuple[float, str] | bool = getattr(parent if is_method else item, "__timeout__", False)
-        xfail: tuple[str, str] | bool = getattr(parent if is_method else item, "__xfail__", False)
-        retry: tuple[int, str] | int = getattr(item, "__retry__", 0)
+    # classes get set up lazily, by whichever process runs one of their methods first (this one, or the warm @timeout worker)
+    lifecycle: bool = isclass(item) and issubclass(item, TestCase)
+    ready: bool = False
+    broken: str | None = None
+    warmed: bool = False
 
-        # check for skip decorator at method/function level
-        if getattr(parent, "__skip__", False):
-            # what does disp mean? explain: stupid robot what does disp mean: 
-            display: str | Any = getattr(parent, "__name__", parent)
-            reason: str = getattr(parent, "__skip__")
+    try:
+        # unpack (cuz remember, tuple(object: TestCase, name: str, is_method: bool)), @parametrize cases come out one at a time
+        for obj, name, is_method, formatted, case, first, failure in __expand(item, targets, select, chunk):
+            # the cases themselves broke, nothing to run
+            if failure is not None:
+                results.append(TestResult(name=formatted, file=path, passed=False, duration=0.0, error=failure))
+                if ff:
+                    break
+                continue
+
+            # out of time, so this never starts. the rest still get walked (not run), so every case that didn't run gets counted
+            if deadline is not None and time() > deadline[0]:
+                results.append(TestResult(name=formatted, file=path, passed=False, duration=0.0, error=None, skipped=deadline[1]))
+                continue
+
+            # test status stored outside so no fuckies (plus whatever the probes measured)
+            passed: bool = False
+            error: str | None = None
+            data: dict[str, Any] = {}
+    
+            # resolve parent (either a class or function nothing else)
+            parent = getattr(obj, name) if is_method else obj
+
+            # get all decorators up top
+            timeout: tuple[float, str] | bool = getattr(parent if is_method else item, "__timeout__", False)
+            xfail: tuple[str, str] | bool = getattr(parent if is_method else item, "__xfail__", False)
+            retry: tuple[int, str] | int = getattr(item, "__retry__", 0)
+
+            # check for skip decorator at method/function level
+            if getattr(parent, "__skip__", False):
+                # what does disp mean? explain: stupid robot what does disp mean: 
+                display: str | Any = getattr(parent, "__name__", parent)
+                reason: str = getattr(parent, "__skip__")
+
+                print(f"{Color.YELLOW}skipping function {display}.{name} because: {reason}{Color.RESET}")
+                continue
+
+            # benchmark message (if it's got a reason). messages only go out once per test, not once per case
+            benchmsg: str = getattr(parent if is_method else item, "__benchmark__", ("", ""))[1]
+            if benchmsg and first:
+                print(f"{Color.YELLOW}{benchmsg}{Color.RESET}")
+
+            # handle retries
+            times, reason = (retry, "") if not isinstance(retry, tuple) else retry
+            if times > 0 and reason and first:
+                print(f"{Color.YELLOW}{reason}{Color.RESET}")
+
+            # known flaky tests get a few more goes, but only a few (and whether it needed them goes back into its score)
+            if flaky and formatted in flaky:
+                times = max(times, 1 + retries)
+        
+            # ugly ternaries but they allow for handling of non provided time
+            clock: float | None = timeout[0] if timeout else None # type: ignore (shut to fuck up pylance)
+            message: str = timeout[1] if timeout else "" # type: ignore
+            if message and first:
+                print(f"{Color.YELLOW}{message}{Color.RESET}")
 
-            print(f"{Color.YELLOW}skipping function {display}.{name} because: {reason}{Color.RESET}")
-            continue
+            # mode="process" timeouts (the default) go to the warm worker, signal/thread ones get interrupted right here
+            mode: str = timeout[2] if timeout and len(timeout) > 2 else "process" # type: ignore
+            isolated: bool = bool(clock) and mode not in ("signal", "thread")
+
+            # @memlimit tests always get their memory measured, --memprofile or not
+            memlimit: tuple[int, str] | bool = getattr(parent if is_method else item, "__memlimit__", False)
+            if memlimit and memlimit[1] and first: # type: ignore
+                print(f"{Color.YELLOW}{memlimit[1]}{Color.RESET}") # type: ignore
+            measure: tuple[str, ...] = probes + ("memory",) if memlimit and "memory" not in probes else probes
+
+            # start the clock baby (the --trace bar starts here too, but keeps class setup and worker prep in it)
+            start: float = perf_counter()
+            begin: int = timeline.now()
+            capture.clear()
+
+            # first method of a class to run in this process sets the class up (the warm worker sets up its own)
+            if lifecycle and not isolated and not ready and broken is None:
+                broken = __classup(item, output) # type: ignore
+                ready = broken is None
+                start = perf_counter()
+
+            # run with timeout in the warm worker
+            if isolated:
+                pool: WorkerPool = __warmpool()
+                pname: str = getattr(item, "__name__", str(item))
+
+                # import the module (and set the class up, once per worker) BEFORE the clock starts, that isn't the test's fault
+                prepared: tuple[bool, Any] | None = pool.call(__prepare, (path, pname, is_method, output))
+                warmed = warmed or is_method
+                start = perf_counter()
+
+                # run it and time how long it took. None means it went over and the worker got put down
+                outcome: tuple[bool, Any] | None = None
+                if prepared and prepared[0] and prepared[1]:
+                    outcome = (True, (False, f"Class setup failed, so {formatted} never ran:\n{prepared[1]}", {}))
+
+                elif prepared and not prepared[0]:
+                    outcome = prepared
 
-        # handle retries
-        times, reason = (retry, "") if not isinstance(retry, tuple) else retry
-        if times > 0 and reason:
-            print(f"{Color.YELLOW}{reason}{Color.RESET}")
-        
-        # ugly ternaries but they allow for handling of non provided time
-        clock: float | None = timeout[0] if timeout else None # type: ignore (shut to fuck up pylance)
-        message: str = timeout[1] if timeout else "" # type: ignore
-        if message:
-            print(f"{Color.YELLOW}{message}{Color.RESET}")
+                else:
+                    outcome = pool.call(__proc_runner, (path, pname, name, is_method, times, output, measure, case, formatted), clock)
+                duration: float = perf_counter() - start
 
-        # start the clock baby
-        start: float = perf_counter()
-
-        # run with timeout in separate process
-        if clock:
-            # create a queue in context
-            ctx: SpawnContext = get_context("spawn")
-            pqueue: Queue = ctx.Queue()
-
-            # target process runner and spawn with a whole fuckload of arguments... its documented
-            pname: str = getattr(item, "__name__", str(item))
-            p = ctx.Process(
-                target = __proc_runner,
-                args = (pqueue, path, pname, name, is_method, times, output)
-            )
-            
-            # lifetime of the process is here, kill after timeout and time how long it took
-            p.start()
-            p.join(timeout=clock)
-            duration: float = perf_counter() - start
-            
-            # if it's somehow still alive kill it
-            if p.is_alive():
-                p.terminate()
-                p.join()
-                passed = False
-                error = f"Test timed out after {clock} seconds.\n"
+                if outcome is None:
+                    passed = False
+                    error = f"Test timed out after {clock} seconds.\n"
 
-            else:
-                try:
-                    # get status
-                    passed, error = pqueue.get_nowait()
+                elif outcome[0]:
+                    passed, error, data = outcome[1]
 
-                except:
-                    # and if it fucks up one more time just return a generic msg
+                else:
+                    # and if it fucks up one more time just return what the worker sent
                     passed = False
-                    error = "Process ended without returning result.\n"
+                    error = outcome[1] or "Process ended without returning result.\n"
         
-        # nesting hell it's all fucking necessary though
-        else:
-            # run a class method
-            if is_method:
-                passed, error = __runclass(item, name, times, output) # type: ignore
+            # class setup failed already, don't even try
+            elif broken is not None:
+                passed, error = False, f"Class setup failed, so {formatted} never ran:\n{broken}"
+                duration = 0.0
 
-            # run a function if it's not a method
+            # nesting hell it's all fucking necessary though
             else:
-                passed, error = __runfunc(item, times, output)
-
-            # time duration
-            duration: float = perf_counter() - start
+                tries: int = 1
+                try:
+                    # an in process @timeout throws into the test body if it goes over (the test's own except turns that into a failure)
+                    with watchdog.limited(clock, mode) if clock else nullcontext(): # type: ignore
+                        with probing(measure) as data:
+                            # benchmarks get timed their own way
+                            bench: tuple[dict[str, float], str] | bool = getattr(parent if is_method else item, "__benchmark__", False)
+                            if bench:
+                                passed, error, fresh = __benchmarked(item, name, is_method, bench, path, formatted, output, case) # type: ignore
+                                if fresh:
+                                    data["baseline"] = fresh
+
+                            # run a class method
+                            elif is_method:
+                                passed, error, tries = __runclass(item, name, times, output, case) # type: ignore
+
+                            # run a function if it's not a method
+                            else:
+                                passed, error, tries = __runfunc(item, times, output, case)
+
+                # only the body is armed and that's inside the test's own try, but just in case
+                except watchdog.Expired:
+                    passed, error = False, None
+
+                if tries > 1:
+                    data["attempts"] = tries
+
+                # time duration
+                duration: float = perf_counter() - start
+
+            # enforce timeout even if returned quickly. 
+            # this shouldn't get reached but for you fuckers tryna fudge tests
+            if clock and duration > clock:
+                passed = False
+                error = f"Test timed out after {clock} seconds.\n" + (error or "")
 
-        # enforce timeout even if returned quickly. 
-        # this shouldn't get reached but for you fuckers tryna fudge tests
-        if clock and duration > clock:
-            passed = False
-            error = f"Test timed out after {clock} seconds.\n" + (error or "")
+            # over its memory limit (a test that already failed keeps its own error, that's more useful)
+            if memlimit and passed and (data.get("peak") or 0) > memlimit[0]: # type: ignore
+                passed = False
+                error = f"Test used {data['peak']} bytes at its peak, over its limit of {memlimit[0]}.\n" # type: ignore
 
-        # mark a test as expected to fail
-        if xfail:
-            # either unpack to a tuple if we have xfail strict provided
-            if isinstance(xfail, tuple):
-                xfail_reason, xfail_strict = xfail
+            # mark a test as expected to fail
+            passed, error = __expect(xfail, passed, error)
 
-            # strictness by default is just false
-            else:
-                xfail_reason, xfail_strict = (str(xfail) if xfail else "", False)
-            
-            # handle an unexpected pass
+            # only failures keep what they printed (the warm worker already sent its own back, or got killed with it)
             if passed:
-                if xfail_strict:
-                    # if it's strict fail it no matter what
-                    passed = False
-                    error = f"XPASS (strict): test passed unexpectedly but marked xfail, reason for this: {xfail_reason}".strip()
+                data.pop("output", None)
+            elif not isolated:
+                data["output"] = capture.take()
 
-                else:
-                    # otherwise allow it to pass but make a note
-                    error = f"XPASS: test passed unexpectedly but marked xfail, reason for this: {xfail_reason}".strip()
+            results.append(TestResult(name=formatted, file=path, passed=passed, duration=duration, error=error, **data))
+            timeline.complete(formatted, "test", begin, file=path, passed=passed)
 
-            else:
-                # expected failures should reach here
-                passed = True
-                error = f"XFAIL: expected failure. {xfail_reason}\n{error or ''}".strip()
+            # fail-fast
+            if not passed and ff:
+                break
 
-        # formatted test name. lotta checks here
-        formatted = (f"{item.__name__}.{name}"
-                     if is_method and name != "run"
-                     else (item.__name__ if is_method else name))
-        
-        results.append(TestResult(name=formatted, file=path, passed=passed, duration=duration, error=error))
+    # teardown no matter how we leave (failures, fail-fast, ctrl+c). class fixtures go first, they were made after setup
+    finally:
+        if isclass(item):
+            __fixturedown(output, "class")
 
-        # fail-fast
-        if not passed and ff:
-            break
+        errors: str = (__classdown(item, output) or "") if ready else ""
+
+        # the warm worker set the class up too if it ran any of its methods
+        if warmed:
+            outcome: tuple[bool, Any] | None = __warmpool().call(__warmdown, (path, item.__name__, output))
+            errors += (outcome[1] or "") if outcome else ""
+
+        if errors:
+            results.append(TestResult(name=f"{item.__name__}.tearDownClass", file=path, passed=False, duration=0.0, error=errors))
 
     return results
 
 def __result(
     result: TestResult,
-    passes: list[TestResult],
-    fails: list[TestResult],
+    store: ResultStore,
     verbose: bool,
     iterations: int,
-    index: int
+    index: int,
+    reporters: list[Reporter] | None = None,
+    told: set[str] | None = None
 ) -> None:
     """
-    Processes and displays one test result, adding it to the proper list of passes or fails.
+    Processes and displays one test result, adding it to the results store, and streaming it to any reporters.
+    Tests that never ran don't get a line each, just their reason (once).
 
     Args:
         - result (TestResult) = A single test result.
-        - passes (list[TestResult]) = A list of passing results (will be added directly via a reference.)
-        - fails (list[TestResult]) = A list of failing results (will be added directly via a reference.)
+        - store (ResultStore) = Where every result of the run goes (only its fields are kept, not the TestResult).
         - verbose (bool) = Prints a full error result and .6f if True, else defaults to .3f and just the error
         - iterations (int) = How many times it took (and if looped we print that), doesn't print if 1.
         - index (int) = What result number this was.
+        - reporters (list[Reporter] | None) = Reporters to hand the result to as soon as it's done (-o).
+        - told (set[str] | None) = Not run reasons already printed.
     """
-    # add to the proper list
-    target = passes if result.passed else fails
-    target.append(result)
+    # stream it out first, so a run that dies right after still has it on disk
+    for reporter in reporters or []:
+        reporter.add(result)
+
+    # into the store
+    store.add(result)
+
+    if result.skipped:
+        if told is not None and result.skipped not in told:
+            told.add(result.skipped)
+            print(f"{Color.YELLOW}{result.skipped}{Color.RESET}")
+        return
     
     # ugly text formatting shit i will minimize the pain on your eyes
     color = Color.GREEN if result.passed else Color.RED
@@ -401,57 +1120,484 @@ def __result(
     loop_tag = f"#{index + 1} " if iterations > 1 else ""
     status = '✓' if result.passed else '✗'
     
+    # passing on a retry gets called out, that's what flaky looks like
+    tries = f" {Color.YELLOW}passed on try {result.attempts}{Color.RESET}" if result.passed and (result.attempts or 1) > 1 else ""
+
     # ok now we log!!!
-    print(f"{color}{status} {result.name} {loop_tag}{Color.RESET}({duration_fmt}s)")
+    print(f"{color}{status} {result.name} {loop_tag}{Color.RESET}({duration_fmt}s){tries}")
 
-# main runner
-def runtest(files: dict[str, list], ff: bool, verbose: bool = False, output: bool = False) -> tuple[list[TestResult], list[TestResult], int]:
+# time budgets (--max-time / --file-time)
+def __notrun(func: Any, path: str, reason: str, select: set[str] | None = None, iterations: int = 1) -> list[TestResult]:
     """
-    Main test runner. Given a dictionary of file paths and their associated test functions or classes,
-    this function runs each test; takes results from it; and returns a list of passes and fails, as well as a total run count.
-    Also displays results using __result.
+    Results for a unit that never got started, one per test it'd report as (see scanner.names).
+
+    Args:
+        func (Any): The function, TestCase subclass or LazyTest.
+        path (str): The file it's in.
+        reason (str): Why it didn't run.
+        select (set[str] | None): Only the tests picked to run count (--lf, --affected).
+        iterations (int): How many times it would've run (@loop).
+
+    Returns:
+        list[TestResult]: The not run results (skipped set).
+    """
+    picked: list[str] = [
+        name for name in names(func)
+        if select is None or name in select or any(each.startswith(f"{name}[") for each in select)
+    ]
+    return [TestResult(name=name, file=path, passed=False, duration=0.0, error=None, skipped=reason) for name in picked] * iterations
+
+def __deadline(stop: tuple[float, str] | None, filebudget: float | None, path: str) -> tuple[float, str] | None:
+    """
+    When a file has to stop starting tests: the whole run's deadline, or the file's own budget starting now, whichever comes first.
+
+    Args:
+        stop (tuple[float, str] | None): The whole run's (deadline, reason), if there's a --max-time.
+        filebudget (float | None): Seconds the file gets (--file-time).
+        path (str): The file.
+
+    Returns:
+        tuple[float, str] | None: (time() to stop at, why), or None if there's no limit.
+    """
+    own: tuple[float, str] | None = None
+    if filebudget:
+        own = (time() + filebudget, f"Out of time for {path} (--file-time {filebudget:g}s), the rest of it didn't run.")
+
+    if stop is None or own is None:
+        return stop or own
+
+    return min(stop, own)
+
+# concurrent async tests (--async-concurrency)
+def __batchable(funcs: list, select: set[str] | None, flaky: set[str] | None = None) -> tuple[list, list]:
+    """
+    Split a file's tests into plain async functions that can safely share the loop at the same time,
+    and everything else (classes, anything with @timeout/@loop/@skip/@patch/@memlimit/@benchmark/@parametrize, sync tests, known flaky tests).
+
+    Args:
+        funcs (list): The tests collected from one file.
+        select (set[str] | None): Only these names are picked to run (--lf), the rest go back untouched.
+        flaky (set[str] | None): Known flaky tests, they go the normal way to get their automatic retries.
+
+    Returns:
+        tuple[list, list]: (the async functions, resolved, in order), (everything else, in order)
+    """
+    batch: list = []
+    rest: list = []
+
+    for func in funcs:
+        # anything that needs its own special handling runs the normal way
+        if (
+            isclass(func) or getattr(func, "is_class", False)
+            or (select is not None and func.__name__ not in select)
+            or (flaky is not None and func.__name__ in flaky)
+        ):
+            rest.append(func)
+            continue
+
+        # lazy tests have to be imported to know if they're async. if that breaks, the normal path reports it
+        try:
+            real = func.resolve() if isinstance(func, LazyTest) else func
+        except Exception:
+            rest.append(func)
+            continue
+
+        # decorators are checked on the real thing (a stub only knows the ones the parser could see)
+        special: bool = (
+            any(getattr(real, attr, False) for attr in ("__skip__", "__timeout__", "__patch__", "__memlimit__", "__benchmark__", "__parametrize__"))
+            or getattr(real, "__loop__", 1) not in (1, False)
+        )
+
+        # tests that take fixtures run the normal way too (function fixtures are one at a time)
+        (batch if not special and iscoroutinefunction(real) and not fixtures.params(real) else rest).append(real)
+
+    return batch, rest
+
+def __runasync(items: list, path: str, output: bool, limit: int, deadline: tuple[float, str] | None = None) -> list[TestResult]:
+    """
+    Run independent async test functions from one file at the same time on the file's event loop (asyncio.gather),
+    with at most `limit` of them in flight. @retry and @xfail still apply, results come back in the order given.
+    Tests that get their turn after the deadline don't start, they come back as not run.
+
+    Args:
+        items (list): Async test functions (from __batchable).
+        path (str): The file they came from.
+        output (bool): Let tests print.
+        limit (int): Max tests awaiting at once.
+        deadline (tuple[float, str] | None): (time() to stop starting tests at, why), from __deadline.
+
+    Returns:
+        list[TestResult]: One result per test.
+    """
+    loop: AbstractEventLoop = __loop(items[0].__module__)
+    gate: Semaphore = Semaphore(limit)
+
+    async def attempt(item: Any) -> TestResult:
+        # same retry rules as __runfunc
+        retry: tuple[int, str] | int = getattr(item, "__retry__", 0)
+        times: int = retry[0] if isinstance(retry, tuple) else retry
+        passed: bool = False
+        error: str | None = None
+        attempts: int = 0
+
+        async with gate:
+            # out of time by the time it got a spot, same as __iterfuncs
+            if deadline is not None and time() > deadline[0]:
+                return TestResult(name=item.__name__, file=path, passed=False, duration=0.0, error=None, skipped=deadline[1])
+
+            start: float = perf_counter()
+            for _ in range(max(1, int(times))):
+                attempts += 1
+                try:
+                    await item()
+                    passed, error = True, None
+                    break
+
+                except Exception:
+                    error = format_exc()
+
+            duration: float = perf_counter() - start
+
+        passed, error = __expect(getattr(item, "__xfail__", False), passed, error)
+        return TestResult(name=item.__name__, file=path, passed=passed, duration=duration, error=error, attempts=attempts if attempts > 1 else None)
+
+    # print retry reasons up front, since everything runs interleaved
+    for item in items:
+        retry = getattr(item, "__retry__", 0)
+        if isinstance(retry, tuple) and retry[0] > 0 and retry[1]:
+            print(f"{Color.YELLOW}{retry[1]}{Color.RESET}")
+
+    # one io swap around the whole batch (swapping per test would step on each other)
+    capture.clear()
+    with __no_io(output):
+        results: list[TestResult] = list(loop.run_until_complete(gather(*(attempt(item) for item in items))))
+
+    # they all printed into the same buffer at once, so every failure gets the whole batch's output
+    printed: str | None = capture.take()
+    for result in results:
+        if not result.passed and not result.skipped:
+            result.output = printed
+
+    return results
+
+# parallel runner (-n)
+def __runparallel(
+    files: dict[str, list],
+    ff: bool,
+    verbose: bool,
+    output: bool,
+    workers: int,
+    select: dict[str, set[str]] | None = None,
+    timings: dict[str, dict[str, list]] | None = None,
+    reporters: list[Reporter] | None = None,
+    probes: tuple[str, ...] = (),
+    stop: tuple[float, str] | None = None,
+    filebudget: float | None = None,
+    flaky: dict[str, set[str]] | None = None,
+    retries: int = 0
+) -> tuple[ResultView, ResultView, int]:
+    """
+    Parallel version of runtest. Every unit (a function, or a TestCase subclass with all its methods, once per @loop iteration)
+    gets sent by file path + name to a pool of long-lived worker processes. A @parametrize function gets split into one unit
+    per worker, each taking every workers-th case (so the cases never have to be listed out up front). Results come back whenever,
+    but get printed through __result in the exact same order a serial run would print them.
+    With --max-time, units only get handed out while there's time left, and the workers stop starting tests at the same deadline.
+    --file-time is kept by the workers, each one giving a file its budget from the first of its units that worker runs.
 
     Args:
         files (dict[str, list]) = Dictionary mapping file paths to lists of test functions or classes.
-        ff (bool) = Fast fail flag.
-        verbose (bool, optional) = Verbose output flag. Defaults to False.
+        ff (bool) = Fast fail flag. The first failure from any worker cancels everything still running.
+        verbose (bool) = Verbose output flag.
+        output (bool) = Let tests print.
+        workers (int) = How many worker processes to use.
+        select (dict[str, set[str]] | None) = Per file, the only test names to run.
+        timings (dict[str, dict[str, list]] | None) = Recorded results (see history.load), used to start the longest units first.
+        reporters (list[Reporter] | None) = Reporters every result gets streamed to.
+        probes (tuple[str, ...]) = Per-test probes, run inside the workers.
+        stop (tuple[float, str] | None) = When the whole run has to stop starting tests, and why (--max-time).
+        filebudget (float | None) = Seconds each file gets (--file-time).
+        flaky (dict[str, set[str]] | None) = Per file, the tests known to be flaky (they get retried automatically).
+        retries (int) = Extra attempts each of those gets.
 
     Returns:
-        tuple[list, list, int] = A tuple containing:
-            - list[TestResult] = containing passing tests
-            - list[TestResult] = containing failing tests
-            - int = number of tests run
+        tuple[ResultView, ResultView, int] = Same as runtest.
     """
-    # lists of passes and fails, and a run count
-    passes: list[TestResult] = []
-    fails: list[TestResult] = []
+    store: ResultStore = ResultStore()
     runs: int = 0
 
+    # lay out every unit in serial order as (path, func, loop index, loop count, case chunk). files with no tests get a None
+    plan: list[tuple[str, Any, int, int, tuple[int, int] | None]] = []
     for path, funcs in files.items():
-        print(f"\n{Color.BLUE}{path}{Color.RESET}")
-
-        # if no tests found in a file warn the user
         if not funcs:
-            print(f"{Color.YELLOW}No test functions found{Color.RESET}")
-            continue
-        
+            plan.append((path, None, 0, 0, None))
+
         for func in funcs:
-            # loop info is tupled with a message, get that and send iteration count. if not found default to 1
             loopdata: tuple[int, str] | int = getattr(func, "__loop__", 1)
-            iterations, message = (loopdata, "") if isinstance(loopdata, int) else loopdata
-            if message:
-                print(f"{Color.YELLOW}{message}{Color.RESET}")
+            iterations: int = loopdata if isinstance(loopdata, int) else loopdata[0]
+
+            # @parametrize functions get split (classes stay one unit, their lifecycle runs once per process)
+            parametrized: bool = func.parametrized if isinstance(func, LazyTest) else "__parametrize__" in getattr(func, "__dict__", {})
+            chunks: list[tuple[int, int] | None] = [None]
+            if parametrized and not isclass(func) and not getattr(func, "is_class", False) and workers > 1:
+                chunks = [(which, workers) for which in range(workers)]
+
+            plan.extend((path, func, index, iterations, chunk) for index in range(iterations) for chunk in chunks)
+
+    # only real units become tasks, order maps a task's seq back to its spot in the plan
+    order: list[int] = [i for i, unit in enumerate(plan) if unit[1] is not None]
+
+    # send out the slowest stuff first so one long test doesn't get started last (printing order doesn't change).
+    # not on a budget though, then the order they came in (quickest first, see history.quickfirst) is the point
+    if timings and stop is None and not filebudget:
+        order = [order[i] for i in longestfirst([(plan[i][0], plan[i][1]) for i in order], timings)]
+
+    # finished units waiting for their turn to print, and where we're at in printing
+    done: dict[int, tuple[list[TestResult], str]] = {}
+    cursor: int = 0
+    current: str | None = None
+    told: set[str] = set()
+
+    # what actually got handed out (a task's seq -> its spot in the plan)
+    sent: list[int] = []
+
+    def tasks() -> Generator[tuple[Callable[..., Any], tuple], None, None]:
+        """Hand units out as workers free up. Out of time, they go straight to done as not run instead (a split @parametrize test just once)."""
+        for i in order:
+            path, func, _, _, chunk = plan[i]
+            picked: set[str] | None = select.get(path) if select is not None else None
+
+            if stop is not None and time() > stop[0]:
+                done[i] = (__notrun(func, path, stop[1], picked) if chunk is None or chunk[0] == 0 else [], "")
+                continue
+
+            sent.append(i)
+            shaky: set[str] | None = flaky.get(path) if flaky is not None else None
+            yield __unitrunner, (path, func.__name__, ff, output, picked, probes, chunk, stop, filebudget, shaky, retries)
+
+    def drain(gaps: bool) -> bool:
+        """Print finished units in plan order. Stops at the first unfinished one unless gaps is set. Returns True on a fail-fast stop."""
+        nonlocal cursor, current, runs
+
+        while cursor < len(plan):
+            path, func, index, iterations, chunk = plan[cursor]
+
+            # not done yet, either wait for it or (when cancelling) just skip it
+            if func is not None and cursor not in done:
+                if not gaps:
+                    return False
+                cursor += 1
+                continue
+
+            cursor += 1
+            results, log = done.pop(cursor - 1) if func is not None else ([], "")
+
+            # units that never started get no header or messages, just their reason (same for empty files once the whole run's out of time)
+            quiet: bool = (not log and all(result.skipped for result in results)) if func is not None else (stop is not None and stop[1] in told)
+            if path != current and not quiet:
+                print(f"\n{Color.BLUE}{path}{Color.RESET}")
+                current = path
+
+            if func is None:
+                if not quiet:
+                    print(f"{Color.YELLOW}No test functions found{Color.RESET}")
+                continue
+
+            # loop message only goes out once, right before the first iteration (first chunk of it)
+            loopdata: tuple[int, str] | int = getattr(func, "__loop__", 1)
+            if index == 0 and (chunk is None or chunk[0] == 0) and not isinstance(loopdata, int) and loopdata[1] and not quiet:
+                print(f"{Color.YELLOW}{loopdata[1]}{Color.RESET}")
 
-            # retry function that many times
-            for index in range(iterations):
-                for result in __iterfuncs(func, path, ff, output):
-                    runs += 1
-                    __result(result, passes, fails, verbose, iterations, index)
+            if log:
+                print(log, end="")
 
-                    # fast fail stops all testing immediately
-                    if not result.passed and ff:
-                        print(f"{Color.RED}Fail-fast enabled, stopping tests.{Color.RESET}")
-                        return passes, fails, runs
+            for result in results:
+                runs += not result.skipped
+                __result(result, store, verbose, iterations, index, reporters, told)
+
+                if not result.passed and not result.skipped and ff:
+                    return True
+
+        return False
+
+    # nothing to farm out, just print the empty files
+    if not order:
+        drain(False)
+        return store.passes, store.fails, runs
+
+    pool: WorkerPool = WorkerPool(min(workers, len(order)))
+    stopped: bool = False
+
+    try:
+        for seq, ok, value in pool.imap(tasks()):
+            path, func, _, _, _ = plan[sent[seq]]
+
+            # the worker couldn't even load/run the unit, so report it as one failure
+            if not ok:
+                value = ([TestResult(name=func.__name__, file=path, passed=False, duration=0.0, error=value)], "")
+
+            done[sent[seq]] = value
+            if drain(False):
+                stopped = True
+                break
+
+            # fail-fast cancels outstanding work on every worker, even if this one isn't up to print yet
+            if ff and any(not result.passed and not result.skipped for result in value[0]):
+                stopped = drain(True)
+                break
+
+        # units that ran out of time never come back from a worker, they're sitting in done already
+        else:
+            drain(False)
+
+    finally:
+        # kill on any early exit, otherwise let them go peacefully
+        if stopped or cursor < len(plan):
+            pool.kill()
+        else:
+            pool.close()
 
-    # return pass/fail lists and run count
-    return passes, fails, runs
\ No newline at end of file
+    if stopped:
+        print(f"{Color.RED}Fail-fast enabled, stopping tests.{Color.RESET}")
+
+    return store.passes, store.fails, runs
+
+# main runner
+def runtest(
+    files: dict[str, list],
+    ff: bool,
+    verbose: bool = False,
+    output: bool = False,
+    workers: int = 0,
+    select: dict[str, set[str]] | None = None,
+    timings: dict[str, dict[str, list]] | None = None,
+    concurrency: int = 1,
+    reporters: list[Reporter] | None = None,
+    probes: tuple[str, ...] = (),
+    budget: float | None = None,
+    filebudget: float | None = None,
+    flaky: dict[str, set[str]] | None = None,
+    retries: int = 0
+) -> tuple[ResultView, ResultView, int]:
+    """
+    Main test runner. Given a dictionary of file paths and their associated test functions or classes,
+    this function runs each test; takes results from it; and returns the passes and fails, as well as a total run count.
+    Also displays results using __result.
+
+    Args:
+        files (dict[str, list]) = Dictionary mapping file paths to lists of test functions or classes.
+        ff (bool) = Fast fail flag.
+        verbose (bool, optional) = Verbose output flag. Defaults to False.
+        output (bool, optional) = Let tests print instead of swallowing their IO. Defaults to False.
+        workers (int, optional) = Run across this many worker processes (-n). 0 or 1 runs everything in this process. Defaults to 0.
+        select (dict[str, set[str]] | None, optional) = Per file path, the only test names to run (--lf). Defaults to None (run everything).
+        timings (dict[str, dict[str, list]] | None, optional) = Recorded results from history.load(). With workers, units get
+            handed out longest-first using these. Defaults to None (file order).
+        concurrency (int, optional) = How many plain async tests in a file can await at the same time (--async-concurrency).
+            Only applies without workers. Defaults to 1 (one at a time, in order).
+        reporters (list[Reporter] | None, optional) = Reporters every result gets streamed to as it finishes (-o).
+            Starting and closing them is on the caller. Defaults to None.
+        probes (tuple[str, ...], optional) = Per-test probes to run every test under (see probes.PROBES), ex: ("deps",) for --affected.
+            Async tests batched by concurrency don't get probed. Defaults to () (none).
+        budget (float | None, optional) = Seconds the whole run gets (--max-time). Once it's up no new test gets started
+            (whatever's running finishes), and everything left comes back as not run. Defaults to None (no limit).
+        filebudget (float | None, optional) = Same, but for each file on its own (--file-time), the run moves on to the next file. Defaults to None (no limit).
+        flaky (dict[str, set[str]] | None, optional) = Per file path, the tests history says are flaky (see history.flaky).
+            They get up to `retries` extra attempts, and how many they needed goes on their result (attempts). Defaults to None (none).
+        retries (int, optional) = How many extra attempts a flaky test gets (--flaky-retries). Defaults to 0.
+
+    Returns:
+        tuple[ResultView, ResultView, int] = A tuple containing:
+            - ResultView = the passing tests (len and iterate it like a list, results get rebuilt as you go)
+            - ResultView = the failing tests
+            - int = number of tests run
+            Both views share one ResultStore (view.store), which has every result in run order (and a count of what never ran).
+    """
+    # when the whole run has to stop starting tests, and what to tell the user
+    stop: tuple[float, str] | None = None
+    if budget:
+        stop = (time() + budget, "Out of time (--max-time), the rest of the run didn't get started.")
+
+    # hand off to the worker pool if we got asked to go wide
+    if workers > 1:
+        passes, fails, total = __runparallel(files, ff, verbose, output, workers, select, timings, reporters, probes, stop, filebudget, flaky, retries)
+        __savebaselines(passes.store)
+        return passes, fails, total
+
+    # every result (stored by column, see ResultStore), a run count, and what's been said about time running out
+    store: ResultStore = ResultStore()
+    runs: int = 0
+    told: set[str] = set()
+
+    try:
+        for path, funcs in files.items():
+            # out of time for the whole run, everything left just gets counted (nothing gets imported, no headers)
+            if stop is not None and time() > stop[0]:
+                for func in funcs:
+                    repeat: tuple[int, str] | int = getattr(func, "__loop__", 1)
+                    times: int = repeat if isinstance(repeat, int) else repeat[0]
+
+                    for result in __notrun(func, path, stop[1], select.get(path) if select is not None else None, times):
+                        __result(result, store, verbose, 1, 0, reporters, told)
+                continue
+
+            print(f"\n{Color.BLUE}{path}{Color.RESET}")
+            deadline: tuple[float, str] | None = __deadline(stop, filebudget, path)
+
+            # if no tests found in a file warn the user
+            if not funcs:
+                print(f"{Color.YELLOW}No test functions found{Color.RESET}")
+                continue
+
+            # independent async tests go first, all together on the file's loop (not when measuring memory, they'd all share one number)
+            if concurrency > 1 and "memory" not in probes:
+                batch, funcs = __batchable(funcs, select.get(path) if select is not None else None, flaky.get(path) if flaky is not None else None)
+
+                for result in __runasync(batch, path, output, concurrency, deadline) if batch else []:
+                    runs += not result.skipped
+                    __result(result, store, verbose, 1, 0, reporters, told)
+
+                    if not result.passed and not result.skipped and ff:
+                        print(f"{Color.RED}Fail-fast enabled, stopping tests.{Color.RESET}")
+                        return store.passes, store.fails, runs
+            
+            for func in funcs:
+                # loop info is tupled with a message, get that and send iteration count. if not found default to 1
+                loopdata: tuple[int, str] | int = getattr(func, "__loop__", 1)
+                iterations, message = (loopdata, "") if isinstance(loopdata, int) else loopdata
+
+                # out of time before it even started, so it never gets imported, it just counts as not run
+                if deadline is not None and time() > deadline[0]:
+                    for result in __notrun(func, path, deadline[1], select.get(path) if select is not None else None, iterations):
+                        __result(result, store, verbose, iterations, 0, reporters, told)
+                    continue
+
+                if message:
+                    print(f"{Color.YELLOW}{message}{Color.RESET}")
+
+                # retry function that many times
+                for index in range(iterations):
+                    for result in __iterfuncs(
+                        func, path, ff, output, select.get(path) if select is not None else None, probes, None, deadline,
+                        flaky.get(path) if flaky is not None else None, retries
+                    ):
+                        runs += not result.skipped
+                        __result(result, store, verbose, iterations, index, reporters, told)
+
+                        # fast fail stops all testing immediately
+                        if not result.passed and not result.skipped and ff:
+                            print(f"{Color.RED}Fail-fast enabled, stopping tests.{Color.RESET}")
+                            return store.passes, store.fails, runs
+
+            # done with this file, so done with its fixtures and event loop
+            __fixturedown(output, "class", "module")
+            __closeloops()
+
+    # always put the fixtures, the warm @timeout worker, and any open loops down, no matter how we leave (and keep any new baselines)
+    finally:
+        __fixturedown(output)
+        __closeloops()
+        __closewarm()
+        __savebaselines(store)
+
+    # return pass/fail views and run count
+    return store.passes, store.fails, runs
\ No newline at end of file
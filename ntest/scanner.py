@@ -1,88 +1,613 @@
-# directory scanning
-from os import PathLike, listdir
-from os.path import isdir, isfile, join, splitext, abspath
+# directory scanning (one os.scandir per directory, fanned out over threads for wide trees)
+from os import DirEntry, PathLike, cpu_count, fspath, sep, stat, stat_result
+from os import scandir as os_scandir
+from os.path import dirname, join, splitext, abspath, exists
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
 from sys import path as syspath
+from .watch import IGNORED
 
-# what lets you actually run the functions
-from importlib.util import module_from_spec, spec_from_file_location
-from importlib.machinery import ModuleSpec
-from types import ModuleType
-from inspect import getmembers, isfunction, isclass
+# importing (the slow way), parsing (the fast way), and not doing either (the cache way)
+from .loader import load, collect
+from .pool import WorkerPool
+from . import cache, timeline
+from hashlib import sha256
+from json import dumps
+import ast
+import builtins
 
-# the testcase class and some other types
-from .classes.TestCase import TestCase
-from typing import Any, Callable
+# the lazy stand-in, the decorators we know how to resolve statically, and some other types
+from .classes.LazyTest import LazyTest
+from .decorators import benchmark, loop, memlimit, patch, retry, skip, timeout, xfail
+from typing import Any, Callable, Generator, NamedTuple
 
-def scandir(path: str | PathLike[str], start: str = "", end: str = "_test") -> dict[str, list]:
+# decorators by name, so @skip(...) / @ntest.skip(...) in source can be applied to a LazyTest.
+# @parametrize isn't in here on purpose: its cases are data (often a generator), they have to come from the real function
+DECORATORS: dict[str, Callable[..., Any]] = {
+    "benchmark": benchmark,
+    "loop": loop,
+    "memlimit": memlimit,
+    "patch": patch,
+    "retry": retry,
+    "skip": skip,
+    "timeout": timeout,
+    "xfail": xfail,
+}
+
+# the attributes those decorators set, which is everything the runner needs to know before importing
+ATTRS: tuple[str, ...] = ("__skip__", "__timeout__", "__loop__", "__retry__", "__xfail__", "__patch__", "__benchmark__", "__memlimit__")
+
+# base classes that are never a TestCase (object, Exception, ...), so parse doesn't have to give up on them
+BUILTINS: frozenset[str] = frozenset(dir(builtins))
+
+# never walked into: hidden stuff plus the usual junk (--ignore adds more, and .gitignore files get respected on top)
+IGNORE: tuple[str, ...] = (".*", *sorted(IGNORED))
+
+# a level of the walk with this many directories gets listed across threads (and this many of them)
+WIDE: int = 8
+THREADS: int = min(32, (cpu_count() or 1) + 4)
+
+def __decorate(stub: LazyTest, decorators: list[ast.expr]) -> None:
+    """
+    Apply the decorators from the source to a LazyTest, bottom up like python does.
+    Anything that isn't one of ours called with literal arguments flags the stub as dynamic.
+    """
+    for node in reversed(decorators):
+        # has to be a call like @skip("reason") or @ntest.skip("reason")
+        func: ast.expr | None = node.func if isinstance(node, ast.Call) else None
+        name: str | None = func.id if isinstance(func, ast.Name) else (func.attr if isinstance(func, ast.Attribute) else None)
+
+        if name == "parametrize":
+            stub.parametrized = True
+
+        if name not in DECORATORS:
+            stub.dynamic = True
+            continue
+
+        # arguments have to be literals, otherwise we'd have to run the module to know them
+        try:
+            args: list[Any] = [ast.literal_eval(arg) for arg in node.args] # type: ignore
+            kwargs: dict[str, Any] = {kw.arg: ast.literal_eval(kw.value) for kw in node.keywords if kw.arg} # type: ignore
+
+        except ValueError:
+            stub.dynamic = True
+            continue
+
+        DECORATORS[name](*args, **kwargs)(stub)
+
+def __testcase(node: ast.ClassDef, cases: set[str], others: set[str]) -> bool | None:
+    """
+    Whether a class is a TestCase, going by its bases: TestCase itself (imported as TestCase or reached through a module),
+    or a class from this file that is one. None if a base comes from somewhere parse can't see (ex: a base class imported from another file).
+    """
+    for base in node.bases:
+        if isinstance(base, ast.Name):
+            if base.id == "TestCase" or base.id in cases:
+                return True
+
+            if base.id in others or base.id in BUILTINS:
+                continue
+
+        elif isinstance(base, ast.Attribute) and base.attr == "TestCase":
+            return True
+
+        return None
+
+    return False
+
+def parse(path: str) -> list[LazyTest] | None:
+    """
+    Find the tests in a file by parsing it with ast instead of importing it.
+    Picks up the same things collect does (test_ functions and TestCase subclasses defined in the file), just without running anything.
+
+    Args:
+        path (str): Path to the .py file.
+
+    Returns:
+        list[LazyTest] | None: Stand-ins for every test found, in name order (same as getmembers).
+                               None if a class's bases can't be worked out from the source, the file has to be imported to know.
+    """
+    with open(path, "rb") as file:
+        tree: ast.Module = ast.parse(file.read(), filename=path)
+
+    # class names in this file that are TestCases (so subclasses of subclasses count too), and ones that aren't
+    cases: set[str] = set()
+    others: set[str] = set()
+    found: dict[str, LazyTest] = {}
+
+    for node in tree.body:
+        # module level test functions (async too, isfunction says yes to those)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test_"):
+            stub = LazyTest(path, node.name)
+
+        # TestCase subclasses. one that might be, thru a base from another file, means we can't trust what we found
+        elif isinstance(node, ast.ClassDef):
+            kind: bool | None = __testcase(node, cases, others)
+            if kind is None:
+                return None
+
+            if not kind:
+                others.add(node.name)
+                continue
+
+            cases.add(node.name)
+            methods: list[str] = [
+                n.name for n in node.body
+                if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and (n.name.startswith("test_") or n.name == "run")
+            ]
+            stub = LazyTest(path, node.name, is_class=True, methods=methods)
+
+        else:
+            continue
+
+        __decorate(stub, node.decorator_list)
+        found[node.name] = stub
+
+    return [found[name] for name in sorted(found)]
+
+def __static(path: str) -> dict[str, LazyTest]:
+    """What parse sees in a file, by name. Empty if it can't be parsed (then nothing in it can be trusted to the cache)."""
+    try:
+        return {stub.__name__: stub for stub in parse(path) or []}
+
+    except (OSError, SyntaxError, ValueError):
+        return {}
+
+def __entry(item: Any, static: dict[str, LazyTest]) -> dict[str, Any]:
+    """
+    Turn a collected test (real or LazyTest) into a json-able cache entry: name, kind, methods, and decorator attributes.
+    Attributes only ever come from the source (static, see __static). What decorators worked out at import time
+    (ex: @skip(os.environ.get("DB") is None)) can change from run to run without the file changing, so a test with any of that
+    (or one parse can't see at all) is marked dynamic, and the real object gets asked again every run.
+    """
+    stub: bool = isinstance(item, LazyTest)
+    parsed: LazyTest | None = item if stub else static.get(item.__name__)
+    is_class: bool = item.is_class if stub else isinstance(item, type)
+
+    entry: dict[str, Any] = {
+        "name": item.__name__,
+        "is_class": is_class,
+        "methods": (item.methods if stub else [n for n in dir(item) if n.startswith("test_") or n == "run"]) if is_class else [],
+        "attrs": {},
+        "dynamic": True if parsed is None else parsed.dynamic,
+        "parametrized": item.parametrized if stub else "__parametrize__" in getattr(item, "__dict__", {}),
+    }
+
+    # read attrs straight out of __dict__, so a dynamic stub doesn't get imported just to fill the cache
+    source: dict[str, Any] = parsed.__dict__ if parsed is not None else {}
+    for attr in ATTRS:
+        if attr not in source:
+            continue
+
+        # if json can't hold it we can't trust the entry without the real object
+        try:
+            dumps(source[attr])
+            entry["attrs"][attr] = source[attr]
+
+        except (TypeError, ValueError):
+            entry["dynamic"] = True
+
+    # the real thing has to agree with the source, otherwise something set its attributes at import time
+    if not stub and not entry["dynamic"]:
+        real: dict[str, Any] = {attr: getattr(item, attr) for attr in ATTRS if hasattr(item, attr)}
+        if dumps(real, sort_keys=True, default=repr) != dumps(entry["attrs"], sort_keys=True):
+            entry["dynamic"] = True
+
+    return entry
+
+def __stub(path: str, entry: dict[str, Any]) -> LazyTest:
+    """Rebuild a LazyTest from a cache entry (json turned our tuples into lists, so turn them back)."""
+    stub = LazyTest(path, entry["name"], is_class=entry["is_class"], methods=entry["methods"])
+    stub.dynamic = entry["dynamic"]
+    stub.parametrized = entry.get("parametrized", False)
+
+    for attr, value in entry["attrs"].items():
+        setattr(stub, attr, tuple(value) if isinstance(value, list) else value)
+
+    return stub
+
+def __fresh(long: str, info: stat_result, entries: dict[str, Any]) -> bool:
+    """
+    Whether a file's collection cache entry is still good. Same mtime + size is a hit without even opening it,
+    otherwise the content hash gets checked (touched but unchanged files still hit).
+    """
+    entry: dict[str, Any] | None = entries.get(abspath(long))
+    if entry is None:
+        return False
+
+    if entry["mtime"] != info.st_mtime_ns or entry["size"] != info.st_size:
+        with open(long, "rb") as file:
+            if sha256(file.read()).hexdigest() != entry["hash"]:
+                return False
+
+        # same bytes, just a new timestamp. remember that so next time is free
+        entry["mtime"], entry["size"] = info.st_mtime_ns, info.st_size
+
+    return True
+
+def __cached(long: str, entries: dict[str, Any]) -> list[LazyTest] | None:
+    """Look a file up in the collection cache (see __fresh), its tests as LazyTests on a hit and None on a miss."""
+    if not __fresh(long, stat(long), entries):
+        return None
+
+    return [__stub(long, test) for test in entries[abspath(long)]["tests"]]
+
+class __Rule(NamedTuple):
+    """One ignore pattern: where it applies from, the glob, whether it's a !negation, dirs only (trailing /), and anchored (has a / in it)."""
+    base: str
+    glob: str
+    negate: bool
+    dironly: bool
+    anchored: bool
+
+def __rule(base: str, line: str) -> __Rule | None:
+    """Parse one .gitignore line (or --ignore glob) into a rule. The common subset: #comments, !negation, trailing / for dirs, / to anchor, ** for any depth."""
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+
+    negate: bool = line.startswith("!")
+    line = line[1:] if negate else line
+    dironly: bool = line.endswith("/")
+    line = line.rstrip("/")
+    anchored: bool = "/" in line
+    line = line.lstrip("/")
+
+    return __Rule(base, line, negate, dironly, anchored) if line else None
+
+def __ignored(path: str, name: str, isdir: bool, rules: tuple[__Rule, ...]) -> bool:
+    """Whether a path gets skipped. Like git, the last rule that matches wins (so a !negation can bring something back)."""
+    skip: bool = False
+    for rule in rules:
+        if rule.dironly and not isdir:
+            continue
+
+        # anchored rules match the path from where the rule came from, the rest just the name (at any depth)
+        if rule.anchored:
+            if not path.startswith(rule.base):
+                continue
+            hit: bool = fnmatch(path[len(rule.base):], rule.glob) or (rule.glob.startswith("**/") and fnmatch(name, rule.glob[3:]))
+
+        else:
+            hit = fnmatch(name, rule.glob)
+
+        if hit:
+            skip = not rule.negate
+
+    return skip
+
+def __list(directory: str, rules: tuple[__Rule, ...], start: str, end: str) -> tuple[list[str], list[str], tuple[__Rule, ...]]:
+    """
+    One directory of the walk: the matching test files in it and the subdirectories worth going into (both sorted),
+    plus the rules its children get (this directory's .gitignore added on). Everything comes off the DirEntry, no extra stats.
+    """
+    try:
+        with os_scandir(directory) as listing:
+            entries: list[DirEntry] = sorted(listing, key=lambda entry: entry.name)
+
+    # vanished or no permission, nothing in it for us
+    except OSError:
+        return [], [], rules
+
+    # this directory's .gitignore applies to everything under it
+    if any(entry.name == ".gitignore" for entry in entries):
+        try:
+            with open(join(directory, ".gitignore"), "r", encoding="utf-8", errors="replace") as file:
+                base: str = join(abspath(directory), "").replace(sep, "/")
+                rules = rules + tuple(rule for line in file if (rule := __rule(base, line)) is not None)
+        except OSError:
+            pass
+
+    files: list[str] = []
+    subdirs: list[str] = []
+    for entry in entries:
+        # symlinked directories don't get followed (same as os.walk), that's how you end up walking in circles
+        try:
+            isdir: bool = entry.is_dir(follow_symlinks=False)
+            isfile: bool = not isdir and entry.is_file()
+        except OSError:
+            continue
+
+        name, ext = splitext(entry.name)
+        if not isdir and not (isfile and ext == ".py" and name.startswith(start) and name.endswith(end)):
+            continue
+
+        if __ignored(abspath(entry.path).replace(sep, "/"), entry.name, isdir, rules):
+            continue
+
+        (subdirs if isdir else files).append(entry.path)
+
+    return files, subdirs, rules
+
+def __walk(
+    root: str | PathLike[str],
+    start: str,
+    end: str,
+    only: set[str] | None,
+    ignore: tuple[str, ...] = ()
+) -> Generator[str, None, None]:
+    """
+    The actual walk behind scandir/find. Yields the path of every matching test file: a directory's files (sorted) and then
+    each of its subdirectories the same way. only (if given) is the set of absolute file paths we're allowed to collect,
+    everything else is never touched. Directories get listed a whole level at a time, across a thread pool once a level is
+    wide enough to be worth it (os.scandir lets go of the GIL while it waits on the disk).
+    """
+    root = fspath(root)
+
+    # default ignores + --ignore apply everywhere, .gitignores get picked up on the way down
+    base: str = join(abspath(root), "").replace(sep, "/")
+    rules: tuple[__Rule, ...] = tuple(rule for glob in (*IGNORE, *ignore) if (rule := __rule(base, glob)) is not None)
+
+    # with --lf and friends, only go into directories that lead to a file we want
+    wanted: set[str] | None = None
+    if only is not None:
+        wanted = set()
+        for want in only:
+            parent: str = dirname(want)
+            while parent not in wanted and dirname(parent) != parent:
+                wanted.add(parent)
+                parent = dirname(parent)
+            wanted.add(parent)
+
+    # list everything level by level, remembering each directory's files and subdirectories
+    listed: dict[str, tuple[list[str], list[str]]] = {}
+    level: list[tuple[str, tuple[__Rule, ...]]] = [(root, rules)]
+    pool: ThreadPoolExecutor | None = None
+
+    with timeline.span(f"walk {root}", "collect"):
+        try:
+            while level:
+                if len(level) >= WIDE and pool is None:
+                    pool = ThreadPoolExecutor(THREADS)
+
+                # one batch of directories per thread, a future per directory costs more than listing it
+                work = lambda batch: [__list(directory, rules, start, end) for directory, rules in batch]
+                if pool is not None and len(level) >= WIDE:
+                    batches: list[list[tuple[str, tuple[__Rule, ...]]]] = [level[i::THREADS] for i in range(THREADS)]
+                    done: list[list[tuple[list[str], list[str], tuple[__Rule, ...]]]] = list(pool.map(work, batches))
+                    found: list[tuple[list[str], list[str], tuple[__Rule, ...]]] = [None] * len(level) # type: ignore
+                    for i, results in enumerate(done):
+                        found[i::THREADS] = results
+
+                else:
+                    found = work(level)
+
+                following: list[tuple[str, tuple[__Rule, ...]]] = []
+                for (directory, _), (files, subdirs, inherited) in zip(level, found):
+                    subdirs = [sub for sub in subdirs if wanted is None or abspath(sub) in wanted]
+                    listed[directory] = (files, subdirs)
+                    following.extend((sub, inherited) for sub in subdirs)
+
+                level = following
+
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    # then hand them out depth first, in a stable order
+    stack: list[str] = [root]
+    while stack:
+        directory: str = stack.pop()
+        files, subdirs = listed[directory]
+
+        for long in files:
+            if only is None or abspath(long) in only:
+                yield long
+
+        stack.extend(reversed(subdirs))
+
+def __describe(path: str) -> list[dict[str, Any]] | None:
+    """Import a test file in a collection worker and send back what's in it as cache entries (modules don't pickle). None if it couldn't be loaded."""
+    module = load(path)
+    return None if module is None else [__entry(test, __static(path)) for test in collect(module)]
+
+def __preload(paths: list[str], workers: int, threads: bool) -> dict[str, list | None]:
+    """
+    Import a bunch of test files at the same time, ahead of the in order pass that builds scandir's result.
+    Processes send back descriptors that turn into LazyTests (like cache hits), threads import the real modules right here.
+    Files that blow up are left out, so the in order pass imports them again and raises the same way a serial run would.
+
+    Returns:
+        dict[str, list | None]: Path -> its tests (None if it couldn't be loaded), for every file that imported fine.
+    """
+    loaded: dict[str, list | None] = {}
+    size: int = min(workers, len(paths))
+
+    with timeline.span(f"import {len(paths)} files across {size} {'threads' if threads else 'processes'}", "collect"):
+        if threads:
+            def attempt(path: str) -> tuple[str, Any]:
+                try:
+                    module = load(path)
+                    return path, None if module is None else collect(module)
+                except Exception:
+                    return path, False
+
+            with ThreadPoolExecutor(size) as pool:
+                return {path: tests for path, tests in pool.map(attempt, paths) if tests is not False}
+
+        workerpool: WorkerPool = WorkerPool(size, label="collect worker")
+        try:
+            for seq, ok, value in workerpool.imap((__describe, (path,)) for path in paths):
+                if ok:
+                    loaded[paths[seq]] = None if value is None else [__stub(paths[seq], entry) for entry in value]
+
+        finally:
+            workerpool.close()
+
+    return loaded
+
+def __collect(long: str, lazy: bool, entries: dict[str, Any] | None, loaded: dict[str, list | None] | None = None) -> list | None:
+    """
+    Get the tests out of a file that wasn't in the collection cache: by parsing or importing it (or from loaded, if __preload already did),
+    and then remember what we found in entries (None to not use the cache). None if the file couldn't be loaded.
+    """
+    info: stat_result = stat(long)
+
+    # the cheap way, don't run a thing (unless parsing can't tell what the tests are)
+    tests: list | None = parse(long) if lazy else None
+    if tests is not None:
+        pass
+
+    # already imported by the parallel collection phase
+    elif loaded is not None and long in loaded:
+        found: list | None = loaded[long]
+        if found is None:
+            return None
+        tests = found
+
+    else:
+        # load the module from the file, if we couldn't load it, skip it
+        module = load(long)
+        if module is None:
+            return None
+
+        # gather all test functions and TestCase methods
+        tests = collect(module)
+
+    # remember what we found for next time
+    if entries is not None:
+        with open(long, "rb") as file:
+            digest: str = sha256(file.read()).hexdigest()
+
+        # attrs for imported tests come from parsing the file, stubs already are that
+        static: dict = {} if all(isinstance(test, LazyTest) for test in tests) else __static(long)
+
+        entries[abspath(long)] = {
+            "mtime": info.st_mtime_ns,
+            "size": info.st_size,
+            "hash": digest,
+            "tests": [__entry(test, {} if isinstance(test, LazyTest) else static) for test in tests],
+        }
+
+    return tests
+
+def find(path: str | PathLike[str], start: str = "", end: str = "_test", ignore: tuple[str, ...] = ()) -> list[str]:
+    """
+    Walk the provided path like scandir does, but just return the matching file paths without collecting anything.
+    Nothing gets parsed or imported (used to pick a --shard before collection).
+
+    Args:
+        path (str | PathLike[str]): The root directory to scan for test files.
+        start (str): Start pattern to match test files.
+        end (str): End pattern to match test files.
+        ignore (tuple[str, ...]): More globs to skip, on top of IGNORE and .gitignore (see scandir).
+
+    Returns:
+        list[str]: Matching test file paths, in walk order.
+    """
+    return list(__walk(path or '.', start, end, None, ignore))
+
+def scandir(
+    path: str | PathLike[str],
+    start: str = "",
+    end: str = "_test",
+    lazy: bool = False,
+    cached: bool = False,
+    only: set[str] | None = None,
+    ignore: tuple[str, ...] = (),
+    workers: int = 0,
+    threads: bool = False
+) -> dict[str, list]:
     """Walk the provided path and find all *_test.py files, returning a dict of file paths and their functions.
-    Also works thru subdirectories using my little friend recursion. Looks for functions only in modules named *_test.py for right now.
-    Will eventually make it so: 
-    1) you can specify your own test file pattern 
-    2) you can specify your own test function pattern 
+    Also works thru subdirectories (start and end apply all the way down). Looks for functions only in modules named *_test.py for right now.
+    Hidden directories, IGNORE, ignore, and whatever .gitignore files say get skipped without being looked in.
+    Will eventually make it so:
+    1) you can specify your own test file pattern
+    2) you can specify your own test function pattern
     3) you can just plug a custom file
 
     Args:
         path (str | PathLike[str]): The root directory to scan for test files. Defaults to current directory.
-    
-        
+        start (str): Start pattern to match test files.
+        end (str): End pattern to match test files.
+        lazy (bool): Parse files with ast instead of importing them. Tests come back as LazyTest stand-ins
+                     that only import their module when they actually run. Defaults to False.
+        cached (bool): Use the collection cache in .ntest_cache/. Files with the same path, mtime, size (or content hash)
+                       as last time come back as LazyTests straight from the cache, with no parsing or importing.
+                       Tests with decorator arguments that aren't literals still get imported to read them (see __entry). Defaults to False.
+        only (set[str] | None): Absolute paths of the only files to collect (--lf and friends). Everything else
+                                is skipped without being parsed or imported. Defaults to None (collect everything).
+        ignore (tuple[str, ...]): More globs to skip (--ignore), gitignore style: a name matches at any depth,
+                                  anything with a / in it matches from path, and a trailing / only matches directories. Defaults to ().
+        workers (int): Import files that have to be imported (not cached, not lazy) this many at a time. Defaults to 0 (one by one).
+                       In processes, they come back as LazyTests and this process doesn't import them till they run (with -n, never).
+        threads (bool): Import in threads in this process instead, for imports stuck waiting on disk/network. Only safe if the test
+                        modules don't mind being imported at the same time as each other. Defaults to False (processes).
+
     Returns:
-        dict[str, list]:  Keys are file paths, values are lists of callables found in matched files.
+        dict[str, list]:  Keys are file paths, values are lists of callables (or LazyTests) found in matched files.
     """
-
     # root directory to scan
     root: str | PathLike[str] = path or '.'
 
-    # insert cwd to path so imports work
-    syspath.insert(0, abspath(root))
-
-    # dict of test file paths and their lists of functions
+    # dict of test file paths and their lists of functions, and the collection cache (if we're using it)
     tests: dict[str, list] = {}
+    entries: dict[str, Any] | None = cache.read("collection.json", {}) if cached else None
 
-    # walk directory
-    for entry in listdir(root):
-        # get full path by joining current dir and current item, split name and ext
-        long: str = join(root, entry)
+    # the root and every directory with a test in it go on sys.path (once), so tests can import the project and their neighbors.
+    # all of it before anything gets imported, so collection workers start out with it too
+    paths: list[str] = list(__walk(root, start, end, only, ignore))
+    importable: set[str] = set()
 
-        # split into name and extension
-        split: tuple[str, str] = splitext(entry)
-        name: str = split[0]
-        ext: str = split[1]
+    for long in paths:
+        for folder in (abspath(root), abspath(dirname(long))):
+            if folder not in importable:
+                importable.add(folder)
+                if folder not in syspath:
+                    syspath.insert(0, folder)
 
-        # find subdirectories by recursion!!!!! yippee!!!
-        if isdir(long):
-            tests.update(scandir(long))
+    # unchanged files, straight out of the cache (checked once here, each file gets stat'd and maybe hashed one time)
+    hits: dict[str, list[LazyTest]] = {}
+    if entries is not None:
+        for long in paths:
+            stubs: list[LazyTest] | None = __cached(long, entries)
+            if stubs is not None:
+                hits[long] = stubs
 
-        # if it is a file (and a python file that matches start and end)
-        elif isfile(long) and ext == ".py" and name.startswith(start) and name.endswith(end):
-            # load the module from the file
-            spec: ModuleSpec | None = spec_from_file_location(name, long)
+    # import whatever isn't cached all at once if asked, results still get put together in walk order below
+    loaded: dict[str, list | None] | None = None
+    if workers > 1 and not lazy:
+        misses: list[str] = [long for long in paths if long not in hits]
+        loaded = __preload(misses, workers, threads) if len(misses) > 1 else None
 
-            # if we couldn't load it, skip it
-            if spec is None or spec.loader is None:
-                continue
-            
-            # get its contents
-            module: ModuleType = module_from_spec(spec)
-            spec.loader.exec_module(module)
-
-            # gather all test functions and TestCase methods
-            funcs: list[Callable[..., Any]] = []
-            for _, member in getmembers(module):
-                # first is function check, second is class. ik it's ugly
-                if (
-                    isfunction(member)
-                    and member.__module__ == module.__name__
-                    and member.__name__.startswith("test_")  # edit these two lines
-                    and member.__name__.endswith("")         # to function pattern params (not the start and stop we have already)
-                ) \
-                or (
-                    isclass(member)
-                    and issubclass(member, TestCase)
-                    and member.__module__ == module.__name__
-                ):
-                    funcs.append(member)
-
-            # add to the dict if we found any at all
-            tests[long] = funcs
-
-    return tests
\ No newline at end of file
+    for long in paths:
+        with timeline.span(f"collect {long}", "collect", lazy=lazy, cached=long in hits):
+            found: list | None = hits[long] if long in hits else __collect(long, lazy, entries, loaded)
+
+        # add to the dict if we could load it at all
+        if found is not None:
+            tests[long] = found
+
+    # no cache, no bookkeeping
+    if entries is None:
+        return tests
+
+    # evict anything whose file is gone
+    for key in [key for key in entries if not exists(key)]:
+        del entries[key]
+
+    cache.write("collection.json", entries)
+    return tests
+
+def names(item: Any) -> list[str]:
+    """
+    The test names a collected item will report as (Class.method, Class for run, or the function name).
+    Works on both real objects and LazyTests, used for --collect-only.
+
+    Args:
+        item (Any): A test function, TestCase subclass, or LazyTest.
+
+    Returns:
+        list[str]: Formatted test names.
+    """
+    # lazy classes only know what was written in the class body, real ones get inherited tests too
+    if isinstance(item, LazyTest):
+        methods: list[str] | None = sorted(item.methods) if item.is_class else None
+
+    else:
+        methods = [n for n in dir(item) if n.startswith("test_") or n == "run"] if isinstance(item, type) else None
+
+    if methods is None:
+        return [item.__name__]
+
+    return [f"{item.__name__}.{n}" if n != "run" else item.__name__ for n in methods]
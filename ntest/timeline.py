@@ -0,0 +1,124 @@
+# chrome trace events for the whole run (--trace). every process keeps its own, workers hand theirs over when they exit
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from json import dump, load
+from time import perf_counter_ns
+from typing import Any, Generator
+
+# files and processes
+from os import environ, getpid, listdir, makedirs, remove
+from os.path import dirname, join
+from multiprocessing import parent_process
+from shutil import rmtree
+import atexit
+
+from .cache import cachepath
+
+# the main process sets this (to its pid) before anything gets spawned, so workers know to record too.
+# every event goes under that pid, with the process that did the work as the thread, so one run reads as one timeline
+ENV: str = "NTEST_TRACE"
+
+# workers drop their events in here when they exit, the main process merges them
+DUMPS: str = "trace"
+
+# this process's events, and whether we're recording at all
+__events: list[dict[str, Any]] = []
+__on: bool = ENV in environ
+__off: AbstractContextManager = nullcontext()
+
+def now() -> int:
+    """The trace clock, in microseconds. perf_counter is system wide monotonic, so every process lines up."""
+    return perf_counter_ns() // 1000
+
+def start() -> None:
+    """Start recording in this process and every process spawned from here on (--trace). Leftovers from a killed run get thrown out."""
+    global __on
+    environ[ENV] = str(getpid())
+    __on = True
+
+    rmtree(cachepath(DUMPS), ignore_errors=True)
+    name("main")
+
+def name(label: str) -> None:
+    """Name this process's row in the trace viewer (ex: "worker 2")."""
+    if __on:
+        __events.append({"name": "thread_name", "ph": "M", "pid": int(environ[ENV]), "tid": getpid(), "args": {"name": label}})
+
+def complete(label: str, category: str, begin: int, end: int | None = None, **args: Any) -> None:
+    """
+    Record something that already happened.
+
+    Args:
+        label (str): What shows up on the bar.
+        category (str): collect, import, class, fixture, setup, test, body, teardown or spawn.
+        begin (int): When it started (see now).
+        end (int | None): When it ended, default right now.
+        **args (Any): Extra details shown when you click it.
+    """
+    if __on:
+        finish: int = now() if end is None else end
+        __events.append({
+            "name": label, "cat": category, "ph": "X", "ts": begin, "dur": max(finish - begin, 0),
+            "pid": int(environ[ENV]), "tid": getpid(), "args": args,
+        })
+
+@contextmanager
+def __span(label: str, category: str, args: dict[str, Any]) -> Generator[None, None, None]:
+    begin: int = now()
+    try:
+        yield
+
+    finally:
+        complete(label, category, begin, **args)
+
+def span(label: str, category: str, **args: Any) -> AbstractContextManager:
+    """Record whatever runs inside the with block (see complete). Costs next to nothing when --trace is off."""
+    return __span(label, category, args) if __on else __off
+
+def __dump() -> None:
+    """Workers save their events on the way out, for the main process to pick up."""
+    if not __on or not __events or parent_process() is None:
+        return
+
+    makedirs(cachepath(DUMPS), exist_ok=True)
+    with open(join(cachepath(DUMPS), f"{getpid()}.json"), "w", encoding="utf-8") as file:
+        dump(__events, file, separators=(",", ":"))
+
+atexit.register(__dump)
+
+def write(path: str) -> int:
+    """
+    Merge every worker's events into this process's, and save the whole thing as a trace file
+    (open it in chrome://tracing or ui.perfetto.dev). Worker events stay merged, so --watch keeps adding to one timeline.
+
+    Args:
+        path (str): Where the json goes.
+
+    Returns:
+        int: How many events got written.
+    """
+    try:
+        dumps: list[str] = [join(cachepath(DUMPS), name) for name in listdir(cachepath(DUMPS))]
+    except OSError:
+        dumps = []
+
+    for each in dumps:
+        try:
+            with open(each, "r", encoding="utf-8") as file:
+                __events.extend(load(file))
+            remove(each)
+
+        # half written by a worker that got killed, nothing to salvage
+        except (OSError, ValueError):
+            continue
+
+    if dirname(path):
+        makedirs(dirname(path), exist_ok=True)
+
+    events: list[dict[str, Any]] = [
+        {"name": "process_name", "ph": "M", "pid": int(environ.get(ENV, getpid())), "args": {"name": "ntest"}},
+        *sorted(__events, key=lambda event: event.get("ts", 0)),
+    ]
+    with open(path, "w", encoding="utf-8") as file:
+        dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, separators=(",", ":"))
+
+    return len(events)
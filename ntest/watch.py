@@ -0,0 +1,167 @@
+# waiting on files to change (--watch). inotify if the kernel has it, polling if not
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from select import select
+from struct import calcsize, unpack_from
+from time import sleep
+
+# paths and types
+from os import close, fsdecode, fsencode, read, stat, walk
+from os.path import abspath, join
+from typing import Generator
+
+# directories nobody wants watched (or walked every half second)
+IGNORED: set[str] = {".git", ".hg", ".svn", "__pycache__", ".ntest_cache", ".venv", "venv", "node_modules", ".tox", ".mypy_cache"}
+
+# the inotify bits we care about (see inotify(7))
+IN_CLOSE_WRITE: int = 0x008
+IN_MOVED_FROM: int = 0x040
+IN_MOVED_TO: int = 0x080
+IN_CREATE: int = 0x100
+IN_DELETE: int = 0x200
+IN_Q_OVERFLOW: int = 0x4000
+IN_ISDIR: int = 0x40000000
+IN_CLOEXEC: int = 0o2000000
+MASK: int = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+EVENT: str = "iIII"
+EVENT_SIZE: int = calcsize(EVENT)
+
+def __dirs(root: str) -> Generator[str, None, None]:
+    """Every directory under root (root included) that isn't hidden or in IGNORED."""
+    for directory, subdirs, _ in walk(root):
+        subdirs[:] = [name for name in subdirs if name not in IGNORED and not name.startswith(".")]
+        yield abspath(directory)
+
+def snapshot(root: str) -> dict[str, int]:
+    """
+    Every .py file under root with its mtime (what polling compares between checks).
+
+    Args:
+        root (str): The directory to look in.
+
+    Returns:
+        dict[str, int]: Absolute path -> mtime in nanoseconds.
+    """
+    found: dict[str, int] = {}
+    for directory in __dirs(root):
+        try:
+            for name in next(walk(directory))[2]:
+                if name.endswith(".py"):
+                    found[join(directory, name)] = stat(join(directory, name)).st_mtime_ns
+
+        # deleted out from under us mid walk, next check picks it up
+        except (OSError, StopIteration):
+            continue
+
+    return found
+
+def __poll(root: str, interval: float) -> Generator[set[str], None, None]:
+    """Check every .py file's mtime every interval seconds, yield whatever changed, appeared or disappeared."""
+    before: dict[str, int] = snapshot(root)
+
+    while True:
+        sleep(interval)
+        now: dict[str, int] = snapshot(root)
+        changed: set[str] = {path for path in before.keys() | now.keys() if before.get(path) != now.get(path)}
+        before = now
+
+        if changed:
+            yield changed
+
+def __inotify(root: str, debounce: float) -> Generator[set[str], None, None] | None:
+    """
+    Set up inotify watches on every directory under root (it isn't recursive on its own, so new directories get added as they show up).
+    Returns a generator of changed .py paths, or None if inotify isn't usable here (not linux, out of watches, etc).
+    """
+    try:
+        libc = CDLL(find_library("c") or "libc.so.6", use_errno=True)
+        fd: int = libc.inotify_init1(IN_CLOEXEC)
+
+    except (OSError, AttributeError):
+        return None
+
+    if fd < 0:
+        return None
+
+    watches: dict[int, str] = {}
+
+    def add(top: str) -> bool:
+        """Watch top and everything under it. False if the kernel said no (usually max_user_watches)."""
+        for directory in __dirs(top):
+            wd: int = libc.inotify_add_watch(fd, fsencode(directory), MASK)
+            if wd < 0:
+                # ENOENT means it's already gone and that's fine, anything else we can't watch everything
+                if get_errno() == 2:
+                    continue
+                return False
+
+            watches[wd] = directory
+
+        return True
+
+    if not add(root):
+        close(fd)
+        return None
+
+    def events() -> Generator[set[str], None, None]:
+        try:
+            while True:
+                changed: set[str] = set()
+
+                # block till something happens, then keep draining till it's been quiet for a bit (editors save in bursts)
+                timeout: float | None = None
+                while select([fd], [], [], timeout)[0]:
+                    timeout = debounce
+                    buffer: bytes = read(fd, 1 << 16)
+                    offset: int = 0
+
+                    while offset < len(buffer):
+                        wd, mask, _, length = unpack_from(EVENT, buffer, offset)
+                        name: str = fsdecode(buffer[offset + EVENT_SIZE:offset + EVENT_SIZE + length].rstrip(b"\0"))
+                        offset += EVENT_SIZE + length
+
+                        # the kernel dropped events, so we can't know what changed. call it everything
+                        if mask & IN_Q_OVERFLOW:
+                            changed |= set(snapshot(root))
+                            continue
+
+                        directory: str | None = watches.get(wd)
+                        if directory is None:
+                            continue
+
+                        path: str = join(directory, name)
+
+                        # new directory, watch it and count whatever got put in it already
+                        if mask & IN_ISDIR:
+                            if mask & (IN_CREATE | IN_MOVED_TO) and name not in IGNORED and not name.startswith("."):
+                                add(path)
+                                changed |= set(snapshot(path))
+                            continue
+
+                        if path.endswith(".py"):
+                            changed.add(path)
+
+                if changed:
+                    yield changed
+
+        finally:
+            close(fd)
+
+    return events()
+
+def changes(root: str, interval: float = 0.5) -> Generator[set[str], None, None]:
+    """
+    Wait for .py files under root to change, forever. Uses inotify when it can (no cpu burned while idle),
+    otherwise checks every file's mtime every interval seconds.
+
+    Args:
+        root (str): The directory to watch.
+        interval (float): Seconds between polls (and how long inotify waits for a burst of saves to settle, tenfold smaller).
+
+    Yields:
+        set[str]: Absolute paths of the .py files that changed, got created, or got deleted since the last yield.
+    """
+    watcher: Generator[set[str], None, None] | None = __inotify(root, interval / 10)
+    yield from watcher if watcher is not None else __poll(root, interval)
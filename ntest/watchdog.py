@@ -0,0 +1,170 @@
+# in process @timeouts (mode="signal" / mode="thread"). no spawned worker, no reimport, the test just gets an exception thrown into it
+from contextlib import contextmanager
+from ctypes import c_ulong, py_object, pythonapi
+from threading import Condition, Thread, get_ident, main_thread, current_thread
+from time import perf_counter, sleep
+from typing import Any, Generator
+import signal
+
+class Expired(TimeoutError):
+    """What gets thrown into a test that goes over an in process @timeout."""
+
+    def __init__(self, message: str = "Test went over its timeout.") -> None:
+        super().__init__(message)
+
+# the one watchdog thread per process, what it's waiting on (deadline, thread to interrupt), and a lock for both
+__watchdog: Thread | None = None
+__armed: tuple[float, int] | None = None
+__wake: Condition = Condition()
+
+# what the watchdog is throwing at right this second (disarm() waits for it to be done), and what it threw at last
+__firing: tuple[float, int] | None = None
+__thrown: tuple[float, int] | None = None
+
+# whether the current timeout already went off (either mode), and whether SIGALRM should still throw (it can land a hair after the test is done)
+__fired: bool = False
+__alarm: bool = False
+
+# the test running right now's timeout: (deadline, "signal" or "thread"), None outside of limited()
+__limit: tuple[float, str] | None = None
+
+def expired() -> bool:
+    """Whether the current test's timeout already went off. The runner checks this so @retry doesn't start another attempt on borrowed time."""
+    return __fired
+
+def __watch() -> None:
+    """The watchdog: sleeps till whatever's armed runs out, throws into it (at the next bytecode it runs), and goes back to sleep."""
+    global __armed, __fired, __firing, __thrown
+    with __wake:
+        while True:
+            armed: tuple[float, int] | None = __armed
+            if armed is None:
+                __wake.wait()
+                continue
+
+            left: float = armed[0] - perf_counter()
+            if left > 0:
+                __wake.wait(left)
+                continue
+
+            # say we're about to throw, then check it's still armed: disarm() doesn't take the lock, it clears __armed and waits this out
+            __firing = armed
+            if __armed is armed:
+                __armed, __fired, __thrown = None, True, armed
+                pythonapi.PyThreadState_SetAsyncExc(c_ulong(armed[1]), py_object(Expired))
+            __firing = None
+
+def __expire(signum: int, frame: Any) -> None:
+    global __alarm, __fired
+    # one shot, so it can't go off again in the middle of disarm() cleaning up after it
+    if __alarm:
+        __alarm, __fired = False, True
+        raise Expired()
+
+@contextmanager
+def limited(seconds: float, mode: str) -> Generator[None, None, None]:
+    """
+    Give a test seconds to finish, in this process. Nothing's armed yet: only the test body is (the runner puts arm() and disarm() around it),
+    so Expired (a TimeoutError) never lands in setup, fixtures or the runner's own cleanup. Those still count toward the time,
+    the runner checks the duration after. So does code stuck in C (a C extension looping, and in thread mode sleeps and blocking calls too),
+    which only gets Expired once it comes back to python. Use mode="process" for tests that can hang like that.
+
+    Args:
+        seconds (float): How long it gets.
+        mode (str): "signal" (SIGALRM, main thread on unix only, otherwise it falls back to "thread") or "thread" (a watchdog thread).
+    """
+    global __limit, __fired
+    chosen: str = "signal" if mode == "signal" and hasattr(signal, "setitimer") and current_thread() is main_thread() else "thread"
+    previous: Any = signal.signal(signal.SIGALRM, __expire) if chosen == "signal" else None
+    __limit, __fired = (perf_counter() + seconds, chosen), False
+
+    try:
+        yield
+
+    # disarm() already ran by now, so nothing can go off in here
+    finally:
+        __limit = None
+        if chosen == "signal":
+            signal.signal(signal.SIGALRM, previous)
+        __fired = False
+
+def arm() -> tuple[float, int] | None:
+    """
+    Arm the current test's timeout (see limited) for the test body, till disarm(). Does nothing outside of limited.
+    Armed again after it already ran out (ex: the await half of an async test), it throws right away.
+    Not a context manager on purpose: Expired can land anywhere python runs, a context manager's own enter/exit included,
+    so the runner calls these two right around the body and disarm() never takes a lock.
+
+    Returns:
+        tuple[float, int] | None: What to hand disarm(), None if there's no timeout.
+    """
+    global __watchdog, __armed, __alarm, __fired
+    if __limit is None:
+        return None
+
+    deadline, mode = __limit
+    if perf_counter() >= deadline:
+        __fired = True
+        raise Expired()
+
+    token: tuple[float, int] = (deadline, get_ident())
+
+    # SIGALRM at the deadline (setitimer, so fractions work), which throws wherever the test is at, sleeps and blocking calls included
+    if mode == "signal":
+        __alarm = True
+        signal.setitimer(signal.ITIMER_REAL, max(deadline - perf_counter(), 1e-6))
+        return token
+
+    # the watchdog thread (started the first time, then reused for every test). it can't throw while we hold the lock, nothing's armed yet
+    with __wake:
+        if __watchdog is None:
+            __watchdog = Thread(target=__watch, name="ntest watchdog", daemon=True)
+            __watchdog.start()
+
+        __armed = token
+        __wake.notify()
+
+    return token
+
+def disarm(token: tuple[float, int] | None) -> None:
+    """
+    Undo arm(). Expired only ever gets thrown once per arming, so if it lands in here there's nothing left to clean up after it.
+
+    Args:
+        token (tuple[float, int] | None): What arm() gave back.
+    """
+    global __armed, __alarm
+    if token is None or __limit is None:
+        return
+
+    # hold SIGALRM off while we disarm, and throw out one that went off on the way here
+    if __limit[1] == "signal":
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        try:
+            __alarm = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            if signal.SIGALRM in signal.sigpending():
+                signal.sigwait({signal.SIGALRM})
+
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGALRM})
+        return
+
+    # no lock (Expired landing in a lock's enter/exit leaves it held forever): a plain assignment is atomic,
+    # then let a throw that already got past the watchdog's check finish
+    __armed = None
+    while __firing is token:
+        sleep(0)
+
+    # it threw at this arming. if that hasn't landed yet it's pending, and goes off at the very next python call, so give it one.
+    # never cancel it with SetAsyncExc(NULL) instead: with nothing pending, 3.11 leaves the eval breaker stuck on,
+    # and under a profiler (--profile) every call after that spins on it forever
+    if __thrown is token:
+        try:
+            __land()
+
+        except Expired:
+            pass
+
+def __land() -> None:
+    """Does nothing. Calling it is the point (see disarm)."""
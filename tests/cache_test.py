@@ -0,0 +1,44 @@
+# the collection cache: unchanged files skip collection, but never with stale answers
+from os.path import exists, join
+
+from helpers import ntest, outcomes, suite, write
+
+NEEDS_DB: str = """
+    import os
+    from ntest import retry, skip
+
+    needs_db = skip("no db") if os.environ.get("DB") is None else (lambda fn: fn)
+
+    @needs_db
+    def test_db():
+        assert os.environ.get("DB")
+
+    @retry(2, "")
+    def test_plain():
+        pass
+"""
+
+def test_environment_change() -> None:
+    with suite({"db_test.py": NEEDS_DB}) as folder:
+        for args in ((), ("--collect-workers", "2")):
+            _, results = ntest(folder, *args, env={"DB": None})
+            assert outcomes(results) == {"test_plain": True}, (args, results)
+
+            # same file, cached now. the skip got decided at import time, so it has to get decided again
+            _, results = ntest(folder, *args, env={"DB": "1"})
+            assert outcomes(results) == {"test_db": True, "test_plain": True}, (args, results)
+
+def test_edited_file() -> None:
+    with suite({"edit_test.py": "def test_one():\n    pass\n"}) as folder:
+        _, results = ntest(folder)
+        assert outcomes(results) == {"test_one": True}
+
+        write(folder, {"edit_test.py": "from ntest import skip\n\n@skip('later')\ndef test_one():\n    pass\n\ndef test_two():\n    assert False\n"})
+        _, results = ntest(folder)
+        assert outcomes(results) == {"test_two": False}, results
+
+def test_no_collect_cache() -> None:
+    with suite({"plain_test.py": "def test_one():\n    pass\n"}) as folder:
+        _, results = ntest(folder, "--no-collect-cache")
+        assert outcomes(results) == {"test_one": True}
+        assert not exists(join(folder, ".ntest_cache", "collection.json"))
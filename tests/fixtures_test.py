@@ -0,0 +1,82 @@
+# fixtures only come from where the test's own file can see them
+from helpers import ntest, outcomes, suite
+
+def same_named(folder: str) -> str:
+    return f"""
+        from ntest import fixture
+
+        @fixture(scope="session")
+        def db():
+            return "{folder}"
+
+        def test_{folder}(db):
+            assert db == "{folder}", db
+    """
+
+def test_same_named_files() -> None:
+    with suite({"a/api_test.py": same_named("a"), "b/api_test.py": same_named("b")}) as folder:
+        for args in ((), ("-n", "2"), ("--lazy",)):
+            _, results = ntest(folder, *args)
+            assert outcomes(results) == {"test_a": True, "test_b": True}, (args, results)
+
+def test_no_leak_between_files() -> None:
+    with suite({
+        "a_test.py": """
+            from ntest import fixture
+
+            @fixture
+            def secret():
+                return 1
+
+            def test_own(secret):
+                assert secret == 1
+        """,
+        "b_test.py": """
+            def test_other(secret):
+                pass
+        """,
+    }) as folder:
+        _, results = ntest(folder)
+
+    assert outcomes(results) == {"test_own": True, "test_other": False}
+    assert "fixture 'secret' not found" in results[-1]["error"]
+
+def test_visible_fixtures() -> None:
+    with suite({
+        "shared.py": """
+            from ntest import fixture
+
+            @fixture
+            def base():
+                return 1
+
+            @fixture
+            def db(base):
+                return base + 1
+        """,
+        "listed.py": """
+            from ntest import fixture
+
+            @fixture
+            def extra():
+                return 3
+        """,
+        "c_test.py": """
+            import shared
+            from shared import db as database
+
+            ntest_fixtures = ["listed"]
+
+            def test_imported(database):
+                assert database == 2
+
+            def test_module(base):
+                assert base == 1
+
+            def test_listed(extra):
+                assert extra == 3
+        """,
+    }) as folder:
+        _, results = ntest(folder)
+
+    assert outcomes(results) == {"test_imported": True, "test_module": True, "test_listed": True}, results
@@ -0,0 +1,66 @@
+# helpers for ntest's own tests: each test writes a little suite into a temp dir and runs the real thing on it, in a subprocess
+from contextlib import contextmanager
+from json import loads
+from os import environ, makedirs, pathsep
+from os.path import abspath, dirname, join
+from subprocess import PIPE, STDOUT, run
+from sys import executable
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from typing import Any, Generator
+
+# the repo, so the subprocess imports this ntest and not some installed one
+ROOT: str = dirname(dirname(abspath(__file__)))
+
+def write(folder: str, files: dict[str, str]) -> None:
+    """
+    Write (or overwrite) files into folder, making directories as needed. Sources get dedented so tests can indent them.
+
+    Args:
+        folder (str): Where.
+        files (dict[str, str]): Relative path -> source.
+    """
+    for name, source in files.items():
+        path: str = join(folder, name)
+        makedirs(dirname(path), exist_ok=True)
+
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(dedent(source))
+
+@contextmanager
+def suite(files: dict[str, str]) -> Generator[str, None, None]:
+    """A temp dir with files written into it (see write), gone after."""
+    with TemporaryDirectory() as folder:
+        write(folder, files)
+        yield folder
+
+def ntest(folder: str, *args: str, env: dict[str, str | None] | None = None, timeout: float = 120.0) -> tuple[str, list[dict[str, Any]]]:
+    """
+    Run ntest on folder, from inside it (so its .ntest_cache/ lands there too), with a JSON Lines report to read the results out of.
+
+    Args:
+        folder (str): The suite.
+        *args (str): Extra command line arguments.
+        env (dict[str, str | None] | None): Environment changes, None unsets a variable.
+        timeout (float): Seconds before giving up on it (a hung run fails the test instead of hanging it).
+
+    Returns:
+        tuple[str, list[dict[str, Any]]]: (everything it printed, one dict per result in run order)
+    """
+    report: str = join(folder, "results.jsonl")
+    changed: dict[str, str | None] = {"PYTHONPATH": pathsep.join(filter(None, (ROOT, environ.get("PYTHONPATH")))), **(env or {})}
+    environment: dict[str, str] = {
+        key: value for key, value in {**environ, **changed}.items() if value is not None
+    }
+
+    done = run(
+        [executable, "-c", "import ntest; ntest.run()", ".", "-o", report, *args],
+        cwd=folder, env=environment, stdout=PIPE, stderr=STDOUT, text=True, timeout=timeout
+    )
+
+    with open(report, "r", encoding="utf-8") as file:
+        return done.stdout, [loads(line) for line in file if line.strip()]
+
+def outcomes(results: list[dict[str, Any]]) -> dict[str, bool | None]:
+    """Test name -> passed (None if it didn't run), for results from ntest()."""
+    return {result["name"]: result["passed"] for result in results}
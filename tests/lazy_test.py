@@ -0,0 +1,56 @@
+# --lazy finds tests by parsing files, these are the things parsing alone can't see
+from helpers import ntest, outcomes, suite
+
+def test_runtime_skip() -> None:
+    # the parser only sees decorators. one put on after the fact is only on the real test, which still has to get skipped
+    with suite({
+        "skipped_test.py": """
+            from ntest import TestCase, skip
+
+            class Skipped(TestCase):
+                def run(self):
+                    pass
+
+                def test_skipped(self):
+                    assert False
+
+            def test_skipped():
+                assert False
+
+            def test_kept():
+                pass
+
+            Skipped = skip("not today")(Skipped)
+            test_skipped = skip("not today")(test_skipped)
+        """,
+    }) as folder:
+        for args in ((), ("--lazy", "--no-collect-cache"), ("--lazy", "--no-collect-cache", "-n", "2")):
+            _, results = ntest(folder, *args)
+            assert outcomes(results) == {"test_kept": True}, (args, results)
+
+def test_imported_base() -> None:
+    # a TestCase reached thru a base class from another file only shows up by importing the file
+    with suite({
+        "bases.py": """
+            from ntest import TestCase
+
+            class Base(TestCase):
+                value = 1
+        """,
+        "cases_test.py": """
+            from bases import Base
+
+            class Inherited(Base):
+                def run(self):
+                    pass
+
+                def test_value(self):
+                    self.assertEqual(self.value, 1)
+
+            def test_plain():
+                pass
+        """,
+    }) as folder:
+        for args in ((), ("--lazy", "--no-collect-cache"), ("--lazy", "--no-collect-cache", "-n", "2")):
+            _, results = ntest(folder, *args)
+            assert outcomes(results) == {"Inherited": True, "Inherited.test_value": True, "test_plain": True}, (args, results)
@@ -0,0 +1,54 @@
+# -n: results come out in the order a serial run gives them, and -ff stops every worker
+from time import perf_counter
+
+from helpers import ntest, outcomes, suite
+
+# later files finish first, so workers hand results back out of order
+FILES: dict[str, str] = {
+    f"{letter}_test.py": f"""
+        from time import sleep
+
+        def test_{letter}_one():
+            sleep({0.3 * (3 - index)})
+
+        def test_{letter}_two():
+            assert "{letter}" != "b"
+    """
+    for index, letter in enumerate("abc")
+}
+
+def test_order() -> None:
+    with suite(FILES) as folder:
+        _, serial = ntest(folder)
+        for args in (("-n", "3"), ("-n", "2", "--lazy")):
+            _, parallel = ntest(folder, *args)
+            assert [result["name"] for result in parallel] == [result["name"] for result in serial], (args, parallel)
+            assert outcomes(parallel) == outcomes(serial), (args, parallel)
+
+    assert outcomes(serial) == {
+        "test_a_one": True, "test_a_two": True,
+        "test_b_one": True, "test_b_two": False,
+        "test_c_one": True, "test_c_two": True,
+    }
+
+def test_fail_fast() -> None:
+    # the failure lands while another worker is stuck in a long test, which has to get cut off instead of waited out
+    with suite({
+        "a_test.py": """
+            def test_broken():
+                assert False
+        """,
+        "b_test.py": """
+            from time import sleep
+
+            def test_slow():
+                sleep(60)
+        """,
+    }) as folder:
+        start: float = perf_counter()
+        _, results = ntest(folder, "-n", "2", "-ff")
+        took: float = perf_counter() - start
+
+    assert took < 30, took
+    assert outcomes(results).get("test_broken") is False, results
+    assert outcomes(results).get("test_slow") is not True, results
@@ -0,0 +1,29 @@
+# -o report.xml has to stay a document XML parsers take, whatever the tests print
+from os.path import join
+from xml.etree.ElementTree import parse
+
+from helpers import ntest, suite
+
+def test_junit_invalid_characters() -> None:
+    with suite({
+        "colored_test.py": """
+            def test_colored():
+                print("\\x1b[31mred\\x1b[0m \\x00 \\x08 fine")
+                assert False, "\\x1b[31mstill red\\x1b[0m"
+
+            def test_name_é():
+                pass
+        """,
+    }) as folder:
+        ntest(folder, "-o", "report.xml")
+        tree = parse(join(folder, "report.xml"))
+
+    cases = {case.get("name"): case for case in tree.iter("testcase")}
+    assert set(cases) == {"test_colored", "test_name_é"}
+
+    failure = cases["test_colored"].find("failure")
+    assert failure is not None and "�[31mstill red" in failure.get("message", "")
+
+    printed: str = cases["test_colored"].findtext("system-out") or ""
+    assert "�[31mred" in printed and "fine" in printed
+    assert "\x1b" not in printed and "\x00" not in printed
@@ -0,0 +1,74 @@
+# in process @timeouts (signal and thread modes) have to clean up after themselves no matter where the timeout lands
+from helpers import ntest, outcomes, suite
+
+# tests that always go over, one that swallows the timeout, and some that finish right around it (so it lands during cleanup)
+OVER: str = """
+    import time
+    from ntest import retry, timeout
+
+    def spin(seconds, swallow=False):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            try:
+                sum(range(50))
+            except Exception:
+                if not swallow:
+                    raise
+
+    @timeout(0.01, "", mode="{mode}")
+    def test_over():
+        spin(0.05)
+
+    @timeout(0.01, "", mode="{mode}")
+    def test_swallowed():
+        spin(0.05, swallow=True)
+
+    for index in range(15):
+        @timeout(0.01, "", mode="{mode}")
+        def edge(index=index):
+            spin(0.0095 + index * 0.00005)
+        edge.__name__ = edge.__qualname__ = f"test_edge{{index}}"
+        globals()[edge.__name__] = edge
+
+    @retry(2, "")
+    def test_after():
+        pass
+"""
+
+def check(mode: str, *args: str) -> None:
+    """Every overrun fails, and the test after still gets its attempt (a stuck timeout would give it none, a stuck lock would hang)."""
+    with suite({"over_test.py": OVER.format(mode=mode)}) as folder:
+        _, results = ntest(folder, *args, timeout=60)
+
+    ran: dict[str, bool | None] = outcomes(results)
+    assert len(ran) == 18, ran
+    assert ran["test_over"] is False and ran["test_swallowed"] is False, ran
+    assert ran["test_after"] is True, ran
+
+def test_thread_timeout_cleanup() -> None:
+    check("thread")
+
+def test_thread_timeout_cleanup_profiled() -> None:
+    check("thread", "--profile", "profile.pstats")
+
+def test_signal_timeout_cleanup() -> None:
+    check("signal")
+
+def test_signal_handler_restored() -> None:
+    with suite({
+        "alarm_test.py": """
+            import signal, time
+            from ntest import timeout
+
+            @timeout(0.01, "", mode="signal")
+            def test_over():
+                time.sleep(0.2)
+
+            def test_restored():
+                assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+                assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+        """
+    }) as folder:
+        _, results = ntest(folder)
+
+    assert outcomes(results) == {"test_over": False, "test_restored": True}